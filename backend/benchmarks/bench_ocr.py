@@ -0,0 +1,102 @@
+"""
+OCR seconds/page and word recall on synthetic scanned contracts:
+
+  fixed     every page rendered at 200 DPI and passed straight to tesseract
+            (the previous behaviour)
+  adaptive  DPI picked from a thumbnail, deskew + binarization, cache off
+  cached    adaptive again with the page-hash cache warm
+
+Requires the tesseract binary (TESSERACT_CMD).
+
+    python benchmarks/bench_ocr.py --pages 10 --skew 1.5
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
+sys.path.append(BASE_DIR)
+
+import fitz
+import pytesseract
+
+from src.config.settings import DocumentConfig
+from src.database import connection
+from src.services.document_processor.pdf_processor import PDFProcessor
+from src.services.document_processor.ocr_processor import OCRProcessor
+from benchmarks.synthetic_contract import build_scanned_pdf, contract_sections
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def word_recall(expected: str, actual: str) -> float:
+    expected_words = WORD.findall(expected.lower())
+    found = set(WORD.findall(actual.lower()))
+    return sum(w in found for w in expected_words) / max(len(expected_words), 1)
+
+
+def run_fixed(doc: fitz.Document):
+    texts, seconds = {}, {}
+    for page_num in range(len(doc)):
+        image = OCRProcessor.render(doc[page_num], 200)
+        started = time.perf_counter()
+        texts[page_num] = pytesseract.image_to_string(image)
+        seconds[page_num] = time.perf_counter() - started
+    return texts, seconds
+
+
+def report(label: str, texts, seconds, expected, wall: float):
+    recall = sum(word_recall(expected[i], texts.get(i, "")) for i in range(len(expected))) / len(expected)
+    per_page = sum(seconds.values()) / len(seconds) if seconds else 0.0
+    print(f"{label:>9} | {per_page:>11.3f} | {wall:>8.2f} | {len(seconds):>9} | {recall:>6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR throughput benchmark")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--skew", type=float, default=1.5, help="Degrees to rotate the synthetic scans")
+    parser.add_argument("--scan-dpi", type=int, default=150, help="Resolution of the embedded scans")
+    args = parser.parse_args()
+
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        print(f"❌ tesseract not available: {e}")
+        return
+
+    expected = contract_sections(args.pages)
+    print(f"📷 OCR on {args.pages} scanned pages (skew {args.skew}°, scanned at {args.scan_dpi} DPI)\n")
+    print(f"{'mode':>9} | {'OCR s/page':>11} | {'wall s':>8} | {'OCR pages':>9} | {'recall':>6}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.DB_PATH = os.path.join(tmp, "bench.db")
+        connection.init_database()
+
+        pdf_path = build_scanned_pdf(Path(tmp) / "scanned.pdf", args.pages, dpi=args.scan_dpi, skew=args.skew)
+        doc = fitz.open(pdf_path)
+        pages = list(range(len(doc)))
+
+        started = time.perf_counter()
+        texts, seconds = run_fixed(doc)
+        report("fixed", texts, seconds, expected, time.perf_counter() - started)
+
+        DocumentConfig.OCR_CACHE_ENABLED = False
+        started = time.perf_counter()
+        texts, seconds = PDFProcessor._ocr_extract(doc, pages)
+        report("adaptive", texts, seconds, expected, time.perf_counter() - started)
+
+        DocumentConfig.OCR_CACHE_ENABLED = True
+        PDFProcessor._ocr_extract(doc, pages)  # fill the cache
+        started = time.perf_counter()
+        texts, seconds = PDFProcessor._ocr_extract(doc, pages)
+        report("cached", texts, seconds, expected, time.perf_counter() - started)
+
+        doc.close()
+
+
+if __name__ == "__main__":
+    main()
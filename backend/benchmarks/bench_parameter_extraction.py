@@ -0,0 +1,84 @@
+"""
+Parameter extraction over every clause of a synthetic contract: the previous
+per-pattern searches (pattern strings looked up on each call), the same
+searches on precompiled patterns, ParameterExtractor.extract (lowercase scan)
+and ParameterExtractor.extract_batch. Every method must give identical results.
+
+    python benchmarks/bench_parameter_extraction.py --pages 200
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
+sys.path.append(BASE_DIR)
+
+from src.config.settings import ParameterConfig
+from src.core.models import ExtractedParameters
+from src.services.risk_analyzer.parameter_extractor import ParameterExtractor
+from benchmarks.synthetic_contract import contract_sections
+
+
+def legacy_extract(text):
+    """ParameterExtractor.extract before the pattern registry"""
+    text_lower = text.lower()
+    params = ExtractedParameters()
+    days_match = re.search(ParameterConfig.PATTERNS["days"], text, re.IGNORECASE)
+    if days_match:
+        params.days_mentioned = int(days_match.group(1))
+    months_match = re.search(ParameterConfig.PATTERNS["months"], text, re.IGNORECASE)
+    if months_match:
+        params.months_mentioned = int(months_match.group(1))
+    years_match = re.search(ParameterConfig.PATTERNS["years"], text, re.IGNORECASE)
+    if years_match:
+        params.years_mentioned = int(years_match.group(1))
+    params.amounts_mentioned = re.findall(ParameterConfig.PATTERNS["amount"], text)
+    params.has_written_notice = bool(re.search(ParameterConfig.PATTERNS["written_notice"], text, re.IGNORECASE))
+    params.is_mutual = bool(re.search(ParameterConfig.PATTERNS["party_symmetry"], text, re.IGNORECASE))
+    params.requires_cause = bool(re.search(ParameterConfig.PATTERNS["for_cause"], text, re.IGNORECASE))
+    params.has_cap = any(i in text_lower for i in ["limited to", "shall not exceed", "maximum", "cap"])
+    params.has_cure_period = any(i in text_lower for i in ["cure", "remedy", "correct the breach"])
+    params.raw_text_markers = {
+        "contains_unilateral": "company may" in text_lower or "vendor may" in text_lower,
+        "contains_either_party": "either party" in text_lower,
+        "contains_without_cause": "without cause" in text_lower,
+        "contains_immediately": "immediately" in text_lower,
+        "contains_unlimited": "unlimited" in text_lower or "all claims" in text_lower,
+    }
+    return params
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter extraction benchmark")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # One entry per numbered clause, roughly what a chunk holds
+    clauses = [line for section in contract_sections(args.pages) for line in section.split("\n")[1:]]
+
+    runs = {
+        "per-pattern, uncompiled": lambda: [legacy_extract(c) for c in clauses],
+        "per-pattern, compiled": lambda: [ParameterExtractor.extract_by_pattern(c) for c in clauses],
+        "extract": lambda: [ParameterExtractor.extract(c) for c in clauses],
+        "extract_batch": lambda: ParameterExtractor.extract_batch(clauses),
+    }
+
+    print(f"{args.pages} pages, {len(clauses):,} clauses")
+    print(f"{'method':<24} | {'best s':>7} | {'clauses/s':>10} | identical")
+    reference = None
+    for name, run in runs.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = [r.model_dump() for r in run()] if False else run()
+            best = min(best, time.perf_counter() - started)
+        dumped = [r.model_dump() for r in results]
+        reference = reference or dumped
+        print(f"{name:<24} | {best:>7.3f} | {len(clauses) / best:>10,.0f} | {dumped == reference}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Pages/second of PDF text extraction against page count, serial vs. the
+process pool. Every --table-every'th page carries a ruled table and is
+routed to pdfplumber; the rest are read by PyMuPDF alone.
+
+    python benchmarks/bench_pdf_extraction.py --pages 5 20 50 100 200 --workers 4
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
+sys.path.append(BASE_DIR)
+
+from src.services.document_processor.pdf_processor import PDFProcessor
+from benchmarks.synthetic_contract import build_contract_pdf
+
+
+def time_extraction(pdf_path: Path, workers: int, repeats: int):
+    best = float("inf")
+    for _ in range(repeats):
+        data = pdf_path.read_bytes()
+        started = time.perf_counter()
+        extracted = PDFProcessor.extract(pdf_path, data, workers=workers)
+        best = min(best, time.perf_counter() - started)
+    return best, len(extracted.layout_pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF extraction throughput benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 50, 100, 200])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--repeats", type=int, default=2, help="Best of N runs per size")
+    parser.add_argument("--table-every", type=int, default=4, help="Put a ruled table on every Nth page (0: none)")
+    args = parser.parse_args()
+
+    print(f"📄 PDF extraction: serial vs {args.workers} workers (best of {args.repeats})\n")
+    print(f"{'pages':>6} | {'plumber':>7} | {'serial p/s':>10} | {'pool p/s':>10} | {'speedup':>7}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Warm the pool so process start-up is not billed to the first size
+        warmup = build_contract_pdf(Path(tmp) / "warmup.pdf", 40, table_every=1)
+        PDFProcessor.extract(warmup, workers=args.workers)
+
+        for pages in args.pages:
+            pdf_path = build_contract_pdf(Path(tmp) / f"contract_{pages}.pdf", pages, table_every=args.table_every)
+            serial, layout_pages = time_extraction(pdf_path, 1, args.repeats)
+            pooled, _ = time_extraction(pdf_path, args.workers, args.repeats)
+            print(f"{pages:>6} | {layout_pages:>7} | {pages / serial:>10.1f} | {pages / pooled:>10.1f} | {serial / pooled:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Time-to-decision for Arbiter calls: blocking completion vs streamed completion
+with early `risk_score` extraction.
+
+Start the replay server first (see llm_replay_server.py), then:
+
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 GROQ_API_KEY=replay \
+        python benchmarks/bench_streaming_decision.py --fixture benchmarks/fixtures/llm_traffic.jsonl
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
+sys.path.append(BASE_DIR)
+
+os.environ.setdefault("GROQ_API_KEY", "replay")
+os.environ.setdefault("LANGFUSE_ENABLED", "false")
+
+from src.core.llm_client import LLMClient
+from src.config.settings import LLMConfig
+from benchmarks.llm_replay_server import DEFAULT_FIXTURE
+
+
+def load_verdict_requests(fixture_path: str, limit: int):
+    """Recorded requests whose response is a JSON object carrying a risk_score"""
+    requests = []
+    seen = set()
+    with open(fixture_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            content = record["response"]["choices"][0]["message"].get("content") or ""
+            if '"risk_score"' not in content or record["key"] in seen:
+                continue
+            seen.add(record["key"])
+            requests.append(record["request"])
+            if len(requests) >= limit:
+                break
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arbiter time-to-decision benchmark")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--limit", type=int, default=50, help="Max recorded verdicts to replay")
+    args = parser.parse_args()
+
+    requests = load_verdict_requests(args.fixture, args.limit)
+    if not requests:
+        print(f"❌ No recorded verdicts with risk_score in {args.fixture}")
+        return
+
+    llm = LLMClient()
+    model = LLMConfig.MODELS["smart"][0]
+    print(f"⏱️  Replaying {len(requests)} Arbiter calls against {LLMConfig.BASE_URL}\n")
+    print(f"{'chunk':>5} | {'blocking s':>10} | {'decision s':>10} | {'stream total s':>14} | {'saved':>6}")
+
+    blocking_times, decision_times = [], []
+    for n, request in enumerate(requests, 1):
+        kwargs = dict(
+            messages=request["messages"],
+            temperature=request.get("temperature", 0.2),
+            max_tokens=request.get("max_tokens", 800)
+        )
+
+        started = time.perf_counter()
+        llm._execute_call(llm.client, model, **kwargs)
+        blocking = time.perf_counter() - started
+
+        llm._execute_stream(llm.client, model, on_field=lambda key, value: True, **kwargs)
+        timing = llm.last_stream_timing
+        decision = timing["field_seconds"].get("risk_score", timing["total_seconds"])
+
+        blocking_times.append(blocking)
+        decision_times.append(decision)
+        saved = 1 - decision / blocking if blocking else 0.0
+        print(f"{n:>5} | {blocking:>10.3f} | {decision:>10.3f} | {timing['total_seconds']:>14.3f} | {saved:>6.0%}")
+
+    print("\n📊 Summary")
+    print(f"   Blocking      median {statistics.median(blocking_times):.3f}s  mean {statistics.mean(blocking_times):.3f}s")
+    print(f"   Decision      median {statistics.median(decision_times):.3f}s  mean {statistics.mean(decision_times):.3f}s")
+    print(f"   Time-to-decision reduced by {1 - sum(decision_times) / sum(blocking_times):.0%}")
+
+
+if __name__ == "__main__":
+    main()
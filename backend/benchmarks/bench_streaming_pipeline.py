@@ -0,0 +1,51 @@
+"""
+Stage 1 time-to-first-chunk: DocumentProcessor.process (whole document
+before any chunk) vs. process_stream (chunks while pages are extracted).
+
+    python benchmarks/bench_streaming_pipeline.py --pages 50 200
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
+sys.path.append(BASE_DIR)
+
+from src.services.document_processor import DocumentProcessor
+from benchmarks.synthetic_contract import build_contract_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming Stage 1 benchmark")
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--table-every", type=int, default=10)
+    args = parser.parse_args()
+
+    processor = DocumentProcessor()
+    print(f"{'pages':>6} | {'batch first s':>13} | {'stream first s':>14} | {'batch total s':>13} | {'stream total s':>14} | {'chunks':>6}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = build_contract_pdf(Path(tmp) / f"contract_{pages}.pdf", pages, table_every=args.table_every)
+
+            started = time.perf_counter()
+            batch = processor.process(pdf_path)
+            batch_total = time.perf_counter() - started
+
+            started = time.perf_counter()
+            first = None
+            stream = processor.process_stream(pdf_path)
+            for _ in stream:
+                if first is None:
+                    first = time.perf_counter() - started
+            stream_total = time.perf_counter() - started
+
+            print(f"{pages:>6} | {batch_total:>13.2f} | {first or 0:>14.2f} | {batch_total:>13.2f} | "
+                  f"{stream_total:>14.2f} | {len(stream.document.chunks):>6}")
+
+
+if __name__ == "__main__":
+    main()
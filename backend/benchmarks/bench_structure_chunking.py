@@ -0,0 +1,109 @@
+"""
+Chunk count and debate load per contract: semantic chunking vs. structure
+chunking (ChunkingConfig.MODE). Every chunk holding one of the synthetic
+contract's risky clauses counts as a debate (pessimist, optimist and
+arbiter calls plus a fix). Recall is the share of risky clause occurrences
+that land whole in a single chunk, so the debate sees the full clause.
+
+    python benchmarks/bench_structure_chunking.py --pages 20 --contracts 5
+    python benchmarks/bench_structure_chunking.py --hash-embeddings   # no model download
+"""
+import os
+import re
+import sys
+import time
+import zlib
+import argparse
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
+sys.path.append(BASE_DIR)
+
+from src.config.settings import ChunkingConfig
+from src.services.document_processor.semantic_chunker import SemanticChunker
+from benchmarks.synthetic_contract import CLAUSES, contract_text, structured_contract_text
+
+# Clause templates the debate is expected to flag
+RISKY_TEMPLATES = [CLAUSES[1], CLAUSES[3], CLAUSES[4], CLAUSES[10]]
+CALLS_PER_DEBATE = 4
+
+
+class HashEmbedder:
+    """Bag-of-words stand-in for the sentence model: deterministic and offline"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, sentences, show_progress_bar=False):
+        vectors = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for i, sentence in enumerate(sentences):
+            for word in re.findall(r"[a-z]+", sentence.lower()):
+                vectors[i, zlib.crc32(word.encode()) % self.dim] += 1.0
+        return vectors
+
+
+def risky_spans(text):
+    spans = []
+    for template in RISKY_TEMPLATES:
+        pattern = re.escape(template).replace(r"\{n\}", r"\d+").replace(r"\{amount\}", r"[\d,]+")
+        spans.extend((m.start(), m.end()) for m in re.finditer(pattern, text))
+    return spans
+
+
+def measure(chunker, text, mode):
+    ChunkingConfig.MODE = mode
+    started = time.perf_counter()
+    chunks = chunker.chunk_text(text)
+    elapsed = time.perf_counter() - started
+
+    spans = risky_spans(text)
+    debated = set()
+    whole = 0
+    for start, end in spans:
+        clause = text[start:end].rstrip(".")  # chunk text drops sentence-final periods
+        holders = [c for c in chunks if c.start_char < end and c.end_char > start]
+        debated.update(c.id for c in holders)
+        if any(clause in c.text for c in holders):
+            whole += 1
+    return {
+        "chunks": len(chunks),
+        "debates": len(debated),
+        "recall": whole / len(spans) if spans else 1.0,
+        "seconds": elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Structure vs. semantic chunking benchmark")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--contracts", type=int, default=5)
+    parser.add_argument("--hash-embeddings", action="store_true")
+    args = parser.parse_args()
+
+    if args.hash_embeddings:
+        chunker = SemanticChunker.__new__(SemanticChunker)
+        chunker.model = HashEmbedder()
+    else:
+        chunker = SemanticChunker()
+    original_mode = ChunkingConfig.MODE
+
+    corpus = [("numbered", contract_text), ("structured", structured_contract_text)]
+    print(f"{args.contracts} contracts x {args.pages} pages per layout")
+    print(f"{'layout':<11} | {'mode':<9} | {'chunks':>7} | {'debates':>7} | {'LLM calls':>9} | {'recall':>6} | {'chunk s':>7}")
+    for layout, build in corpus:
+        for mode in ("semantic", "structure"):
+            totals = {"chunks": 0, "debates": 0, "recall": 0.0, "seconds": 0.0}
+            for seed in range(args.contracts):
+                result = measure(chunker, build(args.pages, seed=seed), mode)
+                for key in totals:
+                    totals[key] += result[key]
+            n = args.contracts
+            print(f"{layout:<11} | {mode:<9} | {totals['chunks'] / n:>7.1f} | {totals['debates'] / n:>7.1f} | "
+                  f"{CALLS_PER_DEBATE * totals['debates'] / n:>9.1f} | {totals['recall'] / n:>6.1%} | "
+                  f"{totals['seconds'] / n:>7.2f}")
+    ChunkingConfig.MODE = original_mode
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+OpenAI-compatible LLM stand-in for offline, reproducible benchmarking.
+
+Record real traffic (proxies to the upstream provider and appends every exchange
+to a JSONL fixture):
+
+    python benchmarks/llm_replay_server.py record \
+        --upstream https://api.groq.com/openai/v1 --fixture benchmarks/fixtures/llm_traffic.jsonl
+
+Replay it with a latency model and injected faults:
+
+    python benchmarks/llm_replay_server.py replay \
+        --fixture benchmarks/fixtures/llm_traffic.jsonl --latency lognormal:900,0.5 \
+        --rate-limit-rate 0.05 --server-error-rate 0.02 --seed 7
+
+Streamed requests (stream=true) replay the recorded content as SSE chunks: the
+first chunk arrives after --ttft-fraction of the sampled latency and the rest
+are spread evenly over the remainder.
+
+Point the backend at it through the LLMConfig environment overrides:
+
+    LLM_BASE_URL=http://127.0.0.1:8765/v1 LLM_FALLBACK_BASE_URL=http://127.0.0.1:8765/v1 \
+    GROQ_API_KEY=replay OPENROUTER_API_KEY=replay python run.py
+"""
+import os
+import sys
+import json
+import asyncio
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import openai
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
+sys.path.append(BASE_DIR)
+
+DEFAULT_FIXTURE = os.path.join(BASE_DIR, "benchmarks", "fixtures", "llm_traffic.jsonl")
+
+# Request fields that decide which recorded response is replayed. The model is
+# left out on purpose: the primary/fallback chain may pick a different model on
+# replay (e.g. after an injected 429) and should still hit the same recording.
+# `stream` is left out too, so a blocking recording can be replayed streamed.
+KEY_FIELDS = ("messages", "temperature", "max_tokens")
+
+
+def request_key(body: Dict[str, Any]) -> str:
+    keyed = {field: body.get(field) for field in KEY_FIELDS}
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class LatencyModel:
+    """
+    Parses specs like 'recorded', 'fixed:250', 'uniform:200,900',
+    'normal:600,150' or 'lognormal:600,0.5' (median ms, sigma). All values in ms.
+    """
+
+    def __init__(self, spec: str, rng: random.Random):
+        self.rng = rng
+        name, _, raw_args = spec.partition(":")
+        self.name = name
+        self.args = [float(a) for a in raw_args.split(",") if a]
+
+        expected = {"recorded": 0, "fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if name not in expected or len(self.args) != expected[name]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample_ms(self, recorded_ms: float) -> float:
+        if self.name == "recorded":
+            return recorded_ms
+        if self.name == "fixed":
+            return self.args[0]
+        if self.name == "uniform":
+            return self.rng.uniform(self.args[0], self.args[1])
+        if self.name == "normal":
+            return max(0.0, self.rng.gauss(self.args[0], self.args[1]))
+        # lognormal: args are (median_ms, sigma)
+        return self.args[0] * self.rng.lognormvariate(0.0, self.args[1])
+
+
+class FixtureStore:
+    """JSONL fixture of recorded exchanges, replayed round-robin per request key."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.records: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.cursors: Dict[str, int] = defaultdict(int)
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.records[record["key"]].append(record)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.records.values())
+
+    def next_record(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            recorded = self.records.get(key)
+            if not recorded:
+                return None
+            record = recorded[self.cursors[key] % len(recorded)]
+            self.cursors[key] += 1
+            return record
+
+    def append(self, record: Dict[str, Any]):
+        with self.lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            self.records[record["key"]].append(record)
+
+
+def _error(status: int, message: str, error_type: str, headers: Dict[str, str] = None) -> JSONResponse:
+    # Same envelope the OpenAI SDK parses for APIStatusError
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": error_type, "code": status}},
+        headers=headers
+    )
+
+
+def _sse_chunks(payload: Dict[str, Any], chunk_chars: int) -> List[str]:
+    """Split a recorded chat.completion into chat.completion.chunk SSE events"""
+    content = payload["choices"][0]["message"].get("content") or ""
+    base = {
+        "id": payload.get("id", "replay"),
+        "object": "chat.completion.chunk",
+        "created": payload.get("created", int(time.time())),
+        "model": payload.get("model", "replay")
+    }
+
+    events = []
+    pieces = [content[i:i + chunk_chars] for i in range(0, len(content), chunk_chars)] or [""]
+    for n, piece in enumerate(pieces):
+        delta = {"content": piece}
+        if n == 0:
+            delta["role"] = "assistant"
+        events.append({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+    events.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+
+    return [f"data: {json.dumps(e)}\n\n" for e in events] + ["data: [DONE]\n\n"]
+
+
+def create_app(args: argparse.Namespace) -> FastAPI:
+    app = FastAPI(title="LLM Replay Server", docs_url=None, redoc_url=None)
+
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+    latency = LatencyModel(args.latency, rng)
+    store = FixtureStore(args.fixture)
+    stats = defaultdict(int)
+
+    upstream = None
+    if args.mode == "record":
+        upstream = openai.OpenAI(
+            base_url=args.upstream,
+            api_key=args.upstream_api_key or os.getenv("GROQ_API_KEY"),
+            max_retries=0
+        )
+
+    print(f"🎛️  Mode: {args.mode} | fixture: {args.fixture} ({len(store)} recorded exchanges)")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        key = request_key(body)
+        stats["requests"] += 1
+
+        if args.mode == "record":
+            return await run_in_threadpool(_record, body, key)
+        return await _replay(key, bool(body.get("stream")))
+
+    def _record(body: Dict[str, Any], key: str):
+        stream = bool(body.pop("stream", False))
+        body.pop("stream_options", None)
+        started = time.perf_counter()
+        try:
+            response = upstream.chat.completions.create(**body)
+        except openai.APIStatusError as e:
+            stats["upstream_errors"] += 1
+            return _error(e.status_code, str(e), "upstream_error")
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        payload = response.model_dump()
+        store.append({
+            "key": key,
+            "model": body.get("model"),
+            "request": body,
+            "response": payload,
+            "latency_ms": round(latency_ms, 1)
+        })
+        stats["recorded"] += 1
+        if stream:
+            return StreamingResponse(iter(_sse_chunks(payload, args.stream_chunk_chars)),
+                                     media_type="text/event-stream")
+        return JSONResponse(content=payload)
+
+    async def _replay(key: str, stream: bool):
+        with rng_lock:
+            roll = rng.random()
+        if roll < args.rate_limit_rate:
+            stats["injected_429"] += 1
+            return _error(429, "Rate limit reached (injected)", "rate_limit_exceeded",
+                          headers={"Retry-After": str(args.retry_after)})
+        if roll < args.rate_limit_rate + args.server_error_rate:
+            stats["injected_5xx"] += 1
+            with rng_lock:
+                status = rng.choice([500, 502, 503])
+            return _error(status, "Upstream failure (injected)", "server_error")
+
+        record = store.next_record(key)
+        if record is None:
+            stats["misses"] += 1
+            return _error(404, f"No recorded response for request key {key[:12]}", "replay_miss")
+
+        with rng_lock:
+            delay_ms = latency.sample_ms(record.get("latency_ms", 0.0))
+        stats["replayed"] += 1
+
+        if stream:
+            events = _sse_chunks(record["response"], args.stream_chunk_chars)
+            first_delay = delay_ms * args.ttft_fraction / 1000
+            gap = delay_ms * (1 - args.ttft_fraction) / 1000 / max(1, len(events) - 1)
+
+            async def paced():
+                await asyncio.sleep(first_delay)
+                for n, event in enumerate(events):
+                    if n:
+                        await asyncio.sleep(gap)
+                    yield event
+
+            return StreamingResponse(paced(), media_type="text/event-stream")
+
+        await asyncio.sleep(delay_ms / 1000)
+        return JSONResponse(content=record["response"])
+
+    @app.get("/stats")
+    def get_stats():
+        return dict(stats)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay OpenAI-compatible LLM stand-in")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="JSONL fixture file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--upstream", default="https://api.groq.com/openai/v1", help="Provider to record from")
+    parser.add_argument("--upstream-api-key", default=None, help="Defaults to GROQ_API_KEY")
+    parser.add_argument("--latency", default="recorded",
+                        help="recorded | fixed:MS | uniform:LO,HI | normal:MEAN,STD | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Fraction of calls answered with 5xx")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and fault sampling")
+    parser.add_argument("--stream-chunk-chars", type=int, default=8, help="Characters per streamed chunk")
+    parser.add_argument("--ttft-fraction", type=float, default=0.15,
+                        help="Share of the sampled latency spent before the first streamed chunk")
+    args = parser.parse_args()
+
+    app = create_app(args)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
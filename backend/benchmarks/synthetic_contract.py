@@ -0,0 +1,147 @@
+"""
+Deterministic synthetic contracts for benchmarks: numbered sections of
+realistic clause text, rendered to PDF with PyMuPDF when a file is needed.
+"""
+import io
+import random
+from pathlib import Path
+from typing import List
+
+import fitz
+
+SECTION_TITLES = [
+    "DEFINITIONS", "TERM AND TERMINATION", "FEES AND PAYMENT", "CONFIDENTIALITY",
+    "LIMITATION OF LIABILITY", "INDEMNIFICATION", "NON-COMPETITION", "WARRANTIES",
+    "INTELLECTUAL PROPERTY", "GOVERNING LAW"
+]
+
+CLAUSES = [
+    "Either party may terminate this Agreement upon {n} days prior written notice to the other party.",
+    "The Company may terminate this Agreement at any time, with or without cause, effective immediately.",
+    "In no event shall either party's aggregate liability exceed the fees paid in the {n} months preceding the claim.",
+    "Vendor shall be liable for all claims, damages and losses arising out of or relating to this Agreement.",
+    "During the term and for {n} years thereafter, Employee shall not engage in any competing business.",
+    "\"Confidential Information\" means all non-public information disclosed by either party to the other.",
+    "Customer shall pay all undisputed invoices within {n} days of receipt, in the amount of ${amount}.",
+    "The receiving party shall protect Confidential Information using at least reasonable care.",
+    "Each party represents that it has full power and authority to enter into this Agreement.",
+    "This Agreement shall be governed by the laws of the State of Delaware without regard to conflicts principles.",
+    "Neither party shall solicit the employees of the other party for a period of {n} months.",
+    "The breaching party shall have {n} days to cure any material breach after receiving written notice.",
+]
+
+
+def contract_sections(pages: int, seed: int = 7) -> List[str]:
+    """About one page of numbered clause text per section"""
+    rng = random.Random(seed)
+    sections = []
+    for page in range(pages):
+        number = page + 1
+        title = SECTION_TITLES[page % len(SECTION_TITLES)]
+        lines = [f"{number}. {title}"]
+        for sub in range(1, 9):
+            clause = rng.choice(CLAUSES).format(n=rng.choice([5, 10, 30, 60, 90]),
+                                                amount=f"{rng.randint(1, 900)},000")
+            lines.append(f"{number}.{sub} {clause} {rng.choice(CLAUSES).format(n=30, amount='10,000')}")
+        sections.append("\n".join(lines))
+    return sections
+
+
+def contract_text(pages: int, seed: int = 7) -> str:
+    return "\n\n".join(contract_sections(pages, seed))
+
+
+CLAUSE_TITLES = ["General", "Notice", "Payment Terms", "Exceptions", "Survival", "Remedies"]
+ITEM_LEADS = [
+    "The obligations in this Section do not apply to information that:",
+    "Either party may exercise its rights under this Section if the other party:",
+]
+ITEMS = [
+    "is or becomes generally available to the public other than through a breach of this Agreement;",
+    "was known to the receiving party before disclosure by the disclosing party;",
+    "fails to pay any undisputed amount within {n} days after written notice;",
+    "becomes insolvent or makes a general assignment for the benefit of creditors;",
+    "breaches any material obligation and does not cure the breach within {n} days;",
+]
+
+
+def structured_contract_text(pages: int, seed: int = 7) -> str:
+    """
+    Closer to real contract layout than contract_text: ARTICLE headings,
+    titled subsections of one or two clauses, (a)/(b) item lists under a
+    lead-in sentence and a running header repeated on every page.
+    """
+    rng = random.Random(seed)
+    page_texts = []
+    for page in range(pages):
+        number = page + 1
+        lines = ["CONFIDENTIAL", f"ARTICLE {number}", SECTION_TITLES[page % len(SECTION_TITLES)]]
+        for sub in range(1, rng.randint(5, 8)):
+            title = rng.choice(CLAUSE_TITLES)
+            if rng.random() < 0.3:
+                lines.append(f"{number}.{sub} {title}. {rng.choice(ITEM_LEADS)}")
+                for letter in "abcd"[:rng.randint(2, 4)]:
+                    lines.append(f"({letter}) {rng.choice(ITEMS).format(n=rng.choice([10, 30]))}")
+                continue
+            clauses = [rng.choice(CLAUSES).format(n=rng.choice([5, 10, 30, 60, 90]),
+                                                  amount=f"{rng.randint(1, 900)},000")
+                       for _ in range(rng.randint(1, 2))]
+            lines.append(f"{number}.{sub} {title}. {' '.join(clauses)}")
+        page_texts.append("\n".join(lines))
+    return "\n\n".join(page_texts)
+
+
+FEE_ROWS = [("Implementation", "One-time", "$25,000"), ("Subscription", "Monthly", "$4,500"),
+            ("Support", "Annual", "$12,000"), ("Training", "Per session", "$1,500")]
+
+
+def _draw_fee_table(page: fitz.Page, top: float):
+    """Ruled three-column fee schedule, the kind of page pdfplumber is needed for"""
+    columns = [50, 230, 380, 545]
+    rows = [("Service", "Billing", "Fee")] + FEE_ROWS
+    for r, row in enumerate(rows):
+        y = top + r * 18
+        for c, cell in enumerate(row):
+            page.insert_text((columns[c] + 4, y + 13), cell, fontsize=9)
+        page.draw_line((columns[0], y), (columns[-1], y))
+    bottom = top + len(rows) * 18
+    page.draw_line((columns[0], bottom), (columns[-1], bottom))
+    for x in columns:
+        page.draw_line((x, top), (x, bottom))
+
+
+def build_contract_pdf(path: Path, pages: int, seed: int = 7, table_every: int = 0) -> Path:
+    """`table_every=N` adds a ruled fee table below the text on every Nth page"""
+    doc = fitz.open()
+    for n, section in enumerate(contract_sections(pages, seed), 1):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 545, 660), section, fontsize=9)
+        if table_every and n % table_every == 0:
+            _draw_fee_table(page, 680)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def build_scanned_pdf(path: Path, pages: int, seed: int = 7, dpi: int = 150, skew: float = 0.0) -> Path:
+    """Image-only copy of the synthetic contract, optionally rotated like a crooked scan"""
+    from PIL import Image
+
+    text_pdf = fitz.open()
+    for section in contract_sections(pages, seed):
+        text_pdf.new_page().insert_textbox(fitz.Rect(50, 50, 545, 800), section, fontsize=9)
+
+    doc = fitz.open()
+    for text_page in text_pdf:
+        pix = text_page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+        if skew:
+            image = image.rotate(skew, resample=Image.BICUBIC, fillcolor=255)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        page = doc.new_page(width=text_page.rect.width, height=text_page.rect.height)
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    doc.save(str(path))
+    doc.close()
+    text_pdf.close()
+    return path
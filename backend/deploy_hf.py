@@ -24,8 +24,10 @@ if not os.path.exists(DB_PATH):
         print(f"❌ Failed to build Vector DB: {e}")
         # We don't exit, as the app might still run partially or for other reasons
 
-from src.api.routes import analysis, feedback, health, admin
+from src.api.routes import analysis, batch, feedback, health, admin
 from src.database import init_database
+from src.workers import start_embedded_pool, stop_embedded_pool
+from src.config.settings import WorkerConfig
 
 # Initialize Database Schema (SQLite)
 print("🗄️ Initializing SQLite Database...")
@@ -49,11 +51,25 @@ app.add_middleware(
 
 # 1. Mount API Routes
 app.include_router(analysis.router, prefix="/api/analyze", tags=["Analysis"])
+app.include_router(batch.router, prefix="/api/batch", tags=["Batch"])
 app.include_router(feedback.router, prefix="/api/feedback", tags=["Feedback"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 # Health check at /api/health AND /health (for HF)
 app.include_router(health.router, prefix="/api", tags=["Health"]) 
 
+# Analysis worker pool (only in ANALYSIS_WORKER_MODE=pool)
+@app.on_event("startup")
+async def startup_event():
+    start_embedded_pool()
+    if WorkerConfig.MODE != "pool":
+        # Jobs still queued from before a restart, then any whose lease runs out
+        analysis.inline_runner.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    stop_embedded_pool()
+    analysis.close_analyzer()
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
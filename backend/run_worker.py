@@ -0,0 +1,22 @@
+import argparse
+import logging
+import os
+import sys
+
+# Ensure backend root is in path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.workers.pool import WorkerPool
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the analysis worker pool")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: ANALYSIS_WORKERS)")
+    args = parser.parse_args()
+
+    is_production = os.getenv("ENVIRONMENT") == "production"
+    logging.basicConfig(
+        level=logging.WARNING if is_production else logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    )
+
+    WorkerPool(args.workers).run()
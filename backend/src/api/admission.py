@@ -0,0 +1,122 @@
+"""
+Admission control for uploads. Analyses wait in the job store queue in two
+lanes, interactive (single uploads, run first) and batch; each lane has a
+depth limit and each client a limit on its unfinished uploads. An upload
+over a limit is refused with 429 and a Retry-After estimated from how long
+recent analyses ran, before its body is read. The checks query the job
+store, so async routes call them through run_in_threadpool.
+"""
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Request
+
+from src.config.settings import AdmissionConfig, WorkerConfig
+from src.database.job_store import JobStore, get_job_store
+
+logger = logging.getLogger(__name__)
+
+class AdmissionController:
+    def __init__(self, job_store: JobStore):
+        self.job_store = job_store
+        self._lock = threading.Lock()
+        self._rejected: Dict[str, int] = {}
+        self._timings: Optional[Dict[str, Dict[str, Any]]] = None
+        self._timings_at = 0.0
+
+    @staticmethod
+    def client_id(request: Request) -> str:
+        # The header is only trusted when configured (set by a proxy in front)
+        header = AdmissionConfig.CLIENT_HEADER
+        value = request.headers.get(header, "").strip() if header else ""
+        if value:
+            return f"id:{value[:128]}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    def admit_analysis(self, request: Request) -> str:
+        """The client_id to record on the job; raises 429 when the interactive lane or the client is full"""
+        client_id = self.client_id(request)
+        load = self.job_store.load(client_id)
+        depth = load["interactive"]["queued"] + load["interactive"]["running"]
+        if depth >= AdmissionConfig.MAX_QUEUE_DEPTH:
+            self._reject("interactive", "queue_full", depth - AdmissionConfig.MAX_QUEUE_DEPTH + 1,
+                         f"Analysis queue is full ({depth} analyses waiting or running)")
+        if load["client_jobs"] >= AdmissionConfig.MAX_PER_CLIENT:
+            self._reject("interactive", "client_limit", load["client_jobs"] - AdmissionConfig.MAX_PER_CLIENT + 1,
+                         f"Too many analyses in progress for this client (limit {AdmissionConfig.MAX_PER_CLIENT})")
+        return client_id
+
+    def admit_batch(self, request: Request, files: int = 1) -> str:
+        """
+        As admit_analysis, for a batch of `files` contracts: call it with the
+        default before reading the body and again with the real count
+        """
+        client_id = self.client_id(request)
+        load = self.job_store.load(client_id)
+        depth = load["batch"]["queued"] + load["batch"]["running"]
+        if depth + files > AdmissionConfig.MAX_BATCH_JOBS:
+            self._reject("batch", "queue_full", depth + files - AdmissionConfig.MAX_BATCH_JOBS,
+                         f"Batch queue is full ({depth} analyses waiting or running, {files} more requested)")
+        if load["client_batches"] >= AdmissionConfig.MAX_BATCHES_PER_CLIENT:
+            self._reject("batch", "client_limit", 1,
+                         f"Too many batches in progress for this client (limit {AdmissionConfig.MAX_BATCHES_PER_CLIENT})")
+        return client_id
+
+    def stats(self) -> Dict[str, Any]:
+        """Current lane depths, recent queue wait and run times, and rejections since start"""
+        with self._lock:
+            rejected = dict(self._rejected)
+        return {
+            "mode": WorkerConfig.MODE,
+            "workers": self._workers(),
+            "limits": {
+                "max_queue_depth": AdmissionConfig.MAX_QUEUE_DEPTH,
+                "max_batch_jobs": AdmissionConfig.MAX_BATCH_JOBS,
+                "max_per_client": AdmissionConfig.MAX_PER_CLIENT,
+                "max_batches_per_client": AdmissionConfig.MAX_BATCHES_PER_CLIENT
+            },
+            "load": self.job_store.load(),
+            "window_seconds": AdmissionConfig.STATS_WINDOW_SECONDS,
+            "timings": self._recent_timings(max_age=0),
+            "rejected": rejected
+        }
+
+    def _reject(self, lane: str, reason: str, ahead: int, detail: str):
+        retry_after = self._retry_after(lane, ahead)
+        with self._lock:
+            key = f"{lane}:{reason}"
+            self._rejected[key] = self._rejected.get(key, 0) + 1
+        logger.warning(f"🚦 Rejected {lane} upload ({reason}); retry after {retry_after}s")
+        raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(retry_after)})
+
+    def _retry_after(self, lane: str, ahead: int) -> int:
+        # `ahead` analyses have to finish first, run side by side by the lane's workers
+        run_avg = self._recent_timings()[lane]["run_avg"] or AdmissionConfig.DEFAULT_RUN_SECONDS
+        capacity = self._workers() if lane == "interactive" else self._batch_capacity()
+        seconds = math.ceil(max(ahead, 1) / capacity) * run_avg
+        return int(min(max(seconds, 1), AdmissionConfig.MAX_RETRY_AFTER_SECONDS))
+
+    def _recent_timings(self, max_age: float = 30.0) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            if self._timings is not None and now - self._timings_at < max_age:
+                return self._timings
+        timings = self.job_store.timings(now - AdmissionConfig.STATS_WINDOW_SECONDS)
+        with self._lock:
+            self._timings, self._timings_at = timings, now
+        return timings
+
+    @staticmethod
+    def _workers() -> int:
+        return max(1, WorkerConfig.POOL_SIZE if WorkerConfig.MODE == "pool" else WorkerConfig.INLINE_WORKERS)
+
+    def _batch_capacity(self) -> int:
+        workers = self._workers()
+        if workers > WorkerConfig.INTERACTIVE_WORKERS:
+            workers -= WorkerConfig.INTERACTIVE_WORKERS
+        return workers
+
+admission = AdmissionController(get_job_store())
@@ -0,0 +1,154 @@
+"""
+JSON responses for analysis results: encoded with orjson, compressed with
+brotli or gzip as the client accepts, and sent with a strong ETag. Clients
+keep the body and revalidate it with If-None-Match, which is answered with
+304 Not Modified without loading or encoding the result again.
+
+A result is stored gzip-compressed when its job completes (see
+JobStore.get_encoded_result), so serving it to a gzip client copies bytes.
+Everything else encoded here (brotli versions, projections, clause details)
+is kept in a per-process LRU keyed by etag and encoding.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Set, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+from src.config.settings import ResponseConfig
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip only
+    brotli = None
+
+# Kept by the client, but revalidated on every use
+CACHE_CONTROL = "private, no-cache"
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def etag_of(*parts: str) -> str:
+    """Etag of a representation derived from others (a projection of a result, say)"""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:32]
+
+class _EncodedCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Optional[str], bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[Tuple[Optional[str], bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple[str, str], entry: Tuple[Optional[str], bytes]):
+        if len(entry[1]) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[1])
+            self._entries[key] = entry
+            self._size += len(entry[1])
+            while self._size > self.max_bytes:
+                _, (_, body) = self._entries.popitem(last=False)
+                self._size -= len(body)
+
+_cache = _EncodedCache(ResponseConfig.ENCODED_CACHE_MB * 1024 * 1024)
+
+def stored_result_response(request: Request, etag: str, gzipped: bytes) -> Response:
+    """A result as stored by the job store (gzip-compressed JSON)"""
+    encoding = _negotiate(request)
+    not_modified = _not_modified(request, etag, encoding)
+    if not_modified is not None:
+        return not_modified
+
+    if encoding == "gzip":
+        return _response(etag, encoding, gzipped)
+    if encoding == "br":
+        cached = _cache.get((etag, "br"))
+        if cached is None:
+            cached = ("br", brotli.compress(gzip.decompress(gzipped), quality=ResponseConfig.BROTLI_QUALITY))
+            _cache.put((etag, "br"), cached)
+        return _response(etag, *cached)
+    return _response(etag, None, gzip.decompress(gzipped))
+
+def json_response(request: Request, etag: str, build: Callable[[], Any]) -> Response:
+    """
+    build() as JSON. `etag` has to change whenever build() would return
+    something else; build() is only called when no encoding of it is cached
+    """
+    encoding = _negotiate(request)
+    not_modified = _not_modified(request, etag, encoding)
+    if not_modified is not None:
+        return not_modified
+
+    key = (etag, encoding or "")
+    cached = _cache.get(key)
+    if cached is None:
+        body = dumps(build())
+        if len(body) < ResponseConfig.COMPRESS_MIN_BYTES or encoding is None:
+            cached = (None, body)
+        elif encoding == "br":
+            cached = ("br", brotli.compress(body, quality=ResponseConfig.BROTLI_QUALITY))
+        else:
+            cached = ("gzip", gzip.compress(body, compresslevel=ResponseConfig.GZIP_LEVEL, mtime=0))
+        _cache.put(key, cached)
+    return _response(etag, *cached)
+
+def _accepted_encodings(header: str) -> Set[str]:
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+def _negotiate(request: Request) -> Optional[str]:
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+def _tag(etag: str, encoding: Optional[str]) -> str:
+    # Each encoding of a result is a representation of its own
+    return f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+
+def _headers(etag: str, encoding: Optional[str]) -> dict:
+    return {"ETag": _tag(etag, encoding), "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+def _not_modified(request: Request, etag: str, encoding: Optional[str]) -> Optional[Response]:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        # Any encoding of the same content: the client decoded what it kept
+        if tag == "*" or tag.strip('"').split("-")[0] == etag:
+            return Response(status_code=304, headers=_headers(etag, encoding))
+    return None
+
+def _response(etag: str, encoding: Optional[str], body: bytes) -> Response:
+    headers = _headers(etag, encoding)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
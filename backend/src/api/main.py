@@ -6,7 +6,9 @@ import os
 import logging
 from dotenv import load_dotenv
 
-from src.api.routes import analysis, feedback, health, admin
+from src.api.routes import analysis, batch, feedback, health, admin
+from src.workers import start_embedded_pool, stop_embedded_pool
+from src.config.settings import WorkerConfig
 
 load_dotenv()
 is_production = os.getenv("ENVIRONMENT") == "production"
@@ -39,6 +41,7 @@ if os.path.exists("./uploads"):
     logger.info("Uploads directory mounted")
 
 app.include_router(analysis.router, prefix="/analyze", tags=["Analysis"])
+app.include_router(batch.router, prefix="/batch", tags=["Batch"])
 app.include_router(feedback.router, prefix="/feedback", tags=["Feedback"])
 app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 app.include_router(health.router, tags=["Health"])
@@ -58,10 +61,16 @@ async def global_exception_handler(request: Request, exc: Exception):
 async def startup_event():
     logger.info("🚀 Legality AI API started")
     logger.info(f"Environment: {'production' if is_production else 'development'}")
+    start_embedded_pool()
+    if WorkerConfig.MODE != "pool":
+        # Jobs still queued from before a restart, then any whose lease runs out
+        analysis.inline_runner.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("🛑 Legality AI API shutting down")
+    stop_embedded_pool()
+    analysis.close_analyzer()
 
 # ---------------- ROOT ----------------
 @app.get("/")
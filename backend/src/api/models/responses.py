@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class AnalysisResponse(BaseModel):
     analysis_id: str
@@ -12,6 +13,31 @@ class AnalysisStatusResponse(BaseModel):
     filename: str
     progress: int = Field(ge=0, le=100)
 
+class BatchResponse(BaseModel):
+    batch_id: str
+    status: str
+    message: str
+    total: int
+    reused: int
+    skipped: List[str] = []
+
+class BatchChildStatus(BaseModel):
+    analysis_id: str
+    filename: str
+    status: str
+    progress: int = Field(ge=0, le=100)
+    error: Optional[str] = None
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    status: str
+    total: int
+    completed: int
+    failed: int
+    processing: int
+    progress: int = Field(ge=0, le=100)
+    analyses: List[BatchChildStatus] = []
+
 class FeedbackResponse(BaseModel):
     feedback_id: str
     status: str
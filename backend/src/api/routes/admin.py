@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 from src.services.feedback_manager.feedback_manager import FeedbackManager
 from src.rag.vector_store import VectorStore
 from src.database import execute_query, get_db_connection
+from src.api.admission import admission
 
 load_dotenv()
 
@@ -194,6 +195,13 @@ def delete_verified_clause(id: int, admin: bool = Depends(verify_admin)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# --- Analysis Queue ---
+
+@router.get("/queue")
+def get_queue_stats(admin: bool = Depends(verify_admin)):
+    """Lane depths, queue wait and run times of recent analyses, and uploads refused, for sizing workers"""
+    return admission.stats()
+
 @router.get("/export/csv")
 def export_data(admin: bool = Depends(verify_admin)):
     """Export all feedback data as CSV"""
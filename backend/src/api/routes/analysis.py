@@ -1,107 +1,402 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from pathlib import Path
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any, List, Tuple, Optional
+import asyncio
+import json
+import threading
+import time
 import uuid
 import logging
 
+from src.api.admission import admission
+from src.api.json_responses import etag_of, json_response, stored_result_response
 from src.api.models.responses import AnalysisResponse, AnalysisStatusResponse
-from src.services.analyzer import ContractAnalyzer
+from src.services.analyzer import ContractAnalyzer, pipeline_fingerprint
+from src.services.revision_matcher import SnapshotStore
+from src.database.job_store import get_job_store
+from src.utils.upload_utils import UploadError, save_pdf_upload
+from src.workers import InlineRunner
+from src.config.settings import DocumentConfig, JobStoreConfig, WorkerConfig
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-analyzer = ContractAnalyzer()
-analysis_results = {}
+# Job status and results live in the job store, so every worker process sees
+# them. Identical uploads (same bytes, same pipeline settings) share one run.
+job_store = get_job_store()
+snapshots = SnapshotStore()
 
-@router.post("/upload", response_model=AnalysisResponse)
+_analyzer: Optional[ContractAnalyzer] = None
+_analyzer_lock = threading.Lock()
+
+def get_analyzer() -> ContractAnalyzer:
+    """The API's own analyzer for inline mode, built on first use; pool workers hold their own"""
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = ContractAnalyzer()
+        return _analyzer
+
+# Inline mode runs queued jobs in this process, WorkerConfig.INLINE_WORKERS at a time
+inline_runner = InlineRunner(get_analyzer, job_store)
+
+def close_analyzer():
+    """On shutdown: drain inline jobs, then release the analyzer's thread pools"""
+    global _analyzer
+    if not inline_runner.stop():
+        # Jobs were re-queued but their threads still use the analyzer
+        return
+    with _analyzer_lock:
+        if _analyzer is not None:
+            _analyzer.close()
+            _analyzer = None
+
+# The body is parsed by save_pdf_upload, so the form is described here for the docs
+UPLOAD_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "properties": {"file": {"type": "string", "format": "binary"}},
+            "required": ["file"]
+        }}}
+    }
+}
+
+@router.post("/upload", response_model=AnalysisResponse, openapi_extra=UPLOAD_FORM)
 async def upload_contract(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
+    request: Request,
+    force: bool = Query(False, description="Run a fresh analysis even if this file was already analyzed"),
+    base_analysis_id: Optional[str] = Query(None, description="Analysis of an earlier version of this contract; unchanged clauses reuse its verdicts")
 ):
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files supported")
+    if base_analysis_id:
+        # A duplicate upload has no snapshot of its own; use the job it attached to
+        base_entry = await run_in_threadpool(job_store.get, base_analysis_id) or {}
+        base_analysis_id = base_entry.get("alias_of") or base_analysis_id
+        if not await run_in_threadpool(snapshots.exists, base_analysis_id):
+            raise HTTPException(status_code=404, detail="Base analysis not found or not finished")
     
+    # Refused before the body is read when the queue or this client is at its limit
+    client_id = await run_in_threadpool(admission.admit_analysis, request)
     analysis_id = str(uuid.uuid4())
     
-    upload_dir = Path("./uploads")
-    upload_dir.mkdir(exist_ok=True)
-    file_path = upload_dir / f"{analysis_id}.pdf"
+    # The file is on disk before the job exists, so a pool worker never claims it early
+    try:
+        upload = await save_pdf_upload(request, DocumentConfig.UPLOAD_DIR.resolve(), analysis_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    file_path = upload.path
     
     try:
-        contents = await file.read()
-        with open(file_path, 'wb') as f:
-            f.write(contents)
+        dedup_key = f"{upload.sha256}:{pipeline_fingerprint()}"
         
-        analysis_results[analysis_id] = {
-            "status": "processing",
-            "filename": file.filename,
-            "file_path": str(file_path),
-            "progress": 0
-        }
+        # Revision runs report changes against their base, so they never share results.
+        # A reused upload is attached to the earlier job; status/results are read through it.
+        # New jobs wait in the queue for an inline thread or a pool worker.
+        # The store can wait on its write lock, so it runs off the event loop
+        source_id = await run_in_threadpool(
+            job_store.create,
+            analysis_id,
+            upload.filename,
+            file_path=str(file_path),
+            dedup_key=None if base_analysis_id else dedup_key,
+            reuse=not force and not base_analysis_id,
+            base_analysis_id=base_analysis_id,
+            client_id=client_id
+        )
         
-        background_tasks.add_task(run_analysis, analysis_id, file_path)
+        if source_id:
+            file_path.unlink(missing_ok=True)
+            status, _ = await run_in_threadpool(resolve_result, analysis_id)
+            logger.info(f"♻️ Duplicate upload {analysis_id} reuses analysis {source_id} ({status})")
+            return AnalysisResponse(
+                analysis_id=analysis_id,
+                status=status,
+                message=f"Identical contract already {'analyzed' if status == 'completed' else 'being analyzed'}; reusing that result",
+                filename=upload.filename
+            )
         
-        logger.info(f"✅ Analysis started: {analysis_id}")
+        if WorkerConfig.MODE != "pool":
+            inline_runner.wake()
+        logger.info(f"📥 Analysis queued: {analysis_id}")
         
         return AnalysisResponse(
             analysis_id=analysis_id,
             status="processing",
-            message=f"Analysis started for {file.filename}",
-            filename=file.filename
+            message=f"Analysis queued for {upload.filename}",
+            filename=upload.filename
         )
     except Exception as e:
         logger.error(f"❌ Upload failed: {e}")
+        await run_in_threadpool(job_store.delete, analysis_id)
+        file_path.unlink(missing_ok=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+def resolve_result(analysis_id: str, include_result: bool = False) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Status and entry for an analysis, following a duplicate upload to the job
+    it attached to; None if the analysis is unknown or has expired.
+    """
+    result = job_store.get(analysis_id, include_result=include_result)
+    if result is None:
+        return None
+    source_id = result.get("alias_of")
+    if not source_id:
+        return result["status"], result
+    
+    source = job_store.get(source_id, include_result=include_result)
+    if source is None:
+        return "failed", {**result, "error": "Original analysis is no longer available"}
+    
+    resolved = {**source, "filename": result["filename"]}
+    if source["status"] == "completed" and include_result:
+        data = source["data"]
+        resolved["data"] = {
+            **data,
+            "analysis_id": analysis_id,
+            "deduplicated_from": source_id,
+            "document": {**data.get("document", {}), "filename": result["filename"]}
+        }
+    return source["status"], resolved
+
 @router.get("/{analysis_id}/status", response_model=AnalysisStatusResponse)
 def get_status(analysis_id: str):
-    if analysis_id not in analysis_results:
+    resolved = resolve_result(analysis_id)
+    if resolved is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    result = analysis_results[analysis_id]
+    status, result = resolved
     
     return AnalysisStatusResponse(
         analysis_id=analysis_id,
-        status=result["status"],
+        status=status,
         filename=result.get("filename", ""),
         progress=result.get("progress", 0)
     )
 
-@router.get("/{analysis_id}/results")
-def get_results(analysis_id: str):
-    if analysis_id not in analysis_results:
+# Fields of each risky clause; "summary" picks the ones a results list needs
+CLAUSE_FIELDS = (
+    "chunk_id", "category", "section_path", "original_text", "risk_score", "risk_level",
+    "pessimist_analysis", "optimist_analysis", "arbiter_reasoning", "suggested_fix", "fix_comment",
+    "key_changes", "revision_status", "base_chunk_id", "previous_risk_score"
+)
+CLAUSE_SUMMARY_FIELDS = (
+    "chunk_id", "category", "section_path", "risk_score", "risk_level",
+    "revision_status", "base_chunk_id", "previous_risk_score"
+)
+
+def _field_list(value: Optional[str], allowed, name: str) -> Optional[List[str]]:
+    if not value:
+        return None
+    names = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in names if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {name}: {', '.join(unknown)} (allowed: {', '.join(allowed)})")
+    return names
+
+def _finished(resolved: Optional[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    if resolved is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    result = analysis_results[analysis_id]
+    status, result = resolved
     
-    if result["status"] == "processing":
+    if status == "processing":
         raise HTTPException(status_code=202, detail="Still processing")
     
-    if result["status"] == "failed":
+    if status == "failed":
         raise HTTPException(status_code=500, detail=result.get("error", "Analysis failed"))
     
-    return JSONResponse(content=result["data"])
+    return result
 
-def run_analysis(analysis_id: str, file_path: Path):
-    """Background task to run analysis"""
-    try:
-        logger.info(f"🔄 Starting analysis: {analysis_id}")
-        
-        analysis_results[analysis_id]["progress"] = 10
-        
-        results = analyzer.analyze_contract(file_path)
+def _completed_result(analysis_id: str) -> Dict[str, Any]:
+    return _finished(resolve_result(analysis_id, include_result=True))["data"]
+
+def _result_version(analysis_id: str) -> Tuple[str, str]:
+    """
+    The job holding a completed analysis' result and the etag of the result
+    as this analysis returns it, without loading it
+    """
+    entry = _finished(resolve_result(analysis_id))
+    source_id = entry["id"]
+    etag = entry["result_etag"]
+    if source_id != analysis_id:
+        # A duplicate upload returns the result under its own id and filename
+        etag = etag_of(etag, analysis_id, entry["filename"])
+    return source_id, etag
+
+@router.get("/{analysis_id}/results")
+def get_results(
+    analysis_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated top-level sections to return (e.g. document,summary,compound_risks); all by default"),
+    clause_fields: Optional[str] = Query(None, description="Comma-separated fields of each risky clause, or \"summary\"; all by default"),
+    offset: int = Query(0, ge=0, description="First risky clause to return"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Risky clauses per page; all by default"),
+    sort: str = Query("document", pattern="^(document|risk)$", description="Risky clauses in document order or highest risk first")
+):
+    """
+    The analysis result; without parameters, all of it. A dashboard can ask
+    for the summary sections first and then pages of risky clauses with only
+    the fields it shows; one clause's debate is at /clauses/{chunk_id}.
+    With limit or offset, "page" gives offset, limit and the clause total.
+    
+    Responses carry a strong ETag; If-None-Match gets 304 when unchanged.
+    """
+    source_id, etag = _result_version(analysis_id)
+    
+    if not fields and not clause_fields and limit is None and not offset and sort == "document":
+        if source_id == analysis_id:
+            encoded = job_store.get_encoded_result(source_id)
+            if encoded is None:
+                raise HTTPException(status_code=404, detail="Analysis not found")
+            return stored_result_response(request, *encoded)
+        return json_response(request, etag, lambda: _completed_result(analysis_id))
+    
+    def project() -> Dict[str, Any]:
+        data = _completed_result(analysis_id)
+        sections = _field_list(fields, tuple(data.keys()), "fields")
+        if clause_fields == "summary":
+            clause_names = list(CLAUSE_SUMMARY_FIELDS)
+        else:
+            clause_names = _field_list(clause_fields, CLAUSE_FIELDS, "clause_fields")
         
-        analysis_results[analysis_id].update({
-            "status": "completed",
-            "progress": 100,
-            "data": results
-        })
+        projected = {key: data[key] for key in (sections or data.keys())}
+        if "risky_clauses" in projected:
+            clauses = data["risky_clauses"]
+            if sort == "risk":
+                clauses = sorted(clauses, key=lambda c: -c["risk_score"])
+            page = clauses[offset:offset + limit if limit else None]
+            if clause_names is not None:
+                page = [{name: clause[name] for name in clause_names if name in clause} for clause in page]
+            projected["risky_clauses"] = page
+            if limit is not None or offset:
+                projected["page"] = {"offset": offset, "limit": limit, "total": len(clauses)}
+        return projected
+    
+    query = f"fields={fields or ''}&clause_fields={clause_fields or ''}&offset={offset}&limit={limit}&sort={sort}"
+    return json_response(request, etag_of(etag, query), project)
+
+@router.get("/{analysis_id}/clauses/{chunk_id}")
+def get_clause(analysis_id: str, chunk_id: str, request: Request):
+    """
+    One risky clause with all its fields, plus the full debate when the
+    analysis snapshot is still kept: the Pessimist's concerns, the
+    Optimist's context and mitigating factors, the Arbiter's key factors,
+    the extracted parameters and the precedents consulted
+    """
+    # A duplicate upload's snapshot is the one of the job it attached to
+    source_id, etag = _result_version(analysis_id)
+    has_snapshot = snapshots.exists(source_id)
+    
+    def clause_details() -> Dict[str, Any]:
+        data = _completed_result(analysis_id)
+        clause = next((c for c in data["risky_clauses"] if c["chunk_id"] == chunk_id), None)
+        if clause is None:
+            raise HTTPException(status_code=404, detail="Clause not found in this analysis")
         
-        logger.info(f"✅ Analysis complete: {analysis_id}")
+        verdict = snapshots.get_chunk(source_id, chunk_id) if has_snapshot else None
+        analysis = verdict.analysis if verdict else None
+        debate = None
+        if analysis:
+            debate = {
+                "pessimist": analysis.pessimist_analysis.model_dump() if analysis.pessimist_analysis else None,
+                "optimist": analysis.optimist_analysis.model_dump() if analysis.optimist_analysis else None,
+                "arbiter": analysis.arbiter_verdict.model_dump() if analysis.arbiter_verdict else None,
+                "extracted_parameters": analysis.extracted_parameters.model_dump() if analysis.extracted_parameters else None,
+                "safe_precedents_used": analysis.safe_precedents_used,
+                "risky_precedents_used": analysis.risky_precedents_used
+            }
+        return {**clause, "debate": debate}
+    
+    # The debate goes once the snapshot is pruned, so the etag follows it
+    return json_response(request, etag_of(etag, "clause", chunk_id, str(has_snapshot)), clause_details)
+
+async def event_feed(analysis_id: str, last_event_id: int = 0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Events of an analysis after last_event_id, ending with its final status
+    event. Yields None when nothing happened for EVENT_KEEPALIVE_SECONDS, so
+    the caller can keep the connection alive.
+    """
+    entry = await run_in_threadpool(job_store.get, analysis_id)
+    if entry is None:
+        # Expired or purged since the caller looked it up
+        yield {"id": last_event_id, "type": "status", "data": {"status": "failed", "error": "Analysis not found"}}
+        return
+    # A duplicate upload follows the job it attached to
+    job_id = entry.get("alias_of") or analysis_id
+    idle_since = time.time()
+    
+    while True:
+        events = await run_in_threadpool(job_store.events_since, job_id, last_event_id)
+        for event in events:
+            last_event_id = event["id"]
+            yield event
+            if event["type"] == "status":
+                return
         
-    except Exception as e:
-        logger.error(f"❌ Analysis failed: {analysis_id} - {e}")
-        analysis_results[analysis_id].update({
-            "status": "failed",
-            "error": str(e)
-        })
\ No newline at end of file
+        if events:
+            idle_since = time.time()
+        else:
+            job = await run_in_threadpool(job_store.get, job_id)
+            if job is None or job["status"] in ("completed", "failed"):
+                # Finished before events were recorded, or expired meanwhile
+                yield {
+                    "id": last_event_id,
+                    "type": "status",
+                    "data": {"status": job["status"] if job else "failed", "error": job and job.get("error")}
+                }
+                return
+            if time.time() - idle_since >= JobStoreConfig.EVENT_KEEPALIVE_SECONDS:
+                idle_since = time.time()
+                yield None
+        await asyncio.sleep(JobStoreConfig.EVENT_POLL_INTERVAL_SECONDS)
+
+def _last_event_id(header: Optional[str], query: Optional[int]) -> int:
+    if query is not None:
+        return query
+    return int(header) if header and header.isdigit() else 0
+
+@router.get("/{analysis_id}/events")
+async def stream_events(
+    analysis_id: str,
+    request: Request,
+    last_event_id: Optional[int] = Query(None, description="Resume after this event (EventSource sends the Last-Event-ID header)")
+):
+    """
+    Server-Sent Events: "progress" (overall percentage and per-stage counts),
+    "clause" (a risky clause as soon as its fix is ready), "restart" (the job
+    is being retried; drop earlier clauses) and a final "status"
+    """
+    if await run_in_threadpool(job_store.get, analysis_id) is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    start_after = _last_event_id(request.headers.get("last-event-id"), last_event_id)
+    
+    async def body():
+        async for event in event_feed(analysis_id, start_after):
+            if await request.is_disconnected():
+                return
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/{analysis_id}/ws")
+async def events_socket(websocket: WebSocket, analysis_id: str, last_event_id: int = 0):
+    """The same events as /events, one JSON message ({id, type, data}) each"""
+    await websocket.accept()
+    if await run_in_threadpool(job_store.get, analysis_id) is None:
+        await websocket.close(code=4404, reason="Analysis not found")
+        return
+    try:
+        async for event in event_feed(analysis_id, last_event_id):
+            await websocket.send_json(event if event is not None else {"type": "keep-alive"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,154 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Iterator
+import uuid
+import logging
+
+from src.api.admission import admission
+from src.api.json_responses import dumps
+from src.api.models.responses import BatchResponse, BatchStatusResponse, BatchChildStatus
+from src.api.routes.analysis import job_store, inline_runner, resolve_result
+from src.services.analyzer import pipeline_fingerprint
+from src.utils.upload_utils import UploadError, save_batch_upload
+from src.config.settings import DocumentConfig, WorkerConfig
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# The body is parsed by save_batch_upload, so the form is described here for the docs
+BATCH_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+            "required": ["files"]
+        }}}
+    }
+}
+
+@router.post("/upload", response_model=BatchResponse, openapi_extra=BATCH_FORM)
+async def upload_batch(
+    request: Request,
+    force: bool = Query(False, description="Run fresh analyses even for files that were already analyzed")
+):
+    """
+    Many contracts at once, as several PDF files and/or ZIP archives of PDFs.
+    Each file becomes an analysis of its own (identical files share one);
+    the batch runs at most BatchConfig.CONCURRENCY of them at a time.
+    """
+    client_id = await run_in_threadpool(admission.admit_batch, request)
+    try:
+        batch = await save_batch_upload(request, DocumentConfig.UPLOAD_DIR.resolve())
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    if not batch.files:
+        raise HTTPException(status_code=400, detail="No PDF files in the upload: " + "; ".join(batch.skipped[:20]))
+    try:
+        await run_in_threadpool(admission.admit_batch, request, len(batch.files))
+    except HTTPException:
+        for upload in batch.files:
+            upload.path.unlink(missing_ok=True)
+        raise
+
+    batch_id = str(uuid.uuid4())
+    fingerprint = pipeline_fingerprint()
+    reused = 0
+
+    jobs = [
+        {"id": upload.path.stem, "filename": upload.filename, "file_path": str(upload.path),
+         "dedup_key": f"{upload.sha256}:{fingerprint}"}
+        for upload in batch.files
+    ]
+    try:
+        # One transaction, off the event loop: no worker sees a half-created batch
+        source_ids = await run_in_threadpool(
+            job_store.create_batch_jobs, batch_id, jobs, reuse=not force, client_id=client_id
+        )
+    except Exception as e:
+        logger.error(f"❌ Batch upload failed: {e}")
+        for upload in batch.files:
+            upload.path.unlink(missing_ok=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    for upload, source_id in zip(batch.files, source_ids):
+        if source_id:
+            upload.path.unlink(missing_ok=True)
+            reused += 1
+
+    if WorkerConfig.MODE != "pool":
+        inline_runner.wake()
+    logger.info(f"📦 Batch {batch_id}: {len(batch.files)} contracts ({reused} already analyzed), {len(batch.skipped)} skipped")
+
+    return BatchResponse(
+        batch_id=batch_id,
+        status="processing",
+        message=f"Batch of {len(batch.files)} contracts queued",
+        total=len(batch.files),
+        reused=reused,
+        skipped=batch.skipped
+    )
+
+@router.get("/{batch_id}/status", response_model=BatchStatusResponse)
+def get_batch_status(batch_id: str, include_analyses: bool = Query(True, description="List every analysis in the batch")):
+    batch = job_store.get_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    jobs = job_store.batch_jobs(batch_id)
+    counts = {"completed": 0, "failed": 0, "processing": 0}
+    for job in jobs:
+        counts[job["status"]] += 1
+    # Analyses that expired count as done
+    finished = batch["total"] - counts["processing"]
+    progress = (sum(job["progress"] for job in jobs) + 100 * (batch["total"] - len(jobs))) // max(batch["total"], 1)
+
+    return BatchStatusResponse(
+        batch_id=batch_id,
+        status="processing" if counts["processing"] else "completed",
+        total=batch["total"],
+        completed=counts["completed"],
+        failed=counts["failed"],
+        processing=counts["processing"],
+        progress=100 if finished == batch["total"] else min(progress, 99),
+        analyses=[
+            BatchChildStatus(
+                analysis_id=job["id"],
+                filename=job["filename"],
+                status=job["status"],
+                progress=job["progress"],
+                error=job["error"]
+            )
+            for job in jobs
+        ] if include_analyses else []
+    )
+
+@router.get("/{batch_id}/results")
+def get_batch_results(batch_id: str):
+    """
+    NDJSON, one line per analysis in upload order: analysis_id, filename,
+    status and the full result (completed) or error (failed). Analyses still
+    running are listed without a result, so the download can be taken at any
+    time and repeated later.
+    """
+    if job_store.get_batch(batch_id) is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    def lines() -> Iterator[bytes]:
+        # One result in memory at a time
+        for job in job_store.batch_jobs(batch_id):
+            resolved = resolve_result(job["id"], include_result=True)
+            status, entry = resolved if resolved else ("failed", {"error": "Analysis expired"})
+            line = {"analysis_id": job["id"], "filename": job["filename"], "status": status}
+            if status == "completed":
+                line["result"] = entry["data"]
+            elif status == "failed":
+                line["error"] = entry.get("error") or "Analysis failed"
+            yield dumps(line) + b"\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="batch-{batch_id}.ndjson"'}
+    )
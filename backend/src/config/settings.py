@@ -35,6 +35,15 @@ class ChunkingConfig:
     
     SENTENCE_ENDINGS = ['.', '!', '?', ';']
 
+    # Streaming mode: similarities around each candidate breakpoint that its
+    # percentile threshold is computed over
+    STREAM_PERCENTILE_WINDOW = 128
+
+    # "semantic": breakpoints from sentence similarity alone. "structure":
+    # split at section numbering/headings first, then semantically inside
+    # sections longer than MAX_CHUNK_LENGTH
+    MODE = os.getenv("CHUNKING_MODE", "semantic")
+
 # RAG FILTERING THRESHOLDS (3-Zone Logic)
 class RAGThresholds:
     NOISE_THRESHOLD = 0.44
@@ -43,11 +52,144 @@ class RAGThresholds:
 
     PARAM_MISMATCH_THRESHOLD = 0.20  
 
+# ANALYSIS PIPELINE
+class AnalysisConfig:
+    # Arbiter risk_score at or above which a clause is reported and gets a fix
+    REPORT_THRESHOLD = 50
+    
+    # Stream Arbiter verdicts so a clause is dropped (or its fix started) as soon
+    # as risk_score arrives, without waiting for the reasoning text
+    STREAM_ARBITER = True
+    
+    # Fix generation for reported clauses overlaps with the next chunk's debate
+    FIX_WORKERS = 2
+    TEMPLATE_PREFETCH_WORKERS = 2
+    
+    # Feed chunks to detection and debate as pages are extracted instead of
+    # waiting for the whole document (DocumentProcessor.process_stream)
+    STREAM_DOCUMENT = True
+    
+    # Per-chunk verdicts of every analysis are kept so a revised version of the
+    # contract (upload with base_analysis_id) only debates what changed
+    SNAPSHOT_DIR = Path(os.getenv("ANALYSIS_SNAPSHOT_DIR", BASE_DIR.parent / "data" / "analysis_snapshots"))
+    SNAPSHOT_MAX_MB = int(os.getenv("ANALYSIS_SNAPSHOT_MAX_MB", 200))
+    
+    # A changed chunk is paired with the base clause it revises when their
+    # embeddings are this close and enough of the wording survives
+    REVISION_MATCH_SIMILARITY = 0.80
+    REVISION_MIN_TEXT_RATIO = 0.5
+    
+    # How far one analysis may grow the process RSS (MB) before it is stopped
+    # with MemoryLimitExceeded; 0 disables the check
+    MAX_ANALYSIS_RSS_MB = int(os.getenv("MAX_ANALYSIS_RSS_MB", 2048))
+
+# ANALYSIS JOBS
+class JobStoreConfig:
+    # Status, progress and results of analysis jobs, shared by every API
+    # worker process; "sqlite" is the only backend so far
+    BACKEND = os.getenv("JOB_STORE_BACKEND", "sqlite")
+    DB_PATH = Path(os.getenv("JOB_STORE_PATH", BASE_DIR.parent / "data" / "jobs.db"))
+    
+    # Finished jobs (and their results) are deleted this long after they end
+    RESULT_TTL_HOURS = float(os.getenv("JOB_RESULT_TTL_HOURS", 24))
+    PURGE_INTERVAL_SECONDS = 300
+    
+    # Finished jobs kept decoded in each process, most recently read first
+    HOT_CACHE_SIZE = int(os.getenv("JOB_HOT_CACHE_SIZE", 32))
+    
+    # WAL needs shared memory between the processes using the file, which a
+    # network volume does not give; nodes sharing jobs.db over one use "DELETE"
+    JOURNAL_MODE = os.getenv("JOB_STORE_JOURNAL_MODE", "WAL")
+    
+    # Progress events are written at most this often per job (stage totals
+    # are carried in every event, so skipped ones lose nothing). The event
+    # stream endpoints check the store this often and send a keep-alive
+    # when idle for EVENT_KEEPALIVE_SECONDS
+    PROGRESS_EVENT_INTERVAL_SECONDS = 0.5
+    EVENT_POLL_INTERVAL_SECONDS = 0.5
+    EVENT_KEEPALIVE_SECONDS = 15
+
+class WorkerConfig:
+    # "inline": the API process runs queued analyses itself, INLINE_WORKERS
+    # at a time. "pool": the API only queues jobs in the job store and a
+    # WorkerPool of POOL_SIZE processes runs them, started with the API when
+    # POOL_EMBEDDED is set, otherwise on its own with `python run_worker.py`
+    MODE = os.getenv("ANALYSIS_WORKER_MODE", "inline")
+    INLINE_WORKERS = int(os.getenv("ANALYSIS_INLINE_WORKERS", 2))
+    POOL_EMBEDDED = os.getenv("ANALYSIS_POOL_EMBEDDED", "true").lower() == "true"
+    POOL_SIZE = int(os.getenv("ANALYSIS_WORKERS", 2))
+    
+    # Of the inline threads / pool processes, this many only take single
+    # uploads (the interactive lane), so batches never hold every worker.
+    # Ignored when there are no more workers than this
+    INTERACTIVE_WORKERS = int(os.getenv("ANALYSIS_INTERACTIVE_WORKERS", 1))
+    
+    # Idle workers check the queue this often
+    POLL_INTERVAL_SECONDS = 1.0
+    
+    # On shutdown, workers finish their current job for up to this long;
+    # jobs still running after that are re-queued for the next start
+    DRAIN_TIMEOUT_SECONDS = int(os.getenv("ANALYSIS_DRAIN_TIMEOUT", 600))
+    
+    # A claimed job is leased to its worker, which renews the lease every
+    # LEASE_SECONDS / 3 while it runs. A job whose lease ran out (its node
+    # died or lost the store) is claimed again by any worker, on any node;
+    # after MAX_ATTEMPTS claims it is failed instead of retried
+    LEASE_SECONDS = int(os.getenv("ANALYSIS_LEASE_SECONDS", 60))
+    MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", 3))
+
+class BatchConfig:
+    # POST /batch/upload takes up to MAX_FILES PDFs, directly or in ZIP
+    # archives, in one body of at most MAX_UPLOAD_MB
+    MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 500))
+    MAX_UPLOAD_MB = int(os.getenv("BATCH_MAX_UPLOAD_MB", 2048))
+    
+    # Children of one batch running at once, whatever the number of workers,
+    # so a large batch leaves room for other uploads and batches
+    CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 2))
+
+class AdmissionConfig:
+    # Analyses waiting or running, per lane, beyond which uploads get 429 +
+    # Retry-After: single uploads (interactive) and batch children. Checked
+    # before the body is read, so uploads being received when a limit is hit
+    # can overshoot it by their number
+    MAX_QUEUE_DEPTH = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", 20))
+    MAX_BATCH_JOBS = int(os.getenv("ADMISSION_MAX_BATCH_JOBS", 2000))
+    
+    # Unfinished single uploads and unfinished batches per client. Clients
+    # are told apart by their address. Set CLIENT_HEADER only behind a proxy
+    # or auth layer that sets that header itself (a user or API key id):
+    # clients could otherwise send a new value with every upload
+    MAX_PER_CLIENT = int(os.getenv("ADMISSION_MAX_PER_CLIENT", 4))
+    MAX_BATCHES_PER_CLIENT = int(os.getenv("ADMISSION_MAX_BATCHES_PER_CLIENT", 2))
+    CLIENT_HEADER = os.getenv("ADMISSION_CLIENT_HEADER", "")
+    
+    # Retry-After is estimated from the run time of recent analyses
+    # (STATS_WINDOW_SECONDS); DEFAULT_RUN_SECONDS until there are any
+    STATS_WINDOW_SECONDS = 3600
+    DEFAULT_RUN_SECONDS = 60
+    MAX_RETRY_AFTER_SECONDS = 600
+
+# RESULT RESPONSES
+class ResponseConfig:
+    # Results are encoded once, when their job completes, and stored gzip
+    # compressed; clients accepting gzip get the stored bytes as they are.
+    # Brotli is preferred when the package is installed and the client
+    # accepts it. Other responses under COMPRESS_MIN_BYTES are sent plain
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", 5))
+    COMPRESS_MIN_BYTES = 1024
+    
+    # Encoded bodies (brotli results, projections, clause details) kept in
+    # memory per process, most recently sent first
+    ENCODED_CACHE_MB = int(os.getenv("RESPONSE_CACHE_MB", 64))
+
 # LLM CONFIGURATION (Primary + Fallback)
 class LLMConfig:
     # 1. PRIMARY PROVIDER (Groq - Speed)
     API_KEY = os.getenv("GROQ_API_KEY") 
-    BASE_URL = "https://api.groq.com/openai/v1"
+    # Overridable so benchmarks can point at benchmarks/llm_replay_server.py
+    BASE_URL = os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1")
     
     MODELS = {
         "fast": ["llama-3.1-8b-instant", "mixtral-8x7b-32768"],
@@ -58,7 +200,7 @@ class LLMConfig:
     # 2. FALLBACK PROVIDER (OpenRouter - Reliability)
     ENABLE_FALLBACK = True
     FALLBACK_API_KEY = os.getenv("OPENROUTER_API_KEY")
-    FALLBACK_BASE_URL = "https://openrouter.ai/api/v1"
+    FALLBACK_BASE_URL = os.getenv("LLM_FALLBACK_BASE_URL", "https://openrouter.ai/api/v1")
     
     FALLBACK_MODELS = {
         "fast": ["openai/gpt-4o-mini", "meta-llama/llama-3.1-8b-instruct"],
@@ -69,6 +211,63 @@ class LLMConfig:
     MAX_RETRIES = 2
     RETRY_DELAY = 1
     TIMEOUT = 30
+    
+    # Provider calls in flight per process (0: no limit). While all are busy,
+    # waiting calls are shared fairly between analyses and tenants, and
+    # analyses of up to SJF_MAX_PAGES pages get SJF_BOOST times the share of
+    # larger ones (src/core/llm_scheduler.py)
+    MAX_CONCURRENT_CALLS = int(os.getenv("LLM_MAX_CONCURRENT_CALLS", 4))
+    SJF_MAX_PAGES = int(os.getenv("LLM_SJF_MAX_PAGES", 20))
+    SJF_BOOST = float(os.getenv("LLM_SJF_BOOST", 4.0))
+
+# PROMPT TOKEN BUDGETS
+class TokenBudgetConfig:
+    # tiktoken encoding per model family (matched as a substring of the model name).
+    # Llama 3 ships a 128k tiktoken BPE that counts within a few % of cl100k_base.
+    FAMILY_ENCODINGS = {
+        "gpt-4o": "o200k_base",
+        "gpt": "cl100k_base",
+        "llama": "cl100k_base",
+        "default": "cl100k_base"
+    }
+    
+    TOKENS_PER_MESSAGE = 4
+    
+    # Precedents sharing this fraction of 5-word shingles with a kept one are dropped
+    PRECEDENT_OVERLAP_THRESHOLD = 0.6
+    
+    # Token budget for the variable parts of each prompt. Sections are filled in
+    # order up to their cap; the first max_precedents distinct precedents share
+    # whatever is left.
+    CALL_BUDGETS = {
+        "pessimist": {
+            "total": 800,
+            "sections": {"clause_text": 400, "parameters": 80},
+            "precedent_cap": 120,
+            "max_precedents": 3
+        },
+        "optimist": {
+            "total": 1000,
+            "sections": {"clause_text": 400, "pessimist_argument": 300, "parameters": 80},
+            "precedent_cap": 120,
+            "max_precedents": 3
+        },
+        "arbiter": {
+            "total": 1200,
+            "sections": {
+                "clause_text": 400,
+                "pessimist_argument": 300,
+                "optimist_argument": 300,
+                "parameters": 80
+            }
+        },
+        "fix": {
+            "total": 1500,
+            "sections": {"clause_text": 600, "risk_summary": 100},
+            "precedent_cap": 250,
+            "max_precedents": 3
+        }
+    }
 
 # LANGFUSE OBSERVABILITY
 class LangfuseConfig:
@@ -81,11 +280,67 @@ class LangfuseConfig:
 class DocumentConfig:
     SUPPORTED_FORMATS = [".pdf"]
     
-    # Maximum file size (100 MB)
-    MAX_FILE_SIZE = 100 * 1024 * 1024
+    # Maximum upload size (100 MB), enforced while the upload streams in
+    MAX_FILE_SIZE = int(os.getenv("MAX_UPLOAD_MB", 100)) * 1024 * 1024
+    
+    # Uploaded PDFs wait here for analysis; with workers on several nodes this
+    # must be a volume they all mount, like the job store
+    UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
     
     PDF_EXTRACTOR = "hybrid" 
     
+    # Page extraction runs across worker processes for documents with at least
+    # PARALLEL_MIN_PAGES pages; below that the pool overhead outweighs the gain
+    EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+    PARALLEL_MIN_PAGES = 8
+
+    # Pages go to pdfplumber only when PyMuPDF's layout hints at a table:
+    # a row with this many side-by-side text blocks, or this many ruling lines
+    LAYOUT_ROW_MIN_BLOCKS = 3
+    LAYOUT_MIN_RULINGS = 6
+
+    # Stage 1 output cached on disk by file content hash; a re-upload of the
+    # same bytes skips extraction, OCR and chunking
+    CACHE_ENABLED = os.getenv("DOCUMENT_CACHE_ENABLED", "true").lower() == "true"
+    CACHE_DIR = Path(os.getenv("DOCUMENT_CACHE_DIR", BASE_DIR.parent / "data" / "document_cache"))
+    CACHE_MAX_MB = int(os.getenv("DOCUMENT_CACHE_MAX_MB", 500))
+
+    # Streaming mode extracts (and OCRs) this many pages at a time before
+    # handing them to the chunker
+    STREAM_WINDOW_PAGES = 4
+
+    # Large-document mode, for streamed documents of at least this many pages:
+    # chunks are offsets into one TextBuffer instead of copies of their text,
+    # the buffer moves to a memory-mapped file past TEXT_BUFFER_SPILL_CHARS,
+    # and per-chunk results are written to SPILL_DIR until the analysis ends
+    LARGE_DOCUMENT_PAGES = int(os.getenv("LARGE_DOCUMENT_PAGES", 300))
+    TEXT_BUFFER_SPILL_CHARS = int(os.getenv("TEXT_BUFFER_SPILL_CHARS", 2_000_000))
+    SPILL_DIR = Path(os.getenv("SPILL_DIR", BASE_DIR.parent / "data" / "spill"))
+
+    # A page with fewer characters than this that carries an image is treated
+    # as scanned and OCR'd on its own; digital pages in the same file are not
+    OCR_MIN_PAGE_CHARS = 50
+
+    # Render DPI is chosen per page from a thumbnail so a text line comes out
+    # about OCR_TARGET_LINE_PX tall: small print gets more pixels, large print
+    # fewer (tesseract time grows with image size)
+    OCR_THUMB_DPI = 48
+    OCR_TARGET_LINE_PX = 32
+    OCR_MIN_DPI = 150
+    OCR_MAX_DPI = 400
+    OCR_MAX_SKEW_DEGREES = 5
+
+    # OCR text is cached in SQLite by a hash of the full page render. Pages
+    # OCR'd more than OCR_CACHE_TTL_DAYS ago are dropped, then the oldest
+    # beyond OCR_CACHE_MAX_PAGES; checked at most every PRUNE_INTERVAL
+    OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+    OCR_CACHE_TTL_DAYS = float(os.getenv("OCR_CACHE_TTL_DAYS", 30))
+    OCR_CACHE_MAX_PAGES = int(os.getenv("OCR_CACHE_MAX_PAGES", 50000))
+    OCR_CACHE_PRUNE_INTERVAL_SECONDS = 600
+
+    # Pages are rendered one at a time; at most 2 * OCR_WORKERS images are in memory
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+
     # Metadata extraction patterns
     METADATA_PATTERNS = {
         "date": r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b",
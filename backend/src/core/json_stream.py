@@ -0,0 +1,103 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+_INVALID = object()
+
+
+class IncrementalJSONParser:
+    """
+    Feeds streamed LLM output and reports top-level fields of a JSON object as
+    soon as each value is complete, e.g. `risk_score` long before `reasoning`
+    has finished streaming. Text before the first '{' (such as a ```json fence)
+    is skipped. Nested values are reported once their closing bracket arrives.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._expecting = "key"  # key | colon | value | string | nested | scalar | comma
+        self._key = None
+        self._token_start = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the (key, value) pairs completed by it."""
+        self.buffer += chunk
+        completed = []
+
+        while self._pos < len(self.buffer) and not self.done:
+            i = self._pos
+            c = self.buffer[i]
+            self._pos += 1
+
+            if not self._started:
+                if c == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expecting == "key_string":
+                        self._key = self._decode(self._token_start, i + 1)
+                        self._expecting = "colon"
+                    elif self._depth == 1 and self._expecting == "string":
+                        self._emit(self._decode(self._token_start, i + 1), completed)
+                continue
+
+            if self._expecting == "scalar" and (c in ",}" or c.isspace()):
+                self._emit(self._decode(self._token_start, i), completed)
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expecting == "key":
+                    self._token_start = i
+                    self._expecting = "key_string"
+                elif self._depth == 1 and self._expecting == "value":
+                    self._token_start = i
+                    self._expecting = "string"
+            elif c in "{[":
+                if self._depth == 1 and self._expecting == "value":
+                    self._token_start = i
+                    self._expecting = "nested"
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._expecting == "nested":
+                    self._emit(self._decode(self._token_start, i + 1), completed)
+                elif self._depth == 0:
+                    self.done = True
+            elif self._depth == 1:
+                if c == ":" and self._expecting == "colon":
+                    self._expecting = "value"
+                elif c == "," and self._expecting == "comma":
+                    self._expecting = "key"
+                elif self._expecting == "value" and not c.isspace():
+                    self._token_start = i
+                    self._expecting = "scalar"
+
+        return completed
+
+    def _decode(self, start: int, end: int) -> Any:
+        try:
+            return json.loads(self.buffer[start:end])
+        except json.JSONDecodeError:
+            return _INVALID
+
+    def _emit(self, value: Any, completed: List[Tuple[str, Any]]):
+        self._expecting = "comma"
+        if self._key is not None and value is not _INVALID:
+            self.fields[self._key] = value
+            completed.append((self._key, value))
+        self._key = None
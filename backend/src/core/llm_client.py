@@ -1,12 +1,17 @@
 import time
 import json
-from typing import List, Dict, Any, Optional, Type, TypeVar
+import threading
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional, Type, TypeVar, Callable
 from pydantic import BaseModel
 import openai
 from langfuse import Langfuse
 from langfuse import observe
 
 from src.config.settings import LLMConfig, LangfuseConfig
+from src.core.token_budget import get_counter_for_model_type, get_budget_stats
+from src.core.json_stream import IncrementalJSONParser
+from src.core.llm_scheduler import get_llm_scheduler
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,6 +22,21 @@ class InsufficientCreditsError(Exception):
     """Raised when the request exceeds the affordable token budget."""
     pass
 
+class StreamAborted(Exception):
+    """Raised when an on_field callback stops a streamed completion early."""
+    def __init__(self, fields: Dict[str, Any], partial_text: str):
+        super().__init__("Stream aborted by field callback")
+        self.fields = fields
+        self.partial_text = partial_text
+
+# Called with (field_name, value) as each top-level JSON field completes.
+# Returning False stops the stream and raises StreamAborted.
+FieldCallback = Callable[[str, Any], Optional[bool]]
+
+# Timing of the last streamed call made in this context: the client is shared
+# by concurrent analyses, each reading back the timing of its own call
+_last_stream_timing: ContextVar[Optional[Dict[str, Any]]] = ContextVar("last_stream_timing", default=None)
+
 class LLMClient:
     
     def __init__(self):
@@ -47,9 +67,26 @@ class LLMClient:
             except Exception as e:
                 logger.warning(f"⚠️ Langfuse init failed: {e}")
         
+        # Shared by all clients in the process: it owns the provider concurrency
+        self.scheduler = get_llm_scheduler()
+        
+        # Counters are bumped from debate, fix and prefetch threads at once
+        self._stats_lock = threading.Lock()
         self.call_count = 0
         self.total_cost = 0.0
         self.affordable_tokens = 10000 
+        
+        self.streamed_calls = 0
+        self.aborted_streams = 0
+    
+    @property
+    def last_stream_timing(self) -> Optional[Dict[str, Any]]:
+        """Field timings of the last streamed call made by this thread / context"""
+        return _last_stream_timing.get()
+    
+    @last_stream_timing.setter
+    def last_stream_timing(self, timing: Optional[Dict[str, Any]]):
+        _last_stream_timing.set(timing)
     
     @observe(name="LLM Call")
     def get_completion(
@@ -57,11 +94,16 @@ class LLMClient:
         messages: List[Dict[str, str]],
         model_type: str = "fast",
         temperature: float = 0.3,
-        max_tokens: int = 800
+        max_tokens: int = 800,
+        on_field: Optional[FieldCallback] = None
     ) -> str:
+        """
+        Run the primary -> fallback model chain. With on_field the completion is
+        streamed and top-level JSON fields are reported as soon as they parse.
+        """
         
         # --- PRE-FLIGHT CHECK ---
-        estimated_prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 3
+        estimated_prompt_tokens = get_counter_for_model_type(model_type).count_messages(messages)
         if (estimated_prompt_tokens + max_tokens) > self.affordable_tokens:
             raise InsufficientCreditsError("Request exceeds token safety limit.")
         # ------------------------
@@ -70,11 +112,19 @@ class LLMClient:
         primary_models = LLMConfig.MODELS.get(model_type, LLMConfig.MODELS["fast"])
         last_error = None
         
+        def execute(client, model):
+            with self.scheduler.slot(estimated_prompt_tokens + max_tokens):
+                if on_field:
+                    return self._execute_stream(client, model, messages, temperature, max_tokens, on_field)
+                return self._execute_call(client, model, messages, temperature, max_tokens)
+        
         # 1. Attempt Primary Provider
         for model in primary_models:
             try:
                 logger.debug(f"🔄 Trying Primary: {model}")
-                return self._execute_call(self.client, model, messages, temperature, max_tokens)
+                return execute(self.client, model)
+            except StreamAborted:
+                raise
             except Exception as e:
                 logger.warning(f"⚠️ Primary {model} failed: {str(e)[:100]}")
                 last_error = e
@@ -90,7 +140,9 @@ class LLMClient:
                 try:
                     logger.debug(f"🛡️ Trying Fallback: {model}")
                     # Add provider prefix for OpenRouter if needed, usually handled by client base_url
-                    return self._execute_call(self.fallback_client, model, messages, temperature, max_tokens)
+                    return execute(self.fallback_client, model)
+                except StreamAborted:
+                    raise
                 except Exception as e:
                     logger.warning(f"❌ Fallback {model} failed: {str(e)[:100]}")
                     last_error = e
@@ -110,11 +162,60 @@ class LLMClient:
             timeout=LLMConfig.TIMEOUT
         )
         
-        self.call_count += 1
+        with self._stats_lock:
+            self.call_count += 1
         if response.choices and response.choices[0].message.content:
             return response.choices[0].message.content
         raise Exception("Empty response from LLM")
     
+    def _execute_stream(self, client, model, messages, temperature, max_tokens, on_field):
+        """Streamed variant of _execute_call that reports JSON fields as they complete"""
+        started = time.perf_counter()
+        parser = IncrementalJSONParser()
+        field_seconds = {}
+        parts = []
+        aborted = False
+        
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=LLMConfig.TIMEOUT,
+            stream=True
+        )
+        with self._stats_lock:
+            self.call_count += 1
+            self.streamed_calls += 1
+        
+        try:
+            for event in stream:
+                if not event.choices or not event.choices[0].delta.content:
+                    continue
+                delta = event.choices[0].delta.content
+                parts.append(delta)
+                
+                for key, value in parser.feed(delta):
+                    field_seconds.setdefault(key, round(time.perf_counter() - started, 3))
+                    if on_field(key, value) is False:
+                        aborted = True
+                        with self._stats_lock:
+                            self.aborted_streams += 1
+                        raise StreamAborted(dict(parser.fields), "".join(parts))
+        finally:
+            stream.close()
+            self.last_stream_timing = {
+                "model": model,
+                "field_seconds": field_seconds,
+                "total_seconds": round(time.perf_counter() - started, 3),
+                "aborted": aborted
+            }
+        
+        content = "".join(parts)
+        if content:
+            return content
+        raise Exception("Empty response from LLM")
+    
     @observe(name="Structured LLM Call")
     def get_structured_completion(
         self,
@@ -122,7 +223,8 @@ class LLMClient:
         response_model: Type[T],
         model_type: str = "structured",
         temperature: float = 0.2,
-        max_retries: int = 3
+        max_retries: int = 3,
+        on_field: Optional[FieldCallback] = None
     ) -> T:
         
         schema = response_model.model_json_schema()
@@ -158,7 +260,8 @@ class LLMClient:
                     messages=enhanced_messages,
                     model_type=model_type,
                     temperature=temperature,
-                    max_tokens=800
+                    max_tokens=800,
+                    on_field=on_field
                 )
                 
                 cleaned = raw_response.strip()
@@ -177,6 +280,9 @@ class LLMClient:
                 logger.debug(f"✅ Structured output parsed successfully")
                 return result
                 
+            except StreamAborted:
+                raise
+                
             except json.JSONDecodeError as e:
                 logger.warning(f"⚠️ JSON parse failed (attempt {attempt+1}/{max_retries}): {e}")
                 if attempt == max_retries - 1:
@@ -199,7 +305,15 @@ class LLMClient:
     
     def get_stats(self) -> Dict[str, Any]:
         """Get usage statistics"""
+        with self._stats_lock:
+            counters = {
+                "total_calls": self.call_count,
+                "estimated_cost_usd": self.total_cost,
+                "streamed_calls": self.streamed_calls,
+                "aborted_streams": self.aborted_streams
+            }
         return {
-            "total_calls": self.call_count,
-            "estimated_cost_usd": self.total_cost
+            **counters,
+            "token_budget": get_budget_stats(),
+            "scheduler": self.scheduler.stats()
         }
\ No newline at end of file
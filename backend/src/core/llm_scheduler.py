@@ -0,0 +1,170 @@
+"""
+Fair scheduling of LLM provider calls. Each call holds one of
+LLMConfig.MAX_CONCURRENT_CALLS slots of this process while it runs. When
+all are busy, waiting calls are served by start-time fair queueing over
+flows (one per analysis, see llm_flow), so a contract with hundreds of calls
+queued cannot hold back every call of a small one submitted after it.
+
+A flow's share is weighted so that each tenant gets the same share however
+many analyses it runs, and documents of up to SJF_MAX_PAGES pages get
+SJF_BOOST times the share of the others (shortest job first). Calls made
+outside any flow share one default flow.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.config.settings import LLMConfig
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Flow:
+    key: str
+    tenant: str
+    # 0 until the document's page count is known
+    pages: int = 0
+
+_DEFAULT_FLOW = Flow("default", "default")
+_current_flow: ContextVar[Optional[Flow]] = ContextVar("llm_flow", default=None)
+
+def current_flow() -> Optional[Flow]:
+    """The flow LLM calls of this context are charged to; copy the context into worker threads"""
+    return _current_flow.get()
+
+class _Ticket:
+    __slots__ = ("granted",)
+
+    def __init__(self):
+        self.granted = False
+
+class LLMScheduler:
+    def __init__(self, slots: int, sjf_max_pages: int = 0, sjf_boost: float = 1.0):
+        self.slots = slots
+        self.sjf_max_pages = sjf_max_pages
+        self.sjf_boost = sjf_boost
+
+        self._cond = threading.Condition()
+        self._busy = 0
+        self._queue: List[Tuple[float, int, _Ticket]] = []
+        self._seq = itertools.count()
+        # Start tag of the call dispatched last; new flows start from here
+        self._virtual_time = 0.0
+        self._finish: Dict[str, float] = {}
+        self._flows: Dict[str, Flow] = {}
+        self._tenant_flows: Dict[str, int] = {}
+
+        self._calls = 0
+        self._queued_calls = 0
+        self._wait_seconds = 0.0
+        self._max_wait = 0.0
+
+    def register(self, flow: Flow):
+        with self._cond:
+            self._flows[flow.key] = flow
+            self._tenant_flows[flow.tenant] = self._tenant_flows.get(flow.tenant, 0) + 1
+
+    def unregister(self, flow: Flow):
+        with self._cond:
+            if self._flows.pop(flow.key, None) is None:
+                return
+            self._finish.pop(flow.key, None)
+            remaining = self._tenant_flows.get(flow.tenant, 1) - 1
+            if remaining:
+                self._tenant_flows[flow.tenant] = remaining
+            else:
+                self._tenant_flows.pop(flow.tenant, None)
+
+    @contextmanager
+    def slot(self, cost: float) -> Iterator[None]:
+        """Hold a provider slot for one call costing about `cost` tokens"""
+        if self.slots <= 0:
+            yield
+            return
+        self._acquire(current_flow() or _DEFAULT_FLOW, max(cost, 1.0))
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "slots": self.slots,
+                "in_flight": self._busy,
+                "waiting": len(self._queue),
+                "active_flows": len(self._flows),
+                "calls": self._calls,
+                "queued_calls": self._queued_calls,
+                "avg_wait_ms": round(1000 * self._wait_seconds / self._queued_calls, 1) if self._queued_calls else 0.0,
+                "max_wait_ms": round(1000 * self._max_wait, 1)
+            }
+
+    def _weight(self, flow: Flow) -> float:
+        weight = 1.0 / max(self._tenant_flows.get(flow.tenant, 1), 1)
+        if flow.pages and flow.pages <= self.sjf_max_pages:
+            weight *= self.sjf_boost
+        return weight
+
+    def _acquire(self, flow: Flow, cost: float):
+        with self._cond:
+            self._calls += 1
+            # A flow's calls are tagged one after another at its weighted cost;
+            # a flow that was idle starts level with the others
+            start = max(self._virtual_time, self._finish.get(flow.key, 0.0))
+            self._finish[flow.key] = start + cost / self._weight(flow)
+            if self._busy < self.slots and not self._queue:
+                self._busy += 1
+                self._virtual_time = start
+                return
+
+            ticket = _Ticket()
+            heapq.heappush(self._queue, (start, next(self._seq), ticket))
+            queued_at = time.perf_counter()
+            while not ticket.granted:
+                self._cond.wait()
+            waited = time.perf_counter() - queued_at
+            self._queued_calls += 1
+            self._wait_seconds += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    def _release(self):
+        with self._cond:
+            if not self._queue:
+                self._busy -= 1
+                return
+            # The slot passes straight to the call with the lowest start tag
+            start, _, ticket = heapq.heappop(self._queue)
+            ticket.granted = True
+            self._virtual_time = start
+            self._cond.notify_all()
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Process-wide scheduler shared by every LLMClient"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(LLMConfig.MAX_CONCURRENT_CALLS, LLMConfig.SJF_MAX_PAGES, LLMConfig.SJF_BOOST)
+        return _scheduler
+
+@contextmanager
+def llm_flow(key: str, tenant: Optional[str] = None) -> Iterator[Flow]:
+    """Charge the LLM calls made in this context (one analysis) to their own flow"""
+    flow = Flow(key, tenant or "default")
+    scheduler = get_llm_scheduler()
+    scheduler.register(flow)
+    token = _current_flow.set(flow)
+    try:
+        yield flow
+    finally:
+        _current_flow.reset(token)
+        scheduler.unregister(flow)
@@ -0,0 +1,52 @@
+import os
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+class MemoryLimitExceeded(Exception):
+    """Raised when an analysis grows the process past its memory ceiling."""
+    def __init__(self, stage: str, used_mb: float, limit_mb: int):
+        super().__init__(
+            f"Analysis stopped during {stage}: it used {used_mb:.0f} MB, above the {limit_mb} MB limit"
+        )
+        self.stage = stage
+        self.used_mb = used_mb
+        self.limit_mb = limit_mb
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process from /proc/self/statm; None where unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * _PAGE_SIZE / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+class MemoryGuard:
+    """
+    Ceiling on how far one analysis may grow the process RSS beyond what it
+    was when the analysis started. Analyses running side by side in one
+    process share the measurement, so the limit is a backstop against a
+    single huge document rather than exact accounting.
+    """
+
+    def __init__(self, limit_mb: int):
+        self.limit_mb = limit_mb
+        self.baseline_mb = current_rss_mb() if limit_mb > 0 else None
+        self.peak_mb = 0.0
+        if limit_mb > 0 and self.baseline_mb is None:
+            logger.debug("RSS is not readable on this platform; memory limit disabled")
+
+    def check(self, stage: str):
+        if self.baseline_mb is None:
+            return
+        rss = current_rss_mb()
+        if rss is None:
+            return
+        used = rss - self.baseline_mb
+        self.peak_mb = max(self.peak_mb, used)
+        if used > self.limit_mb:
+            raise MemoryLimitExceeded(stage, used, self.limit_mb)
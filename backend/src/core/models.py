@@ -26,6 +26,18 @@ class DocumentMetadata(BaseModel):
             }
         }
 
+class ExtractedPDF(BaseModel):
+    text: str
+    metadata: DocumentMetadata
+    # Character offset in `text` where each page starts (one entry per page)
+    page_offsets: List[int] = Field(default_factory=list)
+    # 0-based pages that were re-read with pdfplumber
+    layout_pages: List[int] = Field(default_factory=list)
+    # 0-based pages whose text came from OCR
+    ocr_pages: List[int] = Field(default_factory=list)
+    # Tesseract seconds per OCR'd page (cache hits excluded)
+    ocr_seconds: Dict[int, float] = Field(default_factory=dict)
+
 class Definition(BaseModel):
     term: str
     definition: str
@@ -53,6 +65,9 @@ class SemanticChunk(BaseModel):
     preceding_text: Optional[str] = None  
     following_text: Optional[str] = None  
     
+    # Headings above the chunk, outermost first (structure chunking only)
+    section_path: List[str] = Field(default_factory=list)
+    
     @field_validator('text')
     @classmethod
     def text_not_empty(cls, v):
@@ -76,6 +91,7 @@ class ProcessedDocument(BaseModel):
     full_text: str
     definitions: List[Definition]
     chunks: List[SemanticChunk]
+    page_offsets: List[int] = Field(default_factory=list)
     
     total_chunks: int
     avg_chunk_length: float
@@ -273,4 +289,23 @@ class CompoundRisk(BaseModel):
     description: str = Field(..., description="What makes this combination dangerous")
     affected_clause_ids: List[str] = Field(..., description="Which clauses create this risk")
     mitigation_advice: str = Field(..., description="How to address this risk")
-    combined_risk_score: int = Field(..., ge=0, le=100, description="Aggregate risk level")
\ No newline at end of file
+    combined_risk_score: int = Field(..., ge=0, le=100, description="Aggregate risk level")
+
+class ChunkVerdict(BaseModel):
+    """Outcome of one chunk in an analysis, kept so a revised upload can reuse it"""
+    chunk_id: str
+    text: str
+    embedding: Optional[List[float]] = None
+    section_path: List[str] = Field(default_factory=list)
+    
+    category: Optional[str] = None
+    reviewed: bool = False
+    analysis: Optional[RiskAnalysis] = None
+    fix: Optional[GeneratedFix] = None
+
+class AnalysisSnapshot(BaseModel):
+    analysis_id: str
+    filename: str
+    # pipeline_fingerprint() of the run; verdicts from other settings are not reused
+    pipeline: str
+    chunks: List[ChunkVerdict]
@@ -0,0 +1,248 @@
+import re
+import threading
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+from src.config.settings import LLMConfig, TokenBudgetConfig
+
+try:
+    import tiktoken
+except ImportError:  # Optional - falls back to the regex approximation below
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Word pieces for the offline approximation: words, numbers and single punctuation marks
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """Counts and truncates text in model tokens for one tokenizer encoding."""
+
+    def __init__(self, encoding_name: str):
+        self.encoding_name = encoding_name
+        self.encoding = None
+
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                logger.warning(f"⚠️ Tokenizer {encoding_name} unavailable ({str(e)[:80]}), using approximation")
+
+    @property
+    def is_exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return sum(self._piece_tokens(m.group()) for m in _PIECE_PATTERN.finditer(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to max_tokens, preferring to end on a sentence boundary."""
+        if max_tokens <= 0 or not text:
+            return ""
+        # One token is reserved for the trailing ellipsis
+        keep = max_tokens - 1
+
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            truncated = self.encoding.decode(tokens[:keep])
+        else:
+            if self.count(text) <= max_tokens:
+                return text
+            used = 0
+            cut = 0
+            for m in _PIECE_PATTERN.finditer(text):
+                used += self._piece_tokens(m.group())
+                if used > keep:
+                    cut = m.start()
+                    break
+            truncated = text[:cut]
+
+        last_period = truncated.rfind('.')
+        if last_period > len(truncated) * 0.8:
+            return truncated[:last_period + 1] + "..."
+        return truncated.rstrip() + "..."
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        # Chat formats add a handful of framing tokens per message
+        return sum(
+            self.count(m.get("content", "")) + TokenBudgetConfig.TOKENS_PER_MESSAGE
+            for m in messages
+        )
+
+    @staticmethod
+    def _piece_tokens(piece: str) -> int:
+        # cl100k-style BPE splits digit runs into groups of 3 and keeps common words whole
+        if piece.isdigit():
+            return -(-len(piece) // 3)
+        if len(piece) <= 10:
+            return 1
+        return -(-len(piece) // 6)
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model_name: str) -> TokenCounter:
+    """Cached counter for the tokenizer family of a concrete model name."""
+    model_lower = model_name.lower()
+    encoding_name = TokenBudgetConfig.FAMILY_ENCODINGS["default"]
+
+    for family, family_encoding in TokenBudgetConfig.FAMILY_ENCODINGS.items():
+        if family != "default" and family in model_lower:
+            encoding_name = family_encoding
+            break
+
+    return _counter_for_encoding(encoding_name)
+
+
+@lru_cache(maxsize=None)
+def _counter_for_encoding(encoding_name: str) -> TokenCounter:
+    return TokenCounter(encoding_name)
+
+
+def get_counter_for_model_type(model_type: str) -> TokenCounter:
+    """Counter for the first primary model of a model type ('fast', 'smart', ...)."""
+    models = LLMConfig.MODELS.get(model_type, LLMConfig.MODELS["fast"])
+    return get_token_counter(models[0])
+
+
+class BudgetedPrompt(BaseModel):
+    sections: Dict[str, str] = Field(default_factory=dict)
+    precedents: List[str] = Field(default_factory=list)
+    precedent_indices: List[int] = Field(default_factory=list)
+    tokens_used: int = 0
+
+
+class _BudgetStats:
+    """Process-wide token accounting per call type (pessimist, optimist, arbiter, fix)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.by_call_type: Dict[str, Dict[str, int]] = {}
+
+    def record(self, call_type: str, raw: int, sent: int, deduped: int):
+        with self.lock:
+            entry = self.by_call_type.setdefault(call_type, {
+                "calls": 0,
+                "raw_tokens": 0,
+                "sent_tokens": 0,
+                "trimmed_tokens": 0,
+                "deduped_tokens": 0
+            })
+            entry["calls"] += 1
+            entry["raw_tokens"] += raw
+            entry["sent_tokens"] += sent
+            entry["deduped_tokens"] += deduped
+            entry["trimmed_tokens"] += raw - sent - deduped
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            report = {}
+            for call_type, entry in self.by_call_type.items():
+                saved = entry["raw_tokens"] - entry["sent_tokens"]
+                report[call_type] = {
+                    **entry,
+                    "saved_tokens": saved,
+                    "saved_per_call": round(saved / entry["calls"], 1) if entry["calls"] else 0.0
+                }
+            return report
+
+
+_stats = _BudgetStats()
+
+
+def get_budget_stats() -> Dict[str, Dict[str, int]]:
+    return _stats.snapshot()
+
+
+class PromptBudgeter:
+    """
+    Splits a per-call token budget (TokenBudgetConfig.CALL_BUDGETS) across the
+    variable parts of a prompt. Sections are filled in priority order up to their
+    caps; whatever is left goes to the deduplicated precedents.
+    """
+
+    def __init__(self, model_type: str = "smart"):
+        self.counter = get_counter_for_model_type(model_type)
+
+    def allocate(
+        self,
+        call_type: str,
+        sections: Dict[str, str],
+        precedents: Optional[List[str]] = None
+    ) -> BudgetedPrompt:
+        budget = TokenBudgetConfig.CALL_BUDGETS[call_type]
+        remaining = budget["total"]
+        raw_tokens = 0
+        result = BudgetedPrompt()
+
+        for name, cap in budget["sections"].items():
+            text = sections.get(name) or ""
+            tokens = self.counter.count(text)
+            raw_tokens += tokens
+
+            allowed = min(cap, remaining)
+            if tokens > allowed:
+                text = self.counter.truncate(text, allowed)
+                tokens = self.counter.count(text)
+
+            result.sections[name] = text
+            remaining -= tokens
+
+        deduped_tokens = 0
+        kept = []
+        for i, precedent in enumerate(precedents or []):
+            tokens = self.counter.count(precedent)
+            raw_tokens += tokens
+            if self._overlaps_any(precedent, [precedents[j] for j in kept]):
+                deduped_tokens += tokens
+                continue
+            kept.append(i)
+
+        kept = kept[:budget.get("max_precedents", len(kept))]
+        precedent_cap = budget.get("precedent_cap", 0)
+        for position, i in enumerate(kept):
+            if remaining <= 0:
+                break
+            # Even share of what is left, so late precedents are not starved by early ones
+            share = min(precedent_cap, remaining // (len(kept) - position))
+            text = self.counter.truncate(precedents[i], share)
+            if not text:
+                continue
+            tokens = self.counter.count(text)
+            result.precedents.append(text)
+            result.precedent_indices.append(i)
+            remaining -= tokens
+
+        result.tokens_used = budget["total"] - remaining
+        _stats.record(call_type, raw_tokens, result.tokens_used, deduped_tokens)
+        return result
+
+    @staticmethod
+    def _overlaps_any(text: str, kept: List[str]) -> bool:
+        shingles = _shingles(text)
+        if not shingles:
+            return False
+        for other in kept:
+            other_shingles = _shingles(other)
+            if not other_shingles:
+                continue
+            overlap = len(shingles & other_shingles) / min(len(shingles), len(other_shingles))
+            if overlap >= TokenBudgetConfig.PRECEDENT_OVERLAP_THRESHOLD:
+                return True
+        return False
+
+
+@lru_cache(maxsize=2048)
+def _shingles(text: str, size: int = 5) -> frozenset:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
@@ -10,11 +10,15 @@ from .connection import (
     execute_query,
     DB_PATH
 )
+from .job_store import JobStore, SQLiteJobStore, get_job_store
 
 __all__ = [
     'get_db_connection',
     'init_database',
     'get_db_stats',
     'execute_query',
-    'DB_PATH'
+    'DB_PATH',
+    'JobStore',
+    'SQLiteJobStore',
+    'get_job_store'
 ]
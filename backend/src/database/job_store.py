@@ -0,0 +1,658 @@
+"""
+Analysis job store: status, progress and result of every upload, shared by
+all API worker processes.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from src.config.settings import BatchConfig, JobStoreConfig, ResponseConfig, WorkerConfig
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+class JobStore(ABC):
+    """
+    A job is a dict with id, status ("processing" / "completed" / "failed"),
+    filename, progress, error, file_path, alias_of, dedup_key,
+    base_analysis_id, worker_id, result_etag (set on completion) and, when
+    asked for, data (the analysis result). A duplicate upload is a job with
+    alias_of set; its status and result are read through the job it attached
+    to.
+    
+    The store is also the work queue: a processing job without worker_id is
+    waiting for a worker (see claim_next). A claimed job is leased to its
+    worker until lease_expires_at; the worker renews the lease with
+    heartbeat(), and once it runs out any worker may claim the job again.
+    Updates that pass worker_id only apply while that worker still holds the
+    job, so a worker that lost its lease cannot overwrite the new owner's run.
+    
+    Each job also has an event log (progress, finished clauses, the final
+    status) with increasing ids, which the API streams to clients.
+    
+    A batch groups the jobs of one bulk upload (batch_id); at most
+    BatchConfig.CONCURRENCY of them run at once, and queued single uploads
+    go before queued batch jobs. Jobs record the client_id of the uploader
+    for admission control (load()).
+    """
+
+    @abstractmethod
+    def create(
+        self,
+        job_id: str,
+        filename: str,
+        file_path: Optional[str] = None,
+        dedup_key: Optional[str] = None,
+        reuse: bool = False,
+        base_analysis_id: Optional[str] = None,
+        worker_id: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        client_id: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Register a new job. With reuse=True and a running or completed job for
+        dedup_key, the new job becomes an alias of that one and its id is
+        returned; otherwise the job is created (and claims dedup_key) and None
+        is returned. Atomic across processes. A job created without worker_id
+        is queued for the next free worker (inline thread or pool process).
+        """
+
+    @abstractmethod
+    def get(self, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """The job, or None if unknown or expired"""
+
+    @abstractmethod
+    def get_encoded_result(self, job_id: str) -> Optional[Tuple[str, bytes]]:
+        """
+        The result of a completed job as stored: (etag, gzip-compressed JSON),
+        without decoding it. None unless the job completed and has not expired
+        """
+
+    @abstractmethod
+    def set_progress(self, job_id: str, progress: int, worker_id: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def complete(self, job_id: str, result: Dict[str, Any], worker_id: Optional[str] = None) -> bool:
+        """
+        Store the result; identical uploads from now on reuse this job. False
+        (and nothing stored) if the job already finished or, with worker_id,
+        is no longer that worker's
+        """
+
+    @abstractmethod
+    def fail(self, job_id: str, error: str, worker_id: Optional[str] = None) -> bool:
+        """
+        Mark failed and release the dedup key, so the next identical upload
+        retries. Same ownership rules as complete()
+        """
+
+    @abstractmethod
+    def delete(self, job_id: str):
+        ...
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Delete finished jobs past their TTL; returns how many"""
+
+    @abstractmethod
+    def claim_next(self, worker_id: str, batch_id: Optional[str] = None,
+                   interactive_only: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Oldest job that is queued or whose lease has expired, now leased to
+        worker_id; None if there is none. Jobs already claimed
+        WorkerConfig.MAX_ATTEMPTS times are failed instead. With batch_id,
+        only that batch's jobs; with interactive_only, no batch jobs.
+        """
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Renew worker_id's lease on the job; False if it no longer holds it"""
+
+    @abstractmethod
+    def requeue(self, worker_id: str) -> int:
+        """Put the unfinished jobs of a worker that is gone back on the queue"""
+
+    @abstractmethod
+    def running_workers(self) -> List[str]:
+        """worker_ids that hold unfinished jobs"""
+
+    @abstractmethod
+    def add_event(self, job_id: str, event_type: str, data: Dict[str, Any], worker_id: Optional[str] = None) -> bool:
+        """Append to the job's event log; with worker_id, only while that worker holds the job"""
+
+    @abstractmethod
+    def events_since(self, job_id: str, after_id: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """Events with id > after_id, oldest first, as dicts with id, type and data"""
+
+    @abstractmethod
+    def create_batch_jobs(self, batch_id: str, jobs: List[Dict[str, Any]], reuse: bool = False,
+                          client_id: Optional[str] = None) -> List[Optional[str]]:
+        """
+        Register a batch and its jobs (dicts with id, filename, file_path and
+        dedup_key) in one transaction: all of them or, on error, none. Returns,
+        per job, what create() would: the id it was attached to, or None
+        """
+
+    @abstractmethod
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """The batch (id, total, created_at), or None once it and its jobs have expired"""
+
+    @abstractmethod
+    def batch_jobs(self, batch_id: str) -> List[Dict[str, Any]]:
+        """
+        id, filename, status, progress and error of each job in the batch, in
+        upload order; duplicates report the job they attached to
+        """
+
+    @abstractmethod
+    def load(self, client_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Unfinished jobs per lane ("interactive" / "batch"), as queued and
+        running counts; with client_id also that client's unfinished single
+        uploads (client_jobs) and batches (client_batches). Duplicates are
+        not counted: they run nothing.
+        """
+
+    @abstractmethod
+    def timings(self, since: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Per lane, for jobs started since `since`: how many, and their queue
+        wait (start - upload) and, for those finished, run time, in seconds
+        """
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    file_path TEXT,
+    progress INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    alias_of TEXT,
+    dedup_key TEXT,
+    result BLOB,
+    result_etag TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL,
+    base_analysis_id TEXT,
+    worker_id TEXT,
+    started_at REAL,
+    lease_expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    batch_id TEXT,
+    client_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_expires ON jobs(expires_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_alias ON jobs(alias_of);
+-- the queue (see claim_next), leases to check, batches, and admission counts
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(created_at)
+    WHERE status = 'processing' AND worker_id IS NULL AND alias_of IS NULL;
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(lease_expires_at)
+    WHERE status = 'processing' AND worker_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs(batch_id) WHERE batch_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_jobs_started ON jobs(started_at) WHERE started_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_jobs_client ON jobs(client_id) WHERE status = 'processing' AND alias_of IS NULL;
+
+-- progress, clause and status events of a job, streamed to clients
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, id);
+
+-- bulk uploads; their jobs carry batch_id
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+
+-- dedup key -> job that is running / has completed for it
+CREATE TABLE IF NOT EXISTS job_dedup (
+    dedup_key TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL
+);
+"""
+
+_COLUMNS = ("id, status, filename, file_path, progress, error, alias_of, dedup_key, base_analysis_id, worker_id, "
+            "attempts, batch_id, client_id, result_etag")
+
+class SQLiteJobStore(JobStore):
+    """
+    JobStore in a SQLite file (JobStoreConfig.DB_PATH) in WAL mode, so status
+    polls from any process read while a worker writes. Lookups are by primary
+    key; results are gzip-compressed JSON, encoded once on completion with
+    a hash of the JSON as their etag. Finished jobs are immutable, so
+    each process keeps the last HOT_CACHE_SIZE it read decoded in memory.
+    Several nodes can share one file on a common volume (JOURNAL_MODE
+    "DELETE"); claims and lease checks run in write transactions, so they
+    need no other coordination.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, ttl_hours: Optional[float] = None,
+                 hot_cache_size: Optional[int] = None, lease_seconds: Optional[float] = None):
+        self.db_path = Path(db_path or JobStoreConfig.DB_PATH)
+        self.lease_seconds = lease_seconds if lease_seconds is not None else WorkerConfig.LEASE_SECONDS
+        self.ttl_seconds = (ttl_hours if ttl_hours is not None else JobStoreConfig.RESULT_TTL_HOURS) * 3600
+        self.hot_cache_size = hot_cache_size if hot_cache_size is not None else JobStoreConfig.HOT_CACHE_SIZE
+
+        self._local = threading.local()
+        self._hot: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._hot_lock = threading.Lock()
+        self._last_purge = 0.0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.execute(f"PRAGMA journal_mode={JobStoreConfig.JOURNAL_MODE}")
+        conn.executescript(_SCHEMA)
+        logger.info(f"✅ Job store ready at {self.db_path}")
+
+    def create(self, job_id, filename, file_path=None, dedup_key=None, reuse=False,
+               base_analysis_id=None, worker_id=None, batch_id=None, client_id=None):
+        now = time.time()
+        self._maybe_purge(now)
+        with self._connection(immediate=True) as conn:
+            return self._insert_job(conn, now, job_id, filename, file_path, dedup_key, reuse,
+                                    base_analysis_id, worker_id, batch_id, client_id)
+
+    def create_batch_jobs(self, batch_id, jobs, reuse=False, client_id=None):
+        now = time.time()
+        self._maybe_purge(now)
+        with self._connection(immediate=True) as conn:
+            conn.execute("INSERT INTO batches (id, total, created_at) VALUES (?, ?, ?)", (batch_id, len(jobs), now))
+            return [
+                self._insert_job(conn, now, job["id"], job["filename"], job.get("file_path"), job.get("dedup_key"),
+                                 reuse, None, None, batch_id, client_id)
+                for job in jobs
+            ]
+
+    def _insert_job(self, conn: sqlite3.Connection, now: float, job_id: str, filename: str,
+                    file_path: Optional[str], dedup_key: Optional[str], reuse: bool, base_analysis_id: Optional[str],
+                    worker_id: Optional[str], batch_id: Optional[str], client_id: Optional[str]) -> Optional[str]:
+        if reuse and dedup_key:
+            row = conn.execute(
+                "SELECT d.job_id, j.expires_at FROM job_dedup d JOIN jobs j ON j.id = d.job_id "
+                "WHERE d.dedup_key = ? AND (j.expires_at IS NULL OR j.expires_at > ?)",
+                (dedup_key, now)
+            ).fetchone()
+            if row:
+                # Attached to a finished job: expires with it
+                conn.execute(
+                    "INSERT INTO jobs (id, status, filename, alias_of, created_at, updated_at, expires_at, batch_id, "
+                    "client_id) VALUES (?, 'processing', ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, filename, row[0], now, now, row[1], batch_id, client_id)
+                )
+                return row[0]
+
+        # A job created with worker_id is claimed by that worker from the start
+        conn.execute(
+            "INSERT INTO jobs (id, status, filename, file_path, dedup_key, base_analysis_id, worker_id, "
+            "created_at, updated_at, started_at, lease_expires_at, attempts, batch_id, client_id) "
+            "VALUES (?, 'processing', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, filename, file_path, dedup_key, base_analysis_id, worker_id, now, now,
+             now if worker_id else None, now + self.lease_seconds if worker_id else None,
+             1 if worker_id else 0, batch_id, client_id)
+        )
+        if dedup_key:
+            conn.execute("INSERT OR REPLACE INTO job_dedup (dedup_key, job_id) VALUES (?, ?)", (dedup_key, job_id))
+        return None
+
+    def get(self, job_id, include_result=False):
+        with self._hot_lock:
+            job = self._hot.get(job_id)
+            if job is not None:
+                if job["expires_at"] and job["expires_at"] <= time.time():
+                    del self._hot[job_id]
+                else:
+                    self._hot.move_to_end(job_id)
+                    return dict(job)
+
+        columns = _COLUMNS + ", expires_at" + (", result" if include_result else "")
+        with self._connection() as conn:
+            row = conn.execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        if job["expires_at"] and job["expires_at"] <= time.time():
+            return None
+        if include_result:
+            blob = job.pop("result")
+            job["data"] = orjson.loads(gzip.decompress(blob)) if blob else None
+            # Only finished jobs are cached: they no longer change
+            if job["status"] in TERMINAL_STATUSES:
+                self._remember(job)
+        return job
+
+    def get_encoded_result(self, job_id):
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT result, result_etag, expires_at FROM jobs WHERE id = ? AND status = 'completed'", (job_id,)
+            ).fetchone()
+        if row is None or row["result"] is None or (row["expires_at"] and row["expires_at"] <= time.time()):
+            return None
+        return row["result_etag"], row["result"]
+
+    def set_progress(self, job_id, progress, worker_id=None):
+        owner, params = self._owner_clause(worker_id)
+        with self._connection() as conn:
+            conn.execute(
+                f"UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ? AND status = 'processing'{owner}",
+                (progress, time.time(), job_id, *params)
+            )
+
+    def complete(self, job_id, result, worker_id=None):
+        etag, blob = self._encode_result(orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS))
+        now = time.time()
+        owner, params = self._owner_clause(worker_id)
+        with self._connection(immediate=True) as conn:
+            done = conn.execute(
+                "UPDATE jobs SET status = 'completed', progress = 100, result = ?, result_etag = ?, updated_at = ?, "
+                f"expires_at = ?, lease_expires_at = NULL WHERE id = ? AND status = 'processing'{owner}",
+                (blob, etag, now, now + self.ttl_seconds, job_id, *params)
+            ).rowcount
+            if done:
+                # Duplicates attached while it ran expire with it
+                conn.execute("UPDATE jobs SET expires_at = ? WHERE alias_of = ?", (now + self.ttl_seconds, job_id))
+                self._insert_event(conn, job_id, "status", {"status": "completed", "progress": 100}, now)
+        if not done:
+            logger.warning(f"⚠️ Dropped result of {job_id}: already finished or re-claimed by another worker")
+        return bool(done)
+
+    def fail(self, job_id, error, worker_id=None):
+        owner, params = self._owner_clause(worker_id)
+        with self._connection(immediate=True) as conn:
+            done = self._fail(conn, job_id, error, owner, params)
+        if not done:
+            logger.warning(f"⚠️ Dropped failure of {job_id}: already finished or re-claimed by another worker")
+        return done
+
+    def delete(self, job_id):
+        with self._connection(immediate=True) as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            conn.execute("DELETE FROM job_dedup WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+        with self._hot_lock:
+            self._hot.pop(job_id, None)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._connection(immediate=True) as conn:
+            for table in ("job_dedup", "job_events"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE job_id IN (SELECT id FROM jobs WHERE expires_at <= ?)", (now,)
+                )
+            removed = conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,)).rowcount
+            # A batch goes once none of its jobs are left
+            conn.execute(
+                "DELETE FROM batches WHERE created_at <= ? AND NOT EXISTS "
+                "(SELECT 1 FROM jobs WHERE jobs.batch_id = batches.id)",
+                (now - self.ttl_seconds,)
+            )
+        if removed:
+            logger.info(f"🧹 Removed {removed} expired analysis jobs")
+        return removed
+
+    def claim_next(self, worker_id, batch_id=None, interactive_only=False):
+        now = time.time()
+        if batch_id:
+            in_batch, batch_params = " AND batch_id = ?", (batch_id,)
+        else:
+            in_batch, batch_params = (" AND batch_id IS NULL" if interactive_only else ""), ()
+        with self._connection(immediate=True) as conn:
+            while True:
+                # Jobs whose worker went silent first: they have waited longest.
+                # Then queued jobs: single uploads before batch jobs, and a
+                # batch job only while its batch has a free slot
+                row = conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs "
+                    f"WHERE status = 'processing' AND worker_id IS NOT NULL AND lease_expires_at < ?{in_batch} "
+                    "ORDER BY lease_expires_at LIMIT 1",
+                    (now, *batch_params)
+                ).fetchone() or conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs q "
+                    f"WHERE status = 'processing' AND worker_id IS NULL AND alias_of IS NULL{in_batch} "
+                    "AND (batch_id IS NULL OR (SELECT COUNT(*) FROM jobs r WHERE r.batch_id = q.batch_id "
+                    "AND r.status = 'processing' AND r.worker_id IS NOT NULL) < ?) "
+                    "ORDER BY batch_id IS NOT NULL, created_at LIMIT 1",
+                    (*batch_params, BatchConfig.CONCURRENCY)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["worker_id"]:
+                    logger.warning(f"⏰ Lease of {row['worker_id']} on {row['id']} expired; re-claiming it")
+                if row["attempts"] < WorkerConfig.MAX_ATTEMPTS:
+                    break
+                logger.error(f"❌ Giving up on {row['id']} after {row['attempts']} attempts")
+                self._fail(conn, row["id"], f"Analysis did not finish after {row['attempts']} attempts", "", ())
+
+            conn.execute(
+                "UPDATE jobs SET worker_id = ?, started_at = ?, updated_at = ?, lease_expires_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now, now, now + self.lease_seconds, row["id"])
+            )
+            if row["attempts"]:
+                # Clients drop the partial results of the earlier attempt
+                self._insert_event(conn, row["id"], "restart", {"attempt": row["attempts"] + 1}, now)
+        job = dict(row)
+        job["worker_id"] = worker_id
+        job["attempts"] += 1
+        return job
+
+    def heartbeat(self, job_id, worker_id):
+        with self._connection() as conn:
+            held = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND worker_id = ? AND status = 'processing'",
+                (time.time() + self.lease_seconds, job_id, worker_id)
+            ).rowcount
+        return bool(held)
+
+    def requeue(self, worker_id):
+        with self._connection(immediate=True) as conn:
+            count = conn.execute(
+                "UPDATE jobs SET worker_id = NULL, started_at = NULL, lease_expires_at = NULL, progress = 0, "
+                "updated_at = ? WHERE worker_id = ? AND status = 'processing'",
+                (time.time(), worker_id)
+            ).rowcount
+        if count:
+            logger.warning(f"♻️ Re-queued {count} unfinished job(s) of worker {worker_id}")
+        return count
+
+    def running_workers(self):
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT worker_id FROM jobs WHERE status = 'processing' AND worker_id IS NOT NULL"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def add_event(self, job_id, event_type, data, worker_id=None):
+        now = time.time()
+        with self._connection(immediate=True) as conn:
+            if worker_id:
+                held = conn.execute(
+                    "SELECT 1 FROM jobs WHERE id = ? AND worker_id = ? AND status = 'processing'", (job_id, worker_id)
+                ).fetchone()
+                if not held:
+                    return False
+            self._insert_event(conn, job_id, event_type, data, now)
+        return True
+
+    def events_since(self, job_id, after_id=0, limit=500):
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT id, type, data FROM job_events WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (job_id, after_id, limit)
+            ).fetchall()
+        return [{"id": row["id"], "type": row["type"], "data": json.loads(row["data"])} for row in rows]
+
+    def get_batch(self, batch_id):
+        with self._connection() as conn:
+            row = conn.execute("SELECT id, total, created_at FROM batches WHERE id = ?", (batch_id,)).fetchone()
+        return dict(row) if row else None
+
+    def batch_jobs(self, batch_id):
+        now = time.time()
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT j.id, j.filename, j.alias_of, "
+                "CASE WHEN j.alias_of IS NULL THEN j.status WHEN s.id IS NULL THEN 'failed' ELSE s.status END AS status, "
+                "COALESCE(s.progress, j.progress) AS progress, "
+                "CASE WHEN j.alias_of IS NOT NULL AND s.id IS NULL THEN 'Original analysis is no longer available' "
+                "ELSE COALESCE(s.error, j.error) END AS error "
+                "FROM jobs j LEFT JOIN jobs s ON s.id = j.alias_of "
+                "WHERE j.batch_id = ? AND (j.expires_at IS NULL OR j.expires_at > ?) "
+                "ORDER BY j.created_at, j.rowid",
+                (batch_id, now)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def load(self, client_id=None):
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT batch_id IS NOT NULL AS in_batch, worker_id IS NOT NULL AS running, COUNT(*) AS n FROM jobs "
+                "WHERE status = 'processing' AND alias_of IS NULL GROUP BY in_batch, running"
+            ).fetchall()
+            client = conn.execute(
+                "SELECT COUNT(*) - COUNT(batch_id), COUNT(DISTINCT batch_id) FROM jobs "
+                "WHERE status = 'processing' AND alias_of IS NULL AND client_id = ?",
+                (client_id,)
+            ).fetchone() if client_id else (0, 0)
+
+        load = {lane: {"queued": 0, "running": 0} for lane in ("interactive", "batch")}
+        for row in rows:
+            load["batch" if row["in_batch"] else "interactive"]["running" if row["running"] else "queued"] = row["n"]
+        load["client_jobs"], load["client_batches"] = client[0], client[1]
+        return load
+
+    def timings(self, since):
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT batch_id IS NOT NULL AS in_batch, started_at - created_at AS wait, "
+                "CASE WHEN status = 'processing' THEN NULL ELSE updated_at - started_at END AS run "
+                "FROM jobs WHERE started_at >= ? AND alias_of IS NULL",
+                (since,)
+            ).fetchall()
+
+        timings = {}
+        for lane in ("interactive", "batch"):
+            lane_rows = [row for row in rows if bool(row["in_batch"]) == (lane == "batch")]
+            waits = sorted(row["wait"] for row in lane_rows)
+            runs = sorted(row["run"] for row in lane_rows if row["run"] is not None)
+            timings[lane] = {
+                "started": len(waits),
+                "finished": len(runs),
+                "wait_avg": sum(waits) / len(waits) if waits else None,
+                "wait_p95": _percentile(waits, 0.95),
+                "wait_max": waits[-1] if waits else None,
+                "run_avg": sum(runs) / len(runs) if runs else None,
+                "run_p95": _percentile(runs, 0.95)
+            }
+        return timings
+
+    @staticmethod
+    def _encode_result(body: bytes) -> Tuple[str, bytes]:
+        # mtime=0: the same result always compresses to the same bytes
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        return etag, gzip.compress(body, compresslevel=ResponseConfig.GZIP_LEVEL, mtime=0)
+
+    @staticmethod
+    def _insert_event(conn: sqlite3.Connection, job_id: str, event_type: str, data: Dict[str, Any], now: float):
+        conn.execute(
+            "INSERT INTO job_events (job_id, type, data, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, event_type, json.dumps(data, separators=(",", ":")), now)
+        )
+
+    def _fail(self, conn: sqlite3.Connection, job_id: str, error: str, owner: str, params: tuple) -> bool:
+        now = time.time()
+        done = conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ?, expires_at = ?, lease_expires_at = NULL "
+            f"WHERE id = ? AND status = 'processing'{owner}",
+            (error, now, now + self.ttl_seconds, job_id, *params)
+        ).rowcount
+        if done:
+            conn.execute("UPDATE jobs SET expires_at = ? WHERE alias_of = ?", (now + self.ttl_seconds, job_id))
+            conn.execute("DELETE FROM job_dedup WHERE job_id = ?", (job_id,))
+            self._insert_event(conn, job_id, "status", {"status": "failed", "error": error}, now)
+        return bool(done)
+
+    @staticmethod
+    def _owner_clause(worker_id: Optional[str]):
+        return (" AND worker_id = ?", (worker_id,)) if worker_id else ("", ())
+
+    def _maybe_purge(self, now: float):
+        if now - self._last_purge < JobStoreConfig.PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        try:
+            self.purge_expired()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Job purge failed: {e}")
+
+    def _remember(self, job: Dict[str, Any]):
+        if self.hot_cache_size <= 0:
+            return
+        with self._hot_lock:
+            self._hot[job["id"]] = dict(job)
+            self._hot.move_to_end(job["id"])
+            while len(self._hot) > self.hot_cache_size:
+                self._hot.popitem(last=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection (autocommit mode; transactions are explicit)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _connection(self, immediate: bool = False):
+        # BEGIN IMMEDIATE takes the write lock up front, so check-then-insert
+        # sequences are atomic across processes
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+def get_job_store() -> JobStore:
+    """Process-wide JobStore for JobStoreConfig.BACKEND"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if JobStoreConfig.BACKEND != "sqlite":
+                raise ValueError(f"Unknown job store backend: {JobStoreConfig.BACKEND}")
+            _store = SQLiteJobStore()
+        return _store
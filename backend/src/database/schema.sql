@@ -67,6 +67,15 @@ CREATE TABLE IF NOT EXISTS system_metrics (
     llm_cost_usd REAL DEFAULT 0
 );
 
+-- OCR output keyed by a hash of the rendered page, shared across uploads
+CREATE TABLE IF NOT EXISTS ocr_cache (
+    page_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    dpi INTEGER,
+    ocr_seconds REAL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create indices for better query performance
 CREATE INDEX IF NOT EXISTS idx_feedback_analysis ON feedback(analysis_id);
 CREATE INDEX IF NOT EXISTS idx_feedback_category ON feedback(category);
@@ -74,3 +83,4 @@ CREATE INDEX IF NOT EXISTS idx_feedback_type ON feedback(feedback_type);
 CREATE INDEX IF NOT EXISTS idx_threshold_category ON threshold_adjustments(category);
 CREATE INDEX IF NOT EXISTS idx_verified_category ON verified_clauses(category);
 CREATE INDEX IF NOT EXISTS idx_metrics_date ON system_metrics(metric_date);
+CREATE INDEX IF NOT EXISTS idx_ocr_cache_created ON ocr_cache(created_at);
@@ -1,20 +1,82 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor, Future
+import contextvars
 import logging
+import threading
 
-from src.services.document_processor import DocumentProcessor
+from src.services.document_processor import DocumentProcessor, ProgressCallback
+from src.services.document_processor.document_cache import processor_fingerprint
+from src.services.document_processor.text_buffer import LargeDocument
 from src.rag.category_detector import CategoryDetector
 from src.services.risk_analyzer.adversarial_analyzer import AdversarialAnalyzer
 from src.services.fix_generator.fix_generator import FixGenerator
 from src.services.compound_detector.compound_detector import CompoundRiskDetector
+from src.services.revision_matcher import RevisionMatcher, SnapshotStore
+from src.core.models import AnalysisSnapshot, ChunkVerdict, GeneratedFix
+from src.core.token_budget import get_budget_stats
+from src.core.memory_guard import MemoryGuard
+from src.core.llm_scheduler import current_flow
+from src.config.settings import (
+    AnalysisConfig, DocumentConfig, RAGThresholds, LLMConfig, TokenBudgetConfig, TARGET_CATEGORIES
+)
 from src.database import get_db_connection
+from src.utils.spill_file import SpillFile
 
 import uuid
 import time
+import json
+import hashlib
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+def pipeline_fingerprint() -> str:
+    """
+    Hash of the settings that decide an analysis result for given file bytes:
+    Stage 1 (processor_fingerprint) plus detection, debate and reporting.
+    Identical uploads under the same fingerprint can share one result.
+    """
+    settings = {
+        "processor": processor_fingerprint(AnalysisConfig.STREAM_DOCUMENT),
+        "categories": TARGET_CATEGORIES,
+        "rag": [RAGThresholds.NOISE_THRESHOLD, RAGThresholds.SAFE_THRESHOLD, RAGThresholds.PARAM_MISMATCH_THRESHOLD],
+        "report_threshold": AnalysisConfig.REPORT_THRESHOLD,
+        "models": LLMConfig.MODELS,
+        "budgets": TokenBudgetConfig.CALL_BUDGETS
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:12]
+
+def _is_reported(analysis) -> bool:
+    return bool(analysis) and analysis.is_relevant and analysis.final_risk_score >= AnalysisConfig.REPORT_THRESHOLD
+
+def _clause_entry(verdict: ChunkVerdict, analysis, fix, match) -> Dict[str, Any]:
+    clause = {
+        "chunk_id": verdict.chunk_id,
+        "category": verdict.category,
+        "section_path": verdict.section_path,
+        "original_text": verdict.text,
+        "risk_score": analysis.final_risk_score,
+        "risk_level": analysis.final_risk_level,
+        "pessimist_analysis": analysis.pessimist_analysis.risk_argument if analysis.pessimist_analysis else "",
+        "optimist_analysis": analysis.optimist_analysis.defense_argument if analysis.optimist_analysis else "",
+        "arbiter_reasoning": analysis.arbiter_verdict.reasoning if analysis.arbiter_verdict else "",
+        "suggested_fix": fix.suggested_replacement,
+        "fix_comment": fix.edit_comment,
+        "key_changes": fix.key_changes
+    }
+    if match:
+        clause["revision_status"] = match.status
+        if match.base:
+            clause["base_chunk_id"] = match.base.chunk_id
+            clause["previous_risk_score"] = match.base.analysis.final_risk_score if match.base.analysis else 0
+    return clause
+
+def _completed(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
 class ContractAnalyzer:
     def __init__(self):
         self.processor = DocumentProcessor()
@@ -22,111 +84,365 @@ class ContractAnalyzer:
         self.risk_analyzer = AdversarialAnalyzer()
         self.fix_generator = FixGenerator()
         self.compound_detector = CompoundRiskDetector()
+        self.snapshots = SnapshotStore()
+        
+        self.fix_executor = ThreadPoolExecutor(
+            max_workers=AnalysisConfig.FIX_WORKERS, thread_name_prefix="fix"
+        )
+        self.prefetch_executor = ThreadPoolExecutor(
+            max_workers=AnalysisConfig.TEMPLATE_PREFETCH_WORKERS, thread_name_prefix="templates"
+        )
         
         logger.info("✅ Contract Analyzer initialized")
     
+    def close(self):
+        """Stop the fix and template prefetch pools once no analysis is running"""
+        self.fix_executor.shutdown(wait=True, cancel_futures=True)
+        self.prefetch_executor.shutdown(wait=True, cancel_futures=True)
     
-    def analyze_contract(self, file_path: Path) -> Dict[str, Any]:
+    
+    def analyze_contract(
+        self,
+        file_path: Path,
+        data: Optional[bytes] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        analysis_id: Optional[str] = None,
+        base_analysis_id: Optional[str] = None,
+        on_clause: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        base_analysis_id names the analysis of an earlier version of the same
+        contract: chunks whose wording is unchanged reuse its verdicts and fixes,
+        and only changed or new chunks go through detection and debate.
+        
+        on_progress gets ("extract", pages done, pages), ("chunks", chunks
+        seen, total once known, else 0), ("debate", debates done, chunks sent
+        to debate so far) and ("fix", fixes done, fixes so far). on_clause gets
+        each risky clause entry as soon as its fix is ready. Both may be
+        called from fix worker threads, one call at a time.
+        
+        Raises MemoryLimitExceeded if the run grows the process by more than
+        AnalysisConfig.MAX_ANALYSIS_RSS_MB.
+        """
         start_time = time.time()
-        analysis_id = str(uuid.uuid4())
+        analysis_id = analysis_id or str(uuid.uuid4())
         logger.info(f"pV Analyzing: {file_path.name} (ID: {analysis_id})")
+        guard = MemoryGuard(AnalysisConfig.MAX_ANALYSIS_RSS_MB)
+        
+        events_lock = threading.Lock()
+        flow = current_flow()
         
-        # Stage 1: Extract
-        doc = self.processor.process(file_path)
+        def progress(stage: str, done: int, total: int):
+            if stage == "extract" and flow is not None:
+                # Small documents get a bigger share of LLM capacity
+                flow.pages = total
+            if on_progress:
+                with events_lock:
+                    on_progress(stage, done, total)
         
-        # Stages 2-4: Analyze chunks
+        base = self._load_base(base_analysis_id) if base_analysis_id else None
+        revision = RevisionMatcher(base) if base else None
+        
+        # Stage 1: Extract. In streaming mode chunks arrive while later pages
+        # are still being extracted, and the loop below starts on them at once.
+        stream = None
+        if AnalysisConfig.STREAM_DOCUMENT:
+            stream = self.processor.process_stream(file_path, data, progress if on_progress or flow else None)
+            chunks = stream
+        else:
+            doc = self.processor.process(file_path, data)
+            chunks = doc.chunks
+            progress("extract", doc.metadata.page_count, doc.metadata.page_count)
+            guard.check("extraction")
+        
+        # Stages 2-4: Analyze chunks. Fixes run on a worker pool so they overlap
+        # with the next chunk's debate; results are collected in chunk order.
+        # However the run ends, the spill file and the stream are released.
         risky_clauses = []
         risk_analyses = []
+        pending_fixes = []
+        decision_timings = []
+        verdicts: List[ChunkVerdict] = []
+        spill: Optional[SpillFile] = None
+        debated = 0
+        seen = 0
+        to_debate = 0
+        fixes_done = 0
+        
+        def record(verdict: ChunkVerdict):
+            # Called once a verdict is final; large documents keep them on disk
+            if spill is not None:
+                spill.append(SnapshotStore.pack(verdict))
+            else:
+                verdicts.append(verdict)
         
-        for chunk in doc.chunks:
-            detection = self.detector.detect_category(chunk)
+        # A plain list of chunks has a known length; a stream's is only known at the end
+        chunk_total = len(chunks) if isinstance(chunks, list) else 0
+        
+        def queue_fix(verdict: ChunkVerdict, analysis, fix_future: Future, match):
+            pending_fixes.append((verdict, analysis, fix_future, match))
             
-            if not detection.needs_agent_review:
-                continue
+            def fix_done(future: Future):
+                nonlocal fixes_done
+                with events_lock:
+                    fixes_done += 1
+                    if on_progress:
+                        on_progress("fix", fixes_done, len(pending_fixes))
+                    if on_clause and future.exception() is None:
+                        on_clause(_clause_entry(verdict, analysis, future.result(), match))
             
-            analysis = self.risk_analyzer.analyze_risk(chunk, detection)
+            fix_future.add_done_callback(fix_done)
+        
+        try:
+            for chunk in chunks:
+                seen += 1
+                progress("chunks", seen, chunk_total)
+                if spill is None and getattr(chunks, "large", False):
+                    spill = SpillFile(DocumentConfig.SPILL_DIR)
+                guard.check("chunk analysis")
+                match = revision.match(chunk) if revision else None
             
-            # Simple fixed threshold
-            if not analysis.is_relevant or analysis.final_risk_score < 50:
-                continue
+                if match and match.status == "unchanged":
+                    # Same wording as in the base version: reuse its verdict and fix
+                    base_verdict = match.base
+                    verdict = base_verdict.model_copy(update={
+                        "chunk_id": chunk.id,
+                        "text": chunk.text,
+                        "embedding": chunk.embedding,
+                        "section_path": chunk.section_path,
+                        "analysis": base_verdict.analysis.model_copy(update={"chunk_id": chunk.id}) if base_verdict.analysis else None
+                    })
+                    if _is_reported(verdict.analysis) and verdict.fix:
+                        risk_analyses.append(verdict.analysis)
+                        queue_fix(verdict, verdict.analysis, _completed(verdict.fix), match)
+                    else:
+                        record(verdict)
+                    continue
             
-            risk_analyses.append(analysis)
+                detection = self.detector.detect_category(chunk)
+                verdict = ChunkVerdict(
+                    chunk_id=chunk.id,
+                    text=chunk.text,
+                    embedding=chunk.embedding,
+                    section_path=chunk.section_path,
+                    category=detection.category
+                )
             
-            fix = self.fix_generator.generate_fix(
-                chunk.text,
-                detection.category,
-                analysis
-            )
+                if not detection.needs_agent_review:
+                    record(verdict)
+                    continue
+                to_debate += 1
             
-            risky_clauses.append({
-                "chunk_id": chunk.id,
-                "category": detection.category,
-                "original_text": chunk.text,
-                "risk_score": analysis.final_risk_score,
-                "risk_level": analysis.final_risk_level,
-                "pessimist_analysis": analysis.pessimist_analysis.risk_argument if analysis.pessimist_analysis else "",
-                "optimist_analysis": analysis.optimist_analysis.defense_argument if analysis.optimist_analysis else "",
-                "arbiter_reasoning": analysis.arbiter_verdict.reasoning if analysis.arbiter_verdict else "",
-                "suggested_fix": fix.suggested_replacement,
-                "fix_comment": fix.edit_comment,
-                "key_changes": fix.key_changes
-            })
+                prefetch: Dict[str, Future] = {}
+                on_decision = None
+                if AnalysisConfig.STREAM_ARBITER:
+                    on_decision = self._decision_hook(chunk.text, detection.category, prefetch)
+            
+                analysis = self.risk_analyzer.analyze_risk(chunk, detection, on_decision=on_decision)
+                verdict.reviewed = True
+                verdict.analysis = analysis
+                debated += 1
+                progress("debate", debated, to_debate)
+            
+                timing = self.risk_analyzer.llm.last_stream_timing
+                if on_decision and timing and "risk_score" in timing["field_seconds"]:
+                    decision_timings.append(timing)
+            
+                if not _is_reported(analysis):
+                    record(verdict)
+                    continue
+            
+                risk_analyses.append(analysis)
+            
+                # Run in this analysis' context, so the fix's LLM call counts to its flow
+                fix_future = self.fix_executor.submit(
+                    contextvars.copy_context().run,
+                    self._generate_fix,
+                    chunk.text,
+                    detection.category,
+                    analysis,
+                    prefetch.get("templates")
+                )
+                queue_fix(verdict, analysis, fix_future, match)
+                if len(pending_fixes) == 1:
+                    logger.info(f"🚩 First risky clause flagged after {time.time() - start_time:.2f}s")
         
-        # Stage 5: Compound risks
-        compound_risks = self.compound_detector.detect_compound_risks(
-            risk_analyses,
-            doc.full_text
-        )
+            if AnalysisConfig.STREAM_DOCUMENT:
+                doc = stream.document
+            progress("chunks", doc.total_chunks, doc.total_chunks)
         
-        compound_list = [
-            {
-                "risk_type": cr.risk_type,
-                "severity": cr.severity,
-                "description": cr.description,
-                "affected_clauses": cr.affected_clause_ids,
-                "mitigation": cr.mitigation_advice,
-                "risk_score": cr.combined_risk_score
-            }
-            for cr in compound_risks
-        ]
-        
-        avg_risk = sum(c["risk_score"] for c in risky_clauses) / len(risky_clauses) if risky_clauses else 0
-        overall_risk = "Critical" if avg_risk >= 75 else "High" if avg_risk >= 60 else "Medium" if avg_risk >= 40 else "Low"
-        
-        processing_time = time.time() - start_time
-        
-        # Save to DB
-        self._save_analysis_to_db({
-            "id": analysis_id,
-            "filename": file_path.name,
-            "total_chunks": len(doc.chunks),
-            "risky_clauses_found": len(risky_clauses),
-            "avg_risk_score": avg_risk,
-            "overall_risk_level": overall_risk,
-            "processing_time_seconds": processing_time,
-            "compound_risks_found": len(compound_risks)
-        })
-        
-        results = {
-            "analysis_id": analysis_id, # Return ID for feedback
-            "document": {
+            for verdict, analysis, fix_future, match in pending_fixes:
+                fix = fix_future.result()
+                if verdict.fix is None:
+                    verdict.fix = GeneratedFix.model_validate(fix.model_dump())
+                record(verdict)
+                risky_clauses.append(_clause_entry(verdict, analysis, fix, match))
+        
+            guard.check("fix generation")
+        
+            # Stage 5: Compound risks
+            compound_risks = self.compound_detector.detect_compound_risks(
+                risk_analyses,
+                "" if isinstance(doc, LargeDocument) else doc.full_text
+            )
+        
+            compound_list = [
+                {
+                    "risk_type": cr.risk_type,
+                    "severity": cr.severity,
+                    "description": cr.description,
+                    "affected_clauses": cr.affected_clause_ids,
+                    "mitigation": cr.mitigation_advice,
+                    "risk_score": cr.combined_risk_score
+                }
+                for cr in compound_risks
+            ]
+        
+            avg_risk = sum(c["risk_score"] for c in risky_clauses) / len(risky_clauses) if risky_clauses else 0
+            overall_risk = "Critical" if avg_risk >= 75 else "High" if avg_risk >= 60 else "Medium" if avg_risk >= 40 else "Low"
+        
+            processing_time = time.time() - start_time
+        
+            # Save to DB
+            self._save_analysis_to_db({
+                "id": analysis_id,
                 "filename": file_path.name,
-                "total_chunks": len(doc.chunks),
-                "risky_clauses_found": len(risky_clauses)
-            },
-            "summary": {
-                "overall_risk": overall_risk,
-                "average_risk_score": round(avg_risk, 1),
-                "compound_risks_found": len(compound_risks),
-                "categories_flagged": list(set(c["category"] for c in risky_clauses))
-            },
-            "risky_clauses": risky_clauses,
-            "compound_risks": compound_list
-        }
+                "total_chunks": doc.total_chunks,
+                "risky_clauses_found": len(risky_clauses),
+                "avg_risk_score": avg_risk,
+                "overall_risk_level": overall_risk,
+                "processing_time_seconds": processing_time,
+                "compound_risks_found": len(compound_risks)
+            })
+        
+            results = {
+                "analysis_id": analysis_id, # Return ID for feedback
+                "document": {
+                    "filename": file_path.name,
+                    "total_chunks": doc.total_chunks,
+                    "risky_clauses_found": len(risky_clauses)
+                },
+                "summary": {
+                    "overall_risk": overall_risk,
+                    "average_risk_score": round(avg_risk, 1),
+                    "compound_risks_found": len(compound_risks),
+                    "categories_flagged": list(set(c["category"] for c in risky_clauses))
+                },
+                "risky_clauses": risky_clauses,
+                "compound_risks": compound_list
+            }
+        
+            if revision:
+                results["revision"] = self._revision_summary(base, revision, risky_clauses, debated)
+        
+            if spill is not None:
+                self.snapshots.put_records(analysis_id, file_path.name, pipeline_fingerprint(), spill)
+            else:
+                self.snapshots.put(AnalysisSnapshot(
+                    analysis_id=analysis_id,
+                    filename=file_path.name,
+                    pipeline=pipeline_fingerprint(),
+                    chunks=verdicts
+                ))
+            if isinstance(doc, LargeDocument):
+                logger.info(f"   🐘 Peak memory growth {guard.peak_mb:.0f} MB over {doc.total_chunks} chunks")
+        except BaseException:
+            # Abandoned (error, memory limit): fixes nobody will collect need not run
+            for _, _, fix_future, _ in pending_fixes:
+                fix_future.cancel()
+            raise
+        finally:
+            if spill is not None:
+                spill.close()
+            if stream is not None:
+                stream.close()
         
         logger.info(f"✅ Analysis complete: {len(risky_clauses)} risky clauses")
+        if decision_timings:
+            avg_decision = sum(t["field_seconds"]["risk_score"] for t in decision_timings) / len(decision_timings)
+            avg_total = sum(t["total_seconds"] for t in decision_timings) / len(decision_timings)
+            dropped = sum(1 for t in decision_timings if t["aborted"])
+            logger.info(
+                f"   ⏱️ Arbiter decision after {avg_decision:.2f}s avg "
+                f"(full call {avg_total:.2f}s avg), {dropped} streams stopped early"
+            )
+        # Cumulative over every analysis this process ran, not this one alone
+        for call_type, usage in get_budget_stats().items():
+            logger.info(
+                f"   🧮 {call_type} (process total): {usage['calls']} calls, {usage['sent_tokens']} tokens sent, "
+                f"{usage['saved_tokens']} saved ({usage['deduped_tokens']} from duplicate precedents)"
+            )
         return results
 
+    def _load_base(self, base_analysis_id: str) -> Optional[AnalysisSnapshot]:
+        base = self.snapshots.get(base_analysis_id)
+        if base is None:
+            logger.warning(f"⚠️ No snapshot for base analysis {base_analysis_id}; analyzing in full")
+            return None
+        if base.pipeline != pipeline_fingerprint():
+            logger.warning(f"⚠️ Base analysis {base_analysis_id} ran with other settings; analyzing in full")
+            return None
+        return base
+    
+    def _revision_summary(
+        self,
+        base: AnalysisSnapshot,
+        revision: RevisionMatcher,
+        risky_clauses: List[Dict[str, Any]],
+        debated: int
+    ) -> Dict[str, Any]:
+        # Clauses flagged in the base version that are gone or no longer flagged
+        flagged_before = {c.chunk_id for c in base.chunks if _is_reported(c.analysis) and c.fix}
+        still_flagged = {c["base_chunk_id"] for c in risky_clauses if c.get("base_chunk_id")}
+        
+        summary = {
+            "base_analysis_id": base.analysis_id,
+            "unchanged_chunks": revision.counts["unchanged"],
+            "modified_chunks": revision.counts["modified"],
+            "new_chunks": revision.counts["new"],
+            "removed_chunks": len(revision.removed()),
+            "debated_chunks": debated,
+            "resolved_clauses": sorted(flagged_before - still_flagged)
+        }
+        logger.info(
+            f"♻️ Revision of {base.analysis_id}: reused {summary['unchanged_chunks']} verdicts, "
+            f"debated {debated} of {summary['modified_chunks'] + summary['new_chunks']} changed/new chunks"
+        )
+        return summary
+    
+    def _decision_hook(self, chunk_text: str, category: str, prefetch: Dict[str, Future]):
+        """Drop low-risk clauses mid-stream; start template retrieval for reported ones."""
+        def on_decision(risk_score: int) -> bool:
+            if risk_score < AnalysisConfig.REPORT_THRESHOLD:
+                return False
+            if "templates" not in prefetch:
+                prefetch["templates"] = self.prefetch_executor.submit(
+                    self.fix_generator.fetch_templates, chunk_text, category
+                )
+            return True
+        return on_decision
+    
+    def _generate_fix(
+        self,
+        chunk_text: str,
+        category: str,
+        analysis,
+        templates_future: Optional[Future]
+    ):
+        prefetched = None
+        if templates_future is not None:
+            try:
+                prefetched = templates_future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ Template prefetch failed, retrieving again: {e}")
+        
+        return self.fix_generator.generate_fix(
+            chunk_text,
+            category,
+            analysis,
+            prefetched_templates=prefetched
+        )
+    
     def _save_analysis_to_db(self, data: Dict[str, Any]):
         try:
             placeholders = ', '.join(['?'] * len(data))
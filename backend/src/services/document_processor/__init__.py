@@ -1,17 +1,22 @@
 import time
 from pathlib import Path
-from typing import Tuple
+from typing import Tuple, Optional, Callable, Iterator, Union
 import logging
 
-from src.services.document_processor.pdf_processor import PDFProcessor
+from src.services.document_processor.pdf_processor import PDFProcessor, PageStream
 from src.services.document_processor.metadata_extractor import MetadataExtractor
 from src.services.document_processor.definition_extractor import DefinitionExtractor
 from src.services.document_processor.semantic_chunker import SemanticChunker
-from src.core.models import ProcessedDocument
-from src.utils.text_utils import clean_text
+from src.services.document_processor.document_cache import DocumentCache
+from src.services.document_processor.text_buffer import TextBuffer, ChunkView, LargeDocument
+from src.core.models import ProcessedDocument, SemanticChunk
+from src.config.settings import DocumentConfig
 
 logger = logging.getLogger(__name__)
 
+# on_progress(stage, done, total), e.g. ("extract", 12, 200)
+ProgressCallback = Callable[[str, int, int], None]
+
 class DocumentProcessor:
 
     def __init__(self):
@@ -19,16 +24,25 @@ class DocumentProcessor:
         self.metadata_extractor = MetadataExtractor()
         self.definition_extractor = DefinitionExtractor()
         self.semantic_chunker = SemanticChunker()
+        self.cache = DocumentCache()
     
-    def process(self, pdf_path: Path) -> ProcessedDocument:
+    def process(self, pdf_path: Path, data: Optional[bytes] = None) -> ProcessedDocument:
         start_time = time.time()
         logger.info(f"\n{'='*60}")
         logger.info(f"🚀 STAGE 1: Processing {pdf_path.name}")
         logger.info(f"{'='*60}\n")
         
+        if data is None:
+            data = pdf_path.read_bytes()
+        cache_key = self.cache.key(data)
+        cached = self.cached_document(cache_key, pdf_path.name, start_time)
+        if cached:
+            return cached
+        
         # Step 1: Extract text from PDF
-        full_text, base_metadata = self.pdf_processor.extract_text(pdf_path)
-        full_text = clean_text(full_text)
+        # Text comes back cleaned per page so page_offsets stay valid
+        extracted = self.pdf_processor.extract(pdf_path, data)
+        full_text, base_metadata = extracted.text, extracted.metadata
         logger.info(f"✅ Step 1/4: Extracted {len(full_text)} characters")
         
         # Step 2: Extract metadata
@@ -52,6 +66,7 @@ class DocumentProcessor:
             full_text=full_text,
             definitions=definitions,
             chunks=chunks,
+            page_offsets=extracted.page_offsets,
             total_chunks=len(chunks),
             avg_chunk_length=avg_chunk_length,
             processing_time_seconds=round(processing_time, 2)
@@ -64,8 +79,145 @@ class DocumentProcessor:
         logger.info(f"   • Time: {processing_time:.2f}s")
         logger.info(f"{'='*60}\n")
         
+        self.cache.put(cache_key, result)
         return result
 
+    def cached_document(self, cache_key: str, filename: str, start_time: float) -> Optional[ProcessedDocument]:
+        cached = self.cache.get(cache_key, filename)
+        if cached:
+            cached.processing_time_seconds = round(time.time() - start_time, 2)
+            logger.info(f"♻️ STAGE 1 cache hit: {cached.total_chunks} chunks in {cached.processing_time_seconds:.2f}s")
+        return cached
+
+    def process_stream(self, pdf_path: Path, data: Optional[bytes] = None,
+                       on_progress: Optional[ProgressCallback] = None) -> "DocumentStream":
+        """Like process(), but chunks are yielded while later pages are still being extracted"""
+        return DocumentStream(self, pdf_path, data, on_progress)
+
+class DocumentStream:
+    """
+    Iterating yields SemanticChunks as soon as the chunker has closed them;
+    pages are extracted STREAM_WINDOW_PAGES at a time. Once exhausted,
+    `document` holds the ProcessedDocument (metadata, definitions and
+    full_text need the whole text, so they are built at the end).
+    
+    Documents of LARGE_DOCUMENT_PAGES or more pages (`large` is set once
+    iteration starts) keep their text in a TextBuffer instead, and
+    `document` is a LargeDocument of ChunkViews; it is not cached.
+    Call close() once done with it.
+    """
+
+    def __init__(self, processor: DocumentProcessor, pdf_path: Path,
+                 data: Optional[bytes] = None, on_progress: Optional[ProgressCallback] = None):
+        self.processor = processor
+        self.pdf_path = pdf_path
+        self.data = data
+        self.on_progress = on_progress
+        self.document: Optional[Union[ProcessedDocument, LargeDocument]] = None
+        self.large = False
+        self._chunks: Optional[Iterator[SemanticChunk]] = None
+
+    def __iter__(self) -> Iterator[SemanticChunk]:
+        self._chunks = self._iterate()
+        return self._chunks
+
+    def close(self):
+        """Stop extraction if still running and release the PDF and the text buffer"""
+        if self._chunks is not None:
+            self._chunks.close()
+        if isinstance(self.document, LargeDocument):
+            self.document.close()
+
+    def _iterate(self) -> Iterator[SemanticChunk]:
+        start_time = time.time()
+        logger.info(f"\n{'='*60}")
+        logger.info(f"🚀 STAGE 1 (streaming): Processing {self.pdf_path.name}")
+        logger.info(f"{'='*60}\n")
+
+        data = self.data if self.data is not None else self.pdf_path.read_bytes()
+        cache_key = self.processor.cache.key(data, streamed=True)
+        cached = self.processor.cached_document(cache_key, self.pdf_path.name, start_time)
+        if cached:
+            if self.on_progress:
+                self.on_progress("extract", cached.metadata.page_count, cached.metadata.page_count)
+            self.document = cached
+            yield from cached.chunks
+            return
+
+        pages = PageStream(self.pdf_path, data)
+        self.large = 0 < DocumentConfig.LARGE_DOCUMENT_PAGES <= pages.page_count
+        buffer = TextBuffer() if self.large else None
+        if self.large:
+            logger.info(f"🐘 Large-document mode: {pages.page_count} pages")
+        parts = []
+        page_offsets = []
+        length = 0
+
+        def segments():
+            nonlocal length
+            for page_num, page_text in pages:
+                # Same joining as PDFProcessor.extract, so offsets match the batch path
+                separator = "\n\n" if page_text and length else ""
+                page_offsets.append(length + len(separator))
+                if buffer is not None:
+                    buffer.append(separator + page_text)
+                else:
+                    parts.append(separator + page_text)
+                length += len(separator) + len(page_text)
+                if self.on_progress:
+                    self.on_progress("extract", page_num + 1, pages.page_count)
+                yield separator + page_text
+
+        chunks = []
+        try:
+            for chunk in self.processor.semantic_chunker.chunk_stream(segments()):
+                if not chunks:
+                    logger.info(f"⚡ First chunk ready after {time.time() - start_time:.2f}s")
+                if self.large:
+                    chunks.append(ChunkView(chunk.id, chunk.start_char, chunk.end_char, chunk.word_count))
+                else:
+                    chunks.append(chunk)
+                yield chunk
+        except BaseException:
+            # Abandoned mid-document (error, memory limit): drop the spilled text now
+            if buffer is not None:
+                buffer.close()
+            raise
+
+        if self.large:
+            self.document = LargeDocument(
+                metadata=self.processor.metadata_extractor.extract_from_buffer(buffer, pages.metadata),
+                definitions=self.processor.definition_extractor.extract_from_buffer(buffer),
+                buffer=buffer,
+                chunks=chunks,
+                page_offsets=page_offsets,
+                processing_time_seconds=round(time.time() - start_time, 2)
+            )
+            logger.info(f"✅ STAGE 1 COMPLETE (streamed, large): {pages.page_count} pages, {len(chunks)} chunks, "
+                        f"{len(buffer):,} characters {'on disk' if buffer.on_disk else 'in memory'}")
+            return
+
+        full_text = "".join(parts)
+        metadata = self.processor.metadata_extractor.extract(full_text, pages.metadata)
+        definitions = self.processor.definition_extractor.extract(full_text)
+        avg_chunk_length = sum(c.word_count for c in chunks) / len(chunks) if chunks else 0
+        processing_time = time.time() - start_time
+
+        self.document = ProcessedDocument(
+            metadata=metadata,
+            full_text=full_text,
+            definitions=definitions,
+            chunks=chunks,
+            page_offsets=page_offsets,
+            total_chunks=len(chunks),
+            avg_chunk_length=avg_chunk_length,
+            processing_time_seconds=round(processing_time, 2)
+        )
+
+        logger.info(f"✅ STAGE 1 COMPLETE (streamed): {pages.page_count} pages, "
+                    f"{len(chunks)} chunks, {len(definitions)} definitions")
+        self.processor.cache.put(cache_key, self.document)
+
 def process_document(pdf_path: Path) -> ProcessedDocument:
     """Process a single document through Stage 1"""
     processor = DocumentProcessor()
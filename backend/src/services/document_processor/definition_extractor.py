@@ -1,8 +1,10 @@
 import re
-from typing import List, Dict
+from typing import List, Dict, Iterable, Tuple
 import logging
 
 from src.core.models import Definition
+from src.services.document_processor.text_buffer import TextBuffer
+from src.utils.pattern_registry import DEFINITION_MEANS, DEFINITION_AS_USED, SECTION_NUMBER
 
 logger = logging.getLogger(__name__)
 
@@ -13,18 +15,36 @@ class DefinitionExtractor:
 
         logger.info("📖 Extracting definitions...")
         
+        return DefinitionExtractor._collect(
+            ((match, full_text) for match in DEFINITION_MEANS.finditer(full_text)),
+            ((match, full_text) for match in DEFINITION_AS_USED.finditer(full_text))
+        )
+    
+    @staticmethod
+    def extract_from_buffer(buffer: TextBuffer) -> List[Definition]:
+        """extract() for large-document mode, scanning the buffer window by window"""
+        logger.info("📖 Extracting definitions...")
+        
+        return DefinitionExtractor._collect(
+            buffer.finditer(DEFINITION_MEANS, lead=100),
+            buffer.finditer(DEFINITION_AS_USED)
+        )
+    
+    @staticmethod
+    def _collect(
+        means_matches: Iterable[Tuple[re.Match, str]],
+        as_used_matches: Iterable[Tuple[re.Match, str]]
+    ) -> List[Definition]:
+        """Definitions from (match, text searched) pairs of both patterns"""
         definitions = []
         
         # Pattern 1: "Term" means/shall mean definition
-        pattern1 = r'"([^"]{3,50})"\s+(?:means?|shall mean|refers? to|is defined as)\s+([^.;]+[.;])'
-        matches1 = re.finditer(pattern1, full_text, re.IGNORECASE)
-        
-        for match in matches1:
+        for match, text in means_matches:
             term = match.group(1).strip()
             definition_text = match.group(2).strip()
             
-            context = full_text[max(0, match.start()-100):match.start()]
-            section_match = re.search(r'(\d+\.\d+)', context)
+            context = text[max(0, match.start()-100):match.start()]
+            section_match = SECTION_NUMBER.search(context)
             section = section_match.group(1) if section_match else None
             
             definitions.append(Definition(
@@ -34,10 +54,7 @@ class DefinitionExtractor:
             ))
         
         # Pattern 2: As used herein, "Term" means...
-        pattern2 = r'As used (?:herein|in this Agreement),\s+"([^"]{3,50})"\s+(?:means?|refers? to)\s+([^.;]+[.;])'
-        matches2 = re.finditer(pattern2, full_text, re.IGNORECASE)
-        
-        for match in matches2:
+        for match, _ in as_used_matches:
             term = match.group(1).strip()
             definition_text = match.group(2).strip()
             
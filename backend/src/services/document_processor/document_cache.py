@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from src.core.models import ProcessedDocument
+from src.config.settings import DocumentConfig, ChunkingConfig, EMBEDDING_MODEL
+from src.services.document_processor.ocr_processor import OCR_PIPELINE_VERSION
+from src.utils.gzip_store import GzipJSONStore, pack_embedding, unpack_embedding
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever Stage 1 output changes for the same input (extraction, cleaning, chunking)
+PROCESSOR_VERSION = "1"
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+@lru_cache(maxsize=2)
+def processor_fingerprint(streamed: bool = False) -> str:
+    """
+    Short hash of everything besides the file bytes that shapes Stage 1
+    output; the streaming chunker splits differently from the batch one
+    """
+    settings = {
+        "version": PROCESSOR_VERSION,
+        "streamed": streamed,
+        "ocr": OCR_PIPELINE_VERSION,
+        "embedding_model": EMBEDDING_MODEL,
+        "chunking": [
+            ChunkingConfig.MIN_CHUNK_LENGTH,
+            ChunkingConfig.MAX_CHUNK_LENGTH,
+            ChunkingConfig.SIMILARITY_THRESHOLD,
+            ChunkingConfig.MODE,
+            ChunkingConfig.STREAM_PERCENTILE_WINDOW
+        ],
+        "layout": [DocumentConfig.LAYOUT_ROW_MIN_BLOCKS, DocumentConfig.LAYOUT_MIN_RULINGS],
+        "ocr_min_chars": DocumentConfig.OCR_MIN_PAGE_CHARS
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:12]
+
+class DocumentCache:
+    """
+    On-disk cache of ProcessedDocument keyed by SHA-256 of the PDF bytes plus
+    processor_fingerprint(). Entries are gzipped JSON with chunk embeddings
+    packed as base64 float32; least recently used entries are removed once the
+    directory grows past DocumentConfig.CACHE_MAX_MB.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_mb: Optional[int] = None):
+        self.enabled = DocumentConfig.CACHE_ENABLED
+        self.cache_dir = Path(cache_dir or DocumentConfig.CACHE_DIR)
+        max_bytes = (max_mb if max_mb is not None else DocumentConfig.CACHE_MAX_MB) * 1024 * 1024
+        self.store = GzipJSONStore(self.cache_dir, max_bytes, "document cache entry")
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, data: bytes, streamed: bool = False) -> str:
+        return f"{content_hash(data)}-{processor_fingerprint(streamed)}"
+
+    def get(self, key: str, filename: Optional[str] = None) -> Optional[ProcessedDocument]:
+        if not self.enabled:
+            return None
+
+        try:
+            payload = self.store.read(key)
+            if payload is None or payload.get("format") != self.FORMAT:
+                return None
+            document = payload["document"]
+            for chunk in document["chunks"]:
+                if chunk.get("embedding"):
+                    chunk["embedding"] = unpack_embedding(chunk["embedding"])
+            result = ProcessedDocument.model_validate(document)
+        except Exception as e:
+            logger.warning(f"⚠️ Dropping unreadable document cache entry {key}: {e}")
+            self.store.remove(key)
+            return None
+
+        # Same bytes may arrive under another name
+        if filename:
+            result.metadata.filename = filename
+        self.store.touch(key)
+        return result
+
+    def put(self, key: str, document: ProcessedDocument):
+        if not self.enabled:
+            return
+        payload = document.model_dump(mode="json")
+        for chunk in payload["chunks"]:
+            if chunk.get("embedding"):
+                chunk["embedding"] = pack_embedding(chunk["embedding"])
+        self.store.write(key, {"format": self.FORMAT, "document": payload})
@@ -1,9 +1,12 @@
-import re
 from typing import List, Optional
 import logging
 
 from src.core.models import DocumentMetadata
+from src.services.document_processor.text_buffer import TextBuffer
 from src.config.settings import DocumentConfig
+from src.utils.pattern_registry import (
+    PARTY_PATTERNS, EFFECTIVE_DATE_PATTERNS, DATE_PUNCTUATION, AMOUNT_WITH_UNIT
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,18 +37,32 @@ class MetadataExtractor:
         logger.info(f"✅ Metadata extracted: {base_metadata.contract_type}, {len(parties or [])} parties")
         return base_metadata
     
+    @staticmethod
+    def extract_from_buffer(buffer: TextBuffer, base_metadata: DocumentMetadata) -> DocumentMetadata:
+        """extract() for large-document mode: the header is sliced, amounts are scanned window by window"""
+        header = buffer.slice(0, 3000)
+        amounts = {match.group() for match, _ in buffer.finditer(AMOUNT_WITH_UNIT)}
+        
+        parties = MetadataExtractor._extract_parties(header)
+        if parties:
+            base_metadata.parties = parties
+        effective_date = MetadataExtractor._extract_effective_date(header)
+        if effective_date:
+            base_metadata.effective_date = effective_date
+        if amounts:
+            base_metadata.mentioned_amounts = list(amounts)[:5]
+        if not base_metadata.contract_type:
+            base_metadata.contract_type = MetadataExtractor._classify_contract_type(header)
+        
+        logger.info(f"✅ Metadata extracted: {base_metadata.contract_type}, {len(parties or [])} parties")
+        return base_metadata
+    
     @staticmethod
     def _extract_parties(text: str) -> Optional[List[str]]:
         header = text[:2000]
         
-        patterns = [
-            r"(?:between|by and between)\s+([A-Z][^,\n]+?)\s+(?:and|&)\s+([A-Z][^,\n]+?)(?:\s*(?:,|\(|dated))",
-            r"entered into by\s+([A-Z][^,\n]+?)\s+and\s+([A-Z][^,\n]+?)(?:\s*(?:,|\())",
-            r"(?:^|\n)([A-Z][A-Za-z\s&]+(?:Inc|LLC|Corp|Ltd|Corporation))[^\n]{0,50}(?:\n|$)"
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, header, re.MULTILINE)
+        for pattern in PARTY_PATTERNS:
+            matches = pattern.findall(header)
             if matches:
                 if isinstance(matches[0], tuple):
                     parties = [m.strip() for match in matches[:2] for m in match]
@@ -62,17 +79,11 @@ class MetadataExtractor:
     def _extract_effective_date(text: str) -> Optional[str]:
         header = text[:2000]
         
-        patterns = [
-            r"effective\s+(?:date|as of)[:\s]+([^\n]+)",
-            r"dated\s+(?:as of\s+)?([A-Z][a-z]+\s+\d{1,2},?\s+\d{4})",
-            r"(?:this|entered into on)\s+([A-Z][a-z]+\s+\d{1,2},?\s+\d{4})",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, header, re.IGNORECASE)
+        for pattern in EFFECTIVE_DATE_PATTERNS:
+            match = pattern.search(header)
             if match:
                 date_str = match.group(1).strip()
-                date_str = re.sub(r'[^\w\s,]', '', date_str).strip()
+                date_str = DATE_PUNCTUATION.sub('', date_str).strip()
                 if 3 < len(date_str) < 50:
                     return date_str
         
@@ -80,8 +91,7 @@ class MetadataExtractor:
     
     @staticmethod
     def _extract_amounts(text: str) -> List[str]:
-        pattern = r'\$\s*[\d,]+(?:\.\d{2})?(?:\s*(?:million|billion|thousand|USD|dollars))?'
-        matches = re.findall(pattern, text, re.IGNORECASE)
+        matches = AMOUNT_WITH_UNIT.findall(text)
         
         unique_amounts = list(set(matches))
         return unique_amounts
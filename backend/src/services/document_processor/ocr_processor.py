@@ -0,0 +1,182 @@
+import fitz
+import pytesseract
+import numpy as np
+from PIL import Image
+from typing import Optional, Tuple, NamedTuple
+import hashlib
+import logging
+import time
+
+from src.config.settings import DocumentConfig
+from src.database import execute_query, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Bump when preprocessing changes so cached text from the old pipeline is not reused
+OCR_PIPELINE_VERSION = "1"
+
+class OCRPlan(NamedTuple):
+    dpi: int
+    angle: float
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Gray level that best separates ink from paper (Otsu's method)"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    p = hist / max(gray.size, 1)
+    omega = np.cumsum(p)
+    mu = np.cumsum(p * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mu[-1] * omega - mu) ** 2 / (omega * (1.0 - omega))
+    return int(np.nanargmax(np.nan_to_num(between, nan=-1.0)))
+
+class OCRProcessor:
+    """
+    Per-page OCR helpers. A low-DPI thumbnail of the page is rendered first;
+    it gives cheap estimates of text size (which picks the render DPI) and
+    skew. The full render keys the OCR cache, and is binarized and deskewed
+    before it reaches tesseract.
+    """
+
+    _cache_available = True
+    _last_prune = 0.0
+
+    @staticmethod
+    def render(page: fitz.Page, dpi: int) -> Image.Image:
+        """Rasterize one page to a grayscale PIL image; the pixmap is freed on return"""
+        pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+    @staticmethod
+    def thumbnail(page: fitz.Page) -> np.ndarray:
+        return np.asarray(OCRProcessor.render(page, DocumentConfig.OCR_THUMB_DPI))
+
+    @staticmethod
+    def page_hash(image: Image.Image, plan: OCRPlan) -> str:
+        """
+        Exact hash of the full render OCR would read: identical pages in any
+        upload share it. Not the thumbnail, where a changed digit or name can
+        vanish and the page would get another page's text
+        """
+        digest = hashlib.sha256(f"{OCR_PIPELINE_VERSION}:{image.size}:{plan.angle}".encode())
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def plan(thumbnail: np.ndarray) -> Optional[OCRPlan]:
+        """Pick DPI and deskew angle from the thumbnail; None for a blank page"""
+        ink = thumbnail < otsu_threshold(thumbnail)
+        if ink.mean() < 0.002:
+            return None
+
+        # Measure on the levelled mask; skewed lines smear into taller bands
+        angle = OCRProcessor._estimate_skew(ink)
+        if angle:
+            mask = Image.fromarray(ink.astype(np.uint8) * 255)
+            ink = np.asarray(mask.rotate(angle, resample=Image.NEAREST, fillcolor=0)) > 0
+
+        # Median height of inked row bands approximates one text line
+        row_has_ink = ink.sum(axis=1) > max(1, ink.shape[1] * 0.01)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], row_has_ink.astype(np.int8), [0]))))
+        heights = edges[1::2] - edges[0::2]
+        if len(heights) == 0:
+            return None
+        line_px = max(float(np.median(heights)), 1.0)
+
+        # Scale so a line lands near OCR_TARGET_LINE_PX pixels in the full render
+        dpi = DocumentConfig.OCR_TARGET_LINE_PX * DocumentConfig.OCR_THUMB_DPI / line_px
+        dpi = int(round(dpi / 25.0) * 25)
+        dpi = min(max(dpi, DocumentConfig.OCR_MIN_DPI), DocumentConfig.OCR_MAX_DPI)
+
+        return OCRPlan(dpi=dpi, angle=angle)
+
+    @staticmethod
+    def _estimate_skew(ink: np.ndarray) -> float:
+        """
+        Projection-profile deskew: the rotation under which row sums change
+        most sharply between adjacent rows is the one that levels text lines.
+        """
+        max_angle = DocumentConfig.OCR_MAX_SKEW_DEGREES
+        if max_angle <= 0:
+            return 0.0
+
+        mask = Image.fromarray(ink.astype(np.uint8) * 255)
+        best_angle, best_score = 0.0, -1.0
+        for angle in np.arange(-max_angle, max_angle + 1e-9, 0.5):
+            rotated = np.asarray(mask.rotate(float(angle), resample=Image.NEAREST, fillcolor=0))
+            profile = rotated.sum(axis=1, dtype=np.float64)
+            score = float(np.sum(np.diff(profile) ** 2))
+            if score > best_score:
+                best_angle, best_score = float(angle), score
+
+        return best_angle if abs(best_angle) >= 0.5 else 0.0
+
+    @staticmethod
+    def preprocess(image: Image.Image, angle: float) -> Image.Image:
+        if angle:
+            image = image.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+        gray = np.asarray(image)
+        return Image.fromarray(np.where(gray > otsu_threshold(gray), 255, 0).astype(np.uint8))
+
+    @staticmethod
+    def recognize(image: Image.Image, angle: float = 0.0) -> Tuple[str, float]:
+        """Worker: preprocess and OCR one page image; returns text and seconds spent"""
+        started = time.perf_counter()
+        text = pytesseract.image_to_string(OCRProcessor.preprocess(image, angle))
+        return text, time.perf_counter() - started
+
+    @staticmethod
+    def lookup(page_key: str) -> Optional[str]:
+        if not (DocumentConfig.OCR_CACHE_ENABLED and OCRProcessor._cache_available):
+            return None
+        try:
+            row = execute_query(
+                "SELECT text FROM ocr_cache WHERE page_hash = ?", (page_key,), fetch_one=True
+            )
+            return row["text"] if row else None
+        except Exception as e:
+            OCRProcessor._warn_cache(e)
+            return None
+
+    @staticmethod
+    def store(page_key: str, text: str, dpi: int, seconds: float):
+        if not (DocumentConfig.OCR_CACHE_ENABLED and OCRProcessor._cache_available):
+            return
+        try:
+            execute_query(
+                "INSERT OR REPLACE INTO ocr_cache (page_hash, text, dpi, ocr_seconds) VALUES (?, ?, ?, ?)",
+                (page_key, text, dpi, round(seconds, 3))
+            )
+        except Exception as e:
+            OCRProcessor._warn_cache(e)
+            return
+
+        now = time.time()
+        if now - OCRProcessor._last_prune >= DocumentConfig.OCR_CACHE_PRUNE_INTERVAL_SECONDS:
+            OCRProcessor._last_prune = now
+            try:
+                OCRProcessor.prune_cache()
+            except Exception as e:
+                logger.warning(f"⚠️ OCR cache prune failed: {e}")
+
+    @staticmethod
+    def prune_cache() -> int:
+        """Drop pages OCR'd over OCR_CACHE_TTL_DAYS ago, then the oldest beyond OCR_CACHE_MAX_PAGES"""
+        with get_db_connection() as conn:
+            removed = conn.execute(
+                "DELETE FROM ocr_cache WHERE created_at < datetime('now', ?)",
+                (f"-{DocumentConfig.OCR_CACHE_TTL_DAYS} days",)
+            ).rowcount
+            removed += conn.execute(
+                "DELETE FROM ocr_cache WHERE page_hash IN "
+                "(SELECT page_hash FROM ocr_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (DocumentConfig.OCR_CACHE_MAX_PAGES,)
+            ).rowcount
+        if removed:
+            logger.info(f"🧹 Pruned {removed} OCR cache entries")
+        return removed
+
+    @staticmethod
+    def _warn_cache(error: Exception):
+        # Stop trying for this process rather than failing every page
+        OCRProcessor._cache_available = False
+        logger.warning(f"⚠️ OCR cache unavailable, pages will be OCR'd every time: {error}")
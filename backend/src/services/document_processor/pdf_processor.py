@@ -1,141 +1,303 @@
-import fitz  
+import fitz
 import pdfplumber
 import pytesseract
-from pdf2image import convert_from_path
-from PIL import Image
 from pathlib import Path
-from typing import Tuple
+from typing import Tuple, List, Optional, Union, Dict, Iterator, Callable
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import logging
 import os
 import io
+import threading
 
-from src.core.models import DocumentMetadata
+from src.core.models import DocumentMetadata, ExtractedPDF
+from src.config.settings import DocumentConfig
+from src.services.document_processor.ocr_processor import OCRProcessor
+from src.utils.text_utils import clean_text
 
 logger = logging.getLogger(__name__)
 
 # Configure Tesseract path from env or default
 TESSERACT_CMD = os.getenv("TESSERACT_CMD", r"C:\Program Files\Tesseract-OCR\tesseract.exe")
-POPPLER_PATH = os.getenv("POPPLER_PATH", r"C:\Program Files\poppler-25.12.0\Library\bin")
 
 # Set the tesseract command
 if os.path.exists(TESSERACT_CMD):
     pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
 
+# Reused across documents; spinning up a pool per upload costs more than small PDFs take.
+# Sized once: a caller's `workers` only sets how many shards a document is split into.
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_extraction_pool_lock = threading.Lock()
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(max_workers=max(1, DocumentConfig.EXTRACTION_WORKERS))
+        return _extraction_pool
+
+def _open_plumber(source: Union[str, bytes]) -> pdfplumber.PDF:
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+def _plumber_page_texts(pdfplumber_doc: pdfplumber.PDF, page_numbers: List[int]) -> List[str]:
+    texts = []
+    for page_num in page_numbers:
+        if page_num >= len(pdfplumber_doc.pages):
+            texts.append("")
+            continue
+        pdfplumber_page = pdfplumber_doc.pages[page_num]
+        texts.append(pdfplumber_page.extract_text() or "")
+        # Release the parsed layout; long documents otherwise keep every page cached
+        pdfplumber_page.flush_cache()
+    return texts
+
+def _plumber_extract_pages(source: Union[str, bytes], page_numbers: List[int]) -> List[str]:
+    """Worker: open the document once with pdfplumber and return texts for the given pages"""
+    with _open_plumber(source) as pdfplumber_doc:
+        return _plumber_page_texts(pdfplumber_doc, page_numbers)
+
+def _needs_layout_extraction(page: fitz.Page, text: str) -> bool:
+    """
+    Cheap PyMuPDF check for pages where pdfplumber's layout-aware extraction
+    is worth running: several text blocks side by side on one row (columns,
+    table cells) or enough vector rulings to draw a grid.
+    """
+    if not text.strip():
+        return False
+
+    rows = Counter(
+        round(block[1])
+        for block in page.get_text("blocks")
+        if block[6] == 0 and block[4].strip()
+    )
+    if rows and max(rows.values()) >= DocumentConfig.LAYOUT_ROW_MIN_BLOCKS:
+        return True
+
+    get_drawings = getattr(page, "get_cdrawings", page.get_drawings)
+    rulings = sum(
+        1
+        for drawing in get_drawings()
+        for item in drawing["items"]
+        if item[0] in ("l", "re")
+    )
+    return rulings >= DocumentConfig.LAYOUT_MIN_RULINGS
+
+def _needs_ocr(page: fitz.Page, text: str) -> bool:
+    """A page with (almost) no text layer but an embedded image is a scan"""
+    return len(text.strip()) < DocumentConfig.OCR_MIN_PAGE_CHARS and bool(page.get_images())
+
 class PDFProcessor:
-    
+
     @staticmethod
-    def extract_text(pdf_path: Path) -> Tuple[str, DocumentMetadata]:
+    def extract_text(pdf_path: Path, data: Optional[bytes] = None) -> Tuple[str, DocumentMetadata]:
+        extracted = PDFProcessor.extract(pdf_path, data)
+        return extracted.text, extracted.metadata
 
+    @staticmethod
+    def extract(pdf_path: Path, data: Optional[bytes] = None,
+                workers: Optional[int] = None) -> ExtractedPDF:
+        """
+        Single pass over the document: PyMuPDF reads every page (from `data`
+        when the bytes are already in memory), pdfplumber only re-reads pages
+        whose layout suggests tables, scanned pages are OCR'd individually and
+        metadata comes from the same handle. Pages are cleaned individually so
+        `page_offsets` index the returned text.
+        """
         logger.info(f"📄 Processing: {pdf_path.name}")
-        
+
         try:
-            # Step 1: Try Text Extraction
-            full_text = PDFProcessor._hybrid_extract(pdf_path)
-            
-            # Step 2: Quality Check (If extracted text is too short, assume scanned)
-            if len(full_text.strip()) < 100:  
-                logger.info("🔍 Detect scanned document (text < 100 chars). Switching to OCR...")
-                full_text = PDFProcessor._ocr_extract(pdf_path)
-                
-            metadata = PDFProcessor._extract_metadata(pdf_path)
-            return full_text, metadata
-            
+            # One window spanning the whole document so pdfplumber pages shard across the pool
+            pages = PageStream(pdf_path, data, window=0, workers=workers)
+            page_texts = [text for _, text in pages]
+
+            text, page_offsets = PDFProcessor._join_pages(page_texts)
+            return ExtractedPDF(
+                text=text,
+                metadata=pages.metadata,
+                page_offsets=page_offsets,
+                layout_pages=pages.layout_pages,
+                ocr_pages=pages.ocr_pages,
+                ocr_seconds=pages.ocr_seconds
+            )
+
         except Exception as e:
             logger.error(f"❌ Extraction failed: {e}")
-            return PDFProcessor._fallback_extract(pdf_path)
-    
+            return PDFProcessor._fallback_extract(pdf_path, data)
+
     @staticmethod
-    def _hybrid_extract(pdf_path: Path) -> str:
+    def _hybrid_extract(doc: fitz.Document, pdf_path: Path, data: Optional[bytes] = None,
+                        workers: Optional[int] = None,
+                        pages: Optional[range] = None,
+                        get_plumber: Optional[Callable[[], Optional[pdfplumber.PDF]]] = None
+                        ) -> Tuple[List[str], List[int], List[int]]:
+        """
+        PyMuPDF text for each page in `pages` (default: all), replaced by
+        pdfplumber's where layout detection flagged the page and plumber
+        recovered at least as much. Flagged pages are sharded across worker
+        processes once there are PARALLEL_MIN_PAGES of them; below that the
+        handle from `get_plumber` is reused when there is one (opening parses
+        the whole page tree). Also returns the pages that need OCR. Page numbers
+        are absolute.
+        """
+        workers = workers or DocumentConfig.EXTRACTION_WORKERS
+        pages = pages if pages is not None else range(len(doc))
 
-        full_text = ""
-        
-        pymupdf_doc = fitz.open(pdf_path)
-        pdfplumber_doc = pdfplumber.open(pdf_path)
-        
-        try:
-            for page_num in range(len(pymupdf_doc)):
-                pymupdf_text = pymupdf_doc[page_num].get_text()
-                
-                # Check if page exists in plumber
-                if page_num < len(pdfplumber_doc.pages):
-                    pdfplumber_page = pdfplumber_doc.pages[page_num]
-                    pdfplumber_text = pdfplumber_page.extract_text()
-                else:
-                    pdfplumber_text = ""
-                
-                # Use plumber if it got more text (better at tables), else fitz
-                if pdfplumber_text and len(pdfplumber_text) > len(pymupdf_text) * 0.9:
-                    page_text = pdfplumber_text
-                else:
-                    page_text = pymupdf_text
-                
-                full_text += page_text + "\n\n"
-                
-        finally:
-            pymupdf_doc.close()
-            pdfplumber_doc.close()
-        
-        logger.debug(f"✅ Text extraction result: {len(full_text)} chars")
-        return full_text
+        page_texts = []
+        layout_pages = []
+        ocr_pages = []
+        for page_num in pages:
+            page = doc[page_num]
+            text = page.get_text()
+            page_texts.append(text)
+            if _needs_ocr(page, text):
+                ocr_pages.append(page_num)
+            elif _needs_layout_extraction(page, text):
+                layout_pages.append(page_num)
+
+        if not layout_pages:
+            return page_texts, layout_pages, ocr_pages
+
+        # Workers re-open by path when there is one; pickling the bytes per shard costs more
+        source = str(pdf_path) if data is None or pdf_path.exists() else data
+        plumber_texts: Dict[int, str] = {}
+
+        if workers <= 1 or len(layout_pages) < DocumentConfig.PARALLEL_MIN_PAGES:
+            plumber_doc = get_plumber() if get_plumber else None
+            if plumber_doc is not None:
+                texts = _plumber_page_texts(plumber_doc, layout_pages)
+            else:
+                texts = _plumber_extract_pages(source, layout_pages)
+            plumber_texts.update(zip(layout_pages, texts))
+        else:
+            shards = min(workers, len(layout_pages))
+            bounds = [len(layout_pages) * i // shards for i in range(shards + 1)]
+            shard_pages = [layout_pages[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+            pool = _get_extraction_pool()
+
+            for shard, shard_texts in zip(shard_pages, pool.map(_plumber_extract_pages, [source] * shards, shard_pages)):
+                plumber_texts.update(zip(shard, shard_texts))
+            logger.debug(f"   pdfplumber pass over {len(layout_pages)} pages across {shards} workers")
+
+        for page_num, pdfplumber_text in plumber_texts.items():
+            # Use plumber if it got more text (better at tables), else fitz
+            if pdfplumber_text and len(pdfplumber_text) > len(page_texts[page_num - pages.start]) * 0.9:
+                page_texts[page_num - pages.start] = pdfplumber_text
+
+        logger.debug(f"✅ Text extraction: {len(pages)} pages, {len(layout_pages)} via pdfplumber")
+        return page_texts, layout_pages, ocr_pages
 
     @staticmethod
-    def _ocr_extract(pdf_path: Path) -> str:
-        """extract text from scanned PDF using OCR"""
-        full_text = ""
-        
-        try:
-            # Check poppler path explicitly
-            poppler_bin = POPPLER_PATH
-            if not os.path.exists(poppler_bin):
-                 logger.warning(f"⚠️ Poppler not found at {poppler_bin}. OCR might fail.")
-
-            # Convert PDF pages to images
-            images = convert_from_path(pdf_path, poppler_path=poppler_bin)
-            
-            total_pages = len(images)
-            logger.info(f"📷 OCR Processing {total_pages} pages...")
-            
-            for i, image in enumerate(images):
-                # Basic preprocessing can be added here (e.g., contrast)
-                text = pytesseract.image_to_string(image)
-                full_text += text + "\n\n"
-                logger.debug(f"   - Page {i+1}/{total_pages} OCR complete")
-                
-            return full_text
-            
-        except Exception as e:
-            logger.error(f"❌ OCR Extraction Native Failed: {e}")
-            return "OCR FAILED: Could not extract text from this document."
+    def _join_pages(page_texts: List[str]) -> Tuple[str, List[int]]:
+        """Join cleaned pages with blank lines, recording where each page starts"""
+        parts = []
+        page_offsets = []
+        length = 0
+
+        for page_text in page_texts:
+            if page_text and parts:
+                parts.append("\n\n")
+                length += 2
+            page_offsets.append(length)
+            if page_text:
+                parts.append(page_text)
+                length += len(page_text)
+
+        return "".join(parts), page_offsets
 
     @staticmethod
-    def _fallback_extract(pdf_path: Path) -> Tuple[str, DocumentMetadata]:
-        doc = fitz.open(pdf_path)
-        full_text = ""
-        
-        for page in doc:
-            full_text += page.get_text() + "\n\n"
-        
+    def _ocr_extract(doc: fitz.Document, page_numbers: List[int],
+                     workers: Optional[int] = None) -> Tuple[Dict[int, str], Dict[int, float]]:
+        """
+        OCR the given pages. Each page is rendered at the DPI its thumbnail
+        suggests and the render hashed; cached text is reused, otherwise the
+        render goes to a thread pool that deskews, binarizes and runs
+        tesseract. Rendering pauses once 2 * workers images are waiting, so
+        memory does not grow with page count. Pages that fail keep their
+        PyMuPDF text. Returns texts and OCR seconds per freshly OCR'd page.
+        """
+        workers = workers or DocumentConfig.OCR_WORKERS
+        texts: Dict[int, str] = {}
+        seconds: Dict[int, float] = {}
+        # Identical pages within one document (repeated exhibits) are OCR'd once
+        pending: Dict[str, List[int]] = {}
+        in_flight = deque()
+        cache_hits = 0
+
+        def collect():
+            page_key, dpi, future = in_flight.popleft()
+            page_nums = pending.pop(page_key)
+            try:
+                text, elapsed = future.result()
+            except Exception as e:
+                logger.error(f"❌ OCR failed on page {page_nums[0] + 1}: {e}")
+                return
+            OCRProcessor.store(page_key, text, dpi, elapsed)
+            for page_num in page_nums:
+                texts[page_num] = text
+            seconds[page_nums[0]] = round(elapsed, 3)
+            logger.debug(f"   - Page {page_nums[0] + 1} OCR complete ({dpi} DPI, {elapsed:.2f}s)")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for page_num in page_numbers:
+                page = doc[page_num]
+                plan = OCRProcessor.plan(OCRProcessor.thumbnail(page))
+                if plan is None:
+                    texts[page_num] = ""
+                    continue
+
+                if len(in_flight) >= workers * 2:
+                    collect()
+                image = OCRProcessor.render(page, plan.dpi)
+                page_key = OCRProcessor.page_hash(image, plan)
+
+                if page_key in pending:
+                    pending[page_key].append(page_num)
+                    continue
+                cached = OCRProcessor.lookup(page_key)
+                if cached is not None:
+                    texts[page_num] = cached
+                    cache_hits += 1
+                    continue
+                pending[page_key] = [page_num]
+                in_flight.append((page_key, plan.dpi, pool.submit(OCRProcessor.recognize, image, plan.angle)))
+                del image
+            while in_flight:
+                collect()
+
+        if seconds:
+            logger.info(
+                f"📷 OCR: {len(seconds)} pages in {sum(seconds.values()):.1f}s "
+                f"({sum(seconds.values()) / len(seconds):.2f}s/page), {cache_hits} from cache"
+            )
+        elif cache_hits:
+            logger.info(f"📷 OCR: all {cache_hits} pages from cache")
+        return texts, seconds
+
+    @staticmethod
+    def _fallback_extract(pdf_path: Path, data: Optional[bytes] = None) -> ExtractedPDF:
+        doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(pdf_path)
+        page_texts = [clean_text(page.get_text()) for page in doc]
+
         metadata = DocumentMetadata(
             filename=pdf_path.name,
-            file_size=pdf_path.stat().st_size,
+            file_size=len(data) if data is not None else pdf_path.stat().st_size,
             page_count=len(doc)
         )
-        
+
         doc.close()
         logger.warning("⚠️ Used fallback extraction")
-        return full_text, metadata
-    
+        text, page_offsets = PDFProcessor._join_pages(page_texts)
+        return ExtractedPDF(text=text, metadata=metadata, page_offsets=page_offsets)
+
     @staticmethod
-    def _extract_metadata(pdf_path: Path) -> DocumentMetadata:
-        doc = fitz.open(pdf_path)
-        
+    def _extract_metadata(doc: fitz.Document, pdf_path: Path, file_size: Optional[int] = None) -> DocumentMetadata:
         metadata = DocumentMetadata(
             filename=pdf_path.name,
-            file_size=pdf_path.stat().st_size,
+            file_size=file_size if file_size is not None else pdf_path.stat().st_size,
             page_count=len(doc)
         )
-        
-        pdf_metadata = doc.metadata
+
+        pdf_metadata = doc.metadata or {}
         if pdf_metadata.get('title'):
             title_lower = pdf_metadata['title'].lower()
             if 'nda' in title_lower or 'non-disclosure' in title_lower:
@@ -144,6 +306,75 @@ class PDFProcessor:
                 metadata.contract_type = "Service Agreement"
             elif 'employment' in title_lower:
                 metadata.contract_type = "Employment Contract"
-        
-        doc.close()
-        return metadata
\ No newline at end of file
+
+        return metadata
+
+
+class PageStream:
+    """
+    Page-by-page extraction for the streaming pipeline. The document is opened
+    once, metadata is read up front, and pages are extracted in windows of
+    `window` pages (0: the whole document) with the same pdfplumber and OCR
+    rules as PDFProcessor.extract. Iterating yields (page_num, cleaned_text)
+    in page order; the document is closed when iteration ends.
+    """
+
+    def __init__(self, pdf_path: Path, data: Optional[bytes] = None,
+                 window: Optional[int] = None, workers: Optional[int] = None):
+        self.pdf_path = pdf_path
+        self.data = data
+        self.workers = workers
+        self.doc = fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(pdf_path)
+        self.page_count = len(self.doc)
+        self.window = (window if window is not None else DocumentConfig.STREAM_WINDOW_PAGES) or self.page_count
+        try:
+            self.metadata = PDFProcessor._extract_metadata(
+                self.doc, pdf_path, len(data) if data is not None else None
+            )
+        except Exception:
+            self.close()
+            raise
+
+        self._plumber_doc: Optional[pdfplumber.PDF] = None
+
+        self.layout_pages: List[int] = []
+        self.ocr_pages: List[int] = []
+        self.ocr_seconds: Dict[int, float] = {}
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        try:
+            for first in range(0, self.page_count, max(self.window, 1)):
+                pages = range(first, min(first + self.window, self.page_count))
+                page_texts, layout_pages, ocr_pages = PDFProcessor._hybrid_extract(
+                    self.doc, self.pdf_path, self.data, self.workers, pages, self._plumber
+                )
+                self.layout_pages.extend(layout_pages)
+
+                if ocr_pages:
+                    logger.info(f"🔍 {len(ocr_pages)}/{len(pages)} pages look scanned. Running OCR on them...")
+                    ocr_texts, ocr_seconds = PDFProcessor._ocr_extract(self.doc, ocr_pages)
+                    for page_num, text in ocr_texts.items():
+                        page_texts[page_num - first] = text
+                    self.ocr_pages.extend(ocr_pages)
+                    self.ocr_seconds.update(ocr_seconds)
+
+                for page_num, text in zip(pages, page_texts):
+                    yield page_num, clean_text(text)
+        finally:
+            self.close()
+
+    def _plumber(self) -> Optional[pdfplumber.PDF]:
+        """Shared pdfplumber handle across windows; the whole-document window doesn't need one"""
+        if self.window >= self.page_count:
+            return None
+        if self._plumber_doc is None:
+            source = self.data if self.data is not None else str(self.pdf_path)
+            self._plumber_doc = _open_plumber(source)
+        return self._plumber_doc
+
+    def close(self):
+        if not self.doc.is_closed:
+            self.doc.close()
+        if self._plumber_doc is not None:
+            self._plumber_doc.close()
+            self._plumber_doc = None
@@ -0,0 +1,170 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Heading ranks; a heading closes every open heading of equal or higher rank.
+# ARTICLE lines and ALL-CAPS headings sit above numbering, numbering depth n
+# is rank n, and (a)/(ii)/(1) items nest below any numbering.
+RANK_HEADING = 0
+RANK_LETTER = 10
+RANK_ROMAN = 11
+RANK_DIGIT = 12
+
+# The text after a heading's number never starts lowercase; that is a wrapped
+# sentence ("Section 4.2 of this Agreement...")
+_ARTICLE = re.compile(r'(?:ARTICLE|Article)\s+([IVXLC]+|\d+)\b[.:\-–—]?(?:\s+([^a-z\s].*))?$')
+_SECTION = re.compile(r'(?:SECTION|Section|§)\s*(\d+(?:\.\d+)*)\.?(?:\s+([A-Z(].*))?$')
+# "12." or "12.3" / "12.3.1" (optionally with a trailing dot), then a capital, "(" or nothing
+_NUMBERED = re.compile(r'(\d{1,3}\.(?:\d{1,3}\.?)*)(?:\s+([A-Z(].*))?$')
+_ITEM = re.compile(r'\(([a-z]{1,2}|[ivxlc]{1,6}|\d{1,2})\)\s+\S')
+_ROMAN = re.compile(r'[ivxlc]+$')
+_TITLE = re.compile(r"([A-Z][A-Za-z0-9,'&/\- ]{2,60}?)\.(?:\s|$)")
+
+PathElement = Tuple[int, str]
+
+class Section(NamedTuple):
+    """[start, end) of the document text under one heading, with the headings above it"""
+    start: int
+    end: int
+    path: Tuple[PathElement, ...]
+
+    @property
+    def labels(self) -> List[str]:
+        return [label for _, label in self.path]
+
+def _is_caps_heading(line: str) -> bool:
+    letters = sum(c.isalpha() for c in line)
+    return (
+        4 <= len(line) <= 80
+        and letters >= 4
+        and not any(c.islower() for c in line)
+        and not line[0].isdigit()
+        and not line.endswith((",", ";"))
+    )
+
+def _is_title(text: str) -> bool:
+    words = text.split()
+    return 0 < len(words) <= 8 and all(w[0].isupper() or len(w) <= 3 for w in words)
+
+def _numbered_label(number: str, rest: Optional[str]) -> str:
+    number = number.rstrip(".")
+    rest = (rest or "").strip()
+    if not rest:
+        return number
+    if (not any(c.islower() for c in rest) and len(rest) <= 80) or (len(rest) <= 60 and _is_title(rest)):
+        return f"{number} {rest}"
+    # "12.3 Termination for Cause. The Vendor may..." -> "12.3 Termination for Cause"
+    title = _TITLE.match(rest)
+    if title and _is_title(title.group(1)):
+        return f"{number} {title.group(1).strip()}"
+    return number
+
+class SectionParser:
+    """
+    Splits contract text into sections at heading lines: ARTICLE/Section
+    headings, decimal numbering (12., 12.3, 12.3.1), (a)/(ii)/(1) items at
+    the start of a line and ALL-CAPS heading lines. Works incrementally:
+    feed() takes consecutive pieces of the document and returns the sections
+    closed so far, so the streaming chunker can use it page by page.
+    """
+
+    def __init__(self):
+        self.offset = 0         # document offset of the first character not yet split into lines
+        self.pending_line = ""  # text after the last newline, waiting for the rest of its line
+        self.start = 0
+        self.path: List[PathElement] = []
+        self.has_body = False   # the open section has text besides its heading
+        self.caps_seen: Dict[str, int] = {}
+
+    def feed(self, text: str, final: bool = False) -> List[Section]:
+        text = self.pending_line + text
+        line_start = self.offset - len(self.pending_line)
+        closed = []
+
+        lines = text.split("\n")
+        self.pending_line = "" if final else lines.pop()
+        for line in lines:
+            section = self._line(line, line_start)
+            if section:
+                closed.append(section)
+            line_start += len(line) + 1
+
+        self.offset = line_start + len(self.pending_line)
+        if final:
+            # line_start is one past the end: the last line had no newline
+            end = line_start - 1
+            if end > self.start:
+                closed.append(Section(self.start, end, tuple(self.path)))
+            self.start = end
+        return closed
+
+    def _line(self, line: str, line_start: int) -> Optional[Section]:
+        stripped = line.strip()
+        if not stripped:
+            return None
+
+        heading = self._heading(stripped)
+        if heading is None:
+            self.has_body = True
+            return None
+
+        rank, label = heading
+        previous = self.path[-1][1] if self.path else ""
+        if rank == RANK_HEADING and not self.has_body and label.isupper() \
+                and previous.startswith("Article ") and len(previous.split()) == 2:
+            # "ARTICLE 5" on one line and "TERMINATION" on the next: one heading
+            self.path[-1] = (RANK_HEADING, f"{previous} {label}")
+            return None
+
+        closed = None
+        section_start = line_start + (len(line) - len(line.lstrip()))
+        if section_start > self.start:
+            closed = Section(self.start, section_start, tuple(self.path))
+
+        while self.path and self.path[-1][0] >= rank:
+            self.path.pop()
+        self.path.append((rank, label))
+        self.start = section_start
+        # An item or numbered line usually carries its clause text on the same line
+        self.has_body = rank != RANK_HEADING and len(stripped) > len(label) + 1
+        return closed
+
+    def _heading(self, line: str) -> Optional[PathElement]:
+        match = _ARTICLE.match(line)
+        if match:
+            title = (match.group(2) or "").strip(" -–—")
+            label = f"Article {match.group(1)}"
+            return RANK_HEADING, f"{label} {title}" if title and not any(c.islower() for c in title) else label
+
+        match = _SECTION.match(line) or _NUMBERED.match(line)
+        if match:
+            number = match.group(1)
+            depth = len([part for part in number.split(".") if part])
+            return depth, _numbered_label(number, match.group(2))
+
+        match = _ITEM.match(line)
+        if match:
+            marker = match.group(1)
+            return self._item_rank(marker), f"({marker})"
+
+        if _is_caps_heading(line):
+            # Running headers repeat on every page; only the first sighting counts
+            seen = self.caps_seen.get(line, 0)
+            self.caps_seen[line] = seen + 1
+            if seen:
+                return None
+            return RANK_HEADING, line.rstrip(".:")
+        return None
+
+    def _item_rank(self, marker: str) -> int:
+        if marker.isdigit():
+            return RANK_DIGIT
+        if not _ROMAN.match(marker):
+            return RANK_LETTER
+        # (i), (v), (x)... are letters when they continue a lettered list
+        letter = next((label for rank, label in reversed(self.path) if rank == RANK_LETTER), None)
+        if letter and len(marker) == 1 and len(letter) == 3 and ord(letter[1]) == ord(marker) - 1:
+            return RANK_LETTER
+        return RANK_ROMAN
+
+def parse_sections(text: str) -> List[Section]:
+    return SectionParser().feed(text, final=True)
@@ -1,15 +1,116 @@
 import re
-from typing import List, Tuple
+from typing import List, Tuple, Iterable, Iterator, Optional
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import logging
 
 from src.core.models import SemanticChunk
 from src.config.settings import ChunkingConfig
+from src.services.document_processor.section_parser import SectionParser, Section, RANK_HEADING
 
 logger = logging.getLogger(__name__)
 
+# Sentences end at runs of . ! ? followed by whitespace. Abbreviation periods
+# are masked (same length, so offsets hold) so they do not end a sentence
+_PROTECTED_PERIOD = re.compile(r'\b(?:[A-Z][a-z]?|Inc|LLC|Corp|Ltd)\.(?=\s)')
+_SENTENCE_BOUNDARY = re.compile(r'[.!?]+\s+')
+
+def _sentence_spans(text: str, final: bool = True) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    (start, end) of each kept sentence in `text` plus how far the text was
+    consumed. With final=False the text after the last boundary is left for
+    the next call, since more of the sentence may still arrive.
+    """
+    masked = _PROTECTED_PERIOD.sub(lambda m: m.group()[:-1] + "\x00", text)
+    spans = []
+    pos = 0
+
+    def add(start: int, end: int):
+        piece = text[start:end]
+        stripped = piece.strip()
+        if len(stripped) > 20:
+            start += len(piece) - len(piece.lstrip())
+            spans.append((start, start + len(stripped)))
+
+    for match in _SENTENCE_BOUNDARY.finditer(masked):
+        add(pos, match.start())
+        pos = match.end()
+
+    if final:
+        add(pos, len(text))
+        pos = len(text)
+    return spans, pos
+
+def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def _adjacent_similarities(embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each sentence with the next, as one row-wise dot product"""
+    vectors = _normalize_rows(embeddings)
+    return np.einsum("ij,ij->i", vectors[:-1], vectors[1:])
+
+def _chunk_end(spans: List[Tuple[int, int]], text_length: int) -> int:
+    """
+    Offset in the document where a chunk ends. Chunk text joins its sentences
+    with single spaces and may be cut at MAX_CHUNK_LENGTH, so walk the spans
+    to the sentence the cut falls in.
+    """
+    remaining = text_length
+    for start, end in spans:
+        if remaining <= end - start:
+            return start + remaining
+        remaining -= end - start + 1
+    return spans[-1][1]
+
+def _chunk_embedding(sentence_embeddings: np.ndarray) -> List[float]:
+    """Normalized mean of a chunk's (normalized) sentence embeddings"""
+    mean = _normalize_rows(sentence_embeddings).mean(axis=0)
+    norm = np.linalg.norm(mean)
+    return (mean / norm if norm else mean).tolist()
+
+def _split_least_similar(offsets: List[int], similarities: np.ndarray, lo: int, hi: int) -> List[Tuple[int, int]]:
+    """
+    Sentence ranges covering [lo, hi) whose joined text fits MAX_CHUNK_LENGTH:
+    split at the least similar adjacent pair, preferring splits that leave
+    MIN_CHUNK_LENGTH on both sides, and recurse. offsets[k] is the total
+    length of the first k sentences.
+    """
+    def joined(a: int, b: int) -> int:
+        return offsets[b] - offsets[a] + b - a - 1
+
+    if hi - lo < 2 or joined(lo, hi) <= ChunkingConfig.MAX_CHUNK_LENGTH:
+        return [(lo, hi)]
+    candidates = range(lo + 1, hi)
+    balanced = [k for k in candidates
+                if joined(lo, k) >= ChunkingConfig.MIN_CHUNK_LENGTH and joined(k, hi) >= ChunkingConfig.MIN_CHUNK_LENGTH]
+    split = min(balanced or candidates, key=lambda k: similarities[k - 1])
+    return _split_least_similar(offsets, similarities, lo, split) + _split_least_similar(offsets, similarities, split, hi)
+
+def _common_path(a: tuple, b: tuple) -> tuple:
+    n = 0
+    while n < min(len(a), len(b)) and a[n] == b[n]:
+        n += 1
+    return a[:n]
+
+def _context_chunk(pending: dict, buffer: str, base: int) -> SemanticChunk:
+    """SemanticChunk for a closed chunk, with 50 characters of context read from the stream buffer"""
+    start, end = pending["start_char"], pending["end_char"]
+    preceding = buffer[max(0, start - 50 - base):start - base].strip()
+    following = buffer[end - base:end + 50 - base].strip()
+    return SemanticChunk(
+        id=pending["id"],
+        text=pending["text"].strip(),
+        start_char=start,
+        end_char=end,
+        word_count=len(pending["text"].split()),
+        embedding=pending["embedding"],
+        preceding_text=preceding if preceding else None,
+        following_text=following if following else None,
+        section_path=pending.get("section_path", [])
+    )
+
 class SemanticChunker:
     def __init__(self):
         self.model = SentenceTransformer('all-MiniLM-L6-v2')
@@ -17,16 +118,23 @@ class SemanticChunker:
     
     def chunk_text(self, full_text: str) -> List[SemanticChunk]:
 
+        if ChunkingConfig.MODE == "structure":
+            # One pass of the streaming implementation, so both paths agree
+            chunks = list(self.chunk_stream([full_text]))
+            logger.info(f"✅ Created {len(chunks)} structure-aware chunks")
+            return chunks
+        
         logger.info("🔪 Starting semantic chunking...")
         
-        # Step 1: Split into sentences
-        sentences = self._split_sentences(full_text)
-        logger.debug(f"   Split into {len(sentences)} sentences")
+        # Step 1: Split into sentences, keeping where each one sits in the text
+        spans = self._split_sentences(full_text)
+        logger.debug(f"   Split into {len(spans)} sentences")
         
-        if len(sentences) < 2:
+        if len(spans) < 2:
             return [self._create_chunk(full_text, 0, len(full_text), "chunk_001")]
         
         # Step 2: Embed sentences
+        sentences = [full_text[start:end] for start, end in spans]
         embeddings = self.model.encode(sentences, show_progress_bar=False)
         logger.debug(f"   Generated embeddings: {embeddings.shape}")
         
@@ -36,24 +144,28 @@ class SemanticChunker:
         
         # Step 4: Create chunks from breakpoints
         chunks = self._create_chunks_from_breakpoints(
-            full_text, sentences, breakpoints
+            full_text, spans, breakpoints, embeddings
         )
         
         logger.info(f"✅ Created {len(chunks)} semantic chunks")
         return chunks
-    
-    def _split_sentences(self, text: str) -> List[str]:
 
-        text = re.sub(r'\b([A-Z][a-z]?)\.\s', r'\1<PERIOD> ', text) 
-        text = re.sub(r'\b(Inc|LLC|Corp|Ltd)\.\s', r'\1<PERIOD> ', text)
-        
-        sentences = re.split(r'[.!?]+\s+', text)
-        
-        sentences = [s.replace('<PERIOD>', '.') for s in sentences]
-        
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
-        
-        return sentences
+    def chunk_stream(self, segments: Iterable[str]) -> Iterator[SemanticChunk]:
+        """
+        Streaming counterpart of chunk_text. `segments` are consecutive pieces
+        of the document (pages with their separators); a sentence split across
+        segments is held back until it completes, and each chunk is yielded as
+        soon as its closing breakpoint is decided.
+        """
+        stream = _StructureStream(self) if ChunkingConfig.MODE == "structure" else _ChunkStream(self)
+        for segment in segments:
+            yield from stream.feed(segment)
+        yield from stream.feed("", final=True)
+    
+    def _split_sentences(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each sentence longer than 20 characters"""
+        spans, _ = _sentence_spans(text)
+        return spans
     
     def _find_breakpoints(
         self, 
@@ -61,24 +173,13 @@ class SemanticChunker:
         sentences: List[str]
     ) -> List[int]:
 
-        similarities = []
-        
-        for i in range(len(embeddings) - 1):
-            sim = cosine_similarity(
-                embeddings[i].reshape(1, -1),
-                embeddings[i+1].reshape(1, -1)
-            )[0][0]
-            similarities.append(sim)
-        
-        if not similarities:
+        if len(embeddings) < 2:
             return []
         
+        similarities = _adjacent_similarities(embeddings)
         threshold = np.percentile(similarities, ChunkingConfig.SIMILARITY_THRESHOLD * 100)
         
-        breakpoints = [0] 
-        for i, sim in enumerate(similarities):
-            if sim < threshold:
-                breakpoints.append(i + 1)
+        breakpoints = [0] + (np.flatnonzero(similarities < threshold) + 1).tolist()
         
         if breakpoints[-1] != len(sentences):
             breakpoints.append(len(sentences))
@@ -88,8 +189,9 @@ class SemanticChunker:
     def _create_chunks_from_breakpoints(
         self,
         full_text: str,
-        sentences: List[str],
-        breakpoints: List[int]
+        spans: List[Tuple[int, int]],
+        breakpoints: List[int],
+        embeddings: Optional[np.ndarray] = None
     ) -> List[SemanticChunk]:
 
         chunks = []
@@ -98,8 +200,8 @@ class SemanticChunker:
             start_idx = breakpoints[i]
             end_idx = breakpoints[i + 1]
             
-            chunk_sentences = sentences[start_idx:end_idx]
-            chunk_text = ' '.join(chunk_sentences)
+            chunk_spans = spans[start_idx:end_idx]
+            chunk_text = ' '.join(full_text[start:end] for start, end in chunk_spans)
             
             if len(chunk_text) < ChunkingConfig.MIN_CHUNK_LENGTH:
                 continue
@@ -107,10 +209,8 @@ class SemanticChunker:
             if len(chunk_text) > ChunkingConfig.MAX_CHUNK_LENGTH:
                 chunk_text = chunk_text[:ChunkingConfig.MAX_CHUNK_LENGTH]
             
-            start_char = full_text.find(chunk_sentences[0])
-            if start_char == -1:
-                start_char = 0
-            end_char = start_char + len(chunk_text)
+            start_char = chunk_spans[0][0]
+            end_char = _chunk_end(chunk_spans, len(chunk_text))
             
             preceding = full_text[max(0, start_char-50):start_char].strip()
             following = full_text[end_char:end_char+50].strip()
@@ -121,6 +221,7 @@ class SemanticChunker:
                 start_char=start_char,
                 end_char=end_char,
                 word_count=len(chunk_text.split()),
+                embedding=_chunk_embedding(embeddings[start_idx:end_idx]) if embeddings is not None else None,
                 preceding_text=preceding if preceding else None,
                 following_text=following if following else None
             )
@@ -142,4 +243,282 @@ class SemanticChunker:
             start_char=start,
             end_char=end,
             word_count=len(text[start:end].split())
-        )
\ No newline at end of file
+        )
+
+class _ChunkStream:
+    """
+    Incremental breakpoint state for SemanticChunker.chunk_stream. chunk_text
+    breaks where similarity falls below a percentile of all similarities;
+    here the percentile is taken over a window of STREAM_PERCENTILE_WINDOW
+    similarities centred on the one being decided, so each decision waits for
+    half a window of following sentences. Documents shorter than half a window
+    get exactly chunk_text's threshold.
+    """
+
+    def __init__(self, chunker: SemanticChunker):
+        self.chunker = chunker
+        self.half_window = max(ChunkingConfig.STREAM_PERCENTILE_WINDOW // 2, 1)
+
+        # Text from absolute offset `base` on; earlier text is no longer needed
+        self.buffer = ""
+        self.base = 0
+        # Absolute offset of the sentence still being received
+        self.tail = 0
+
+        # Sentences (text, absolute start) from global index `first` on, with
+        # their embeddings for the chunk embedding
+        self.sentences: List[Tuple[str, int]] = []
+        self.embeddings: List[np.ndarray] = []
+        self.first = 0
+        self.sentence_count = 0
+        self.last_embedding: Optional[np.ndarray] = None
+
+        # similarities[k - sim_base]: sentence k vs. k + 1
+        self.similarities: List[float] = []
+        self.sim_base = 0
+        self.decided = 0
+
+        self.segment_start = 0
+        self.segment_number = 0
+        # Chunks waiting for the 50 characters of following context
+        self.ready: List[dict] = []
+
+    def feed(self, text: str, final: bool = False) -> List[SemanticChunk]:
+        self.buffer += text
+        tail_text = self.buffer[self.tail - self.base:]
+        spans, consumed = _sentence_spans(tail_text, final=final)
+        new_sentences = [(tail_text[start:end], self.tail + start) for start, end in spans]
+        self.tail += consumed
+
+        if new_sentences:
+            self._add_sentences(new_sentences)
+        self._decide(final)
+
+        if final:
+            if self.sentence_count < 2:
+                return self._whole_text_chunk()
+            self._close_segment(self.sentence_count)
+
+        chunks = self._emit_ready(final)
+        self._trim()
+        return chunks
+
+    def _add_sentences(self, new_sentences: List[Tuple[str, int]]):
+        embeddings = self.chunker.model.encode([text for text, _ in new_sentences], show_progress_bar=False)
+        embeddings = _normalize_rows(embeddings)
+
+        if self.last_embedding is not None:
+            previous = np.vstack([self.last_embedding[None, :], embeddings[:-1]])
+        else:
+            previous = embeddings[:-1]
+        current = embeddings if self.last_embedding is not None else embeddings[1:]
+        self.similarities.extend(np.sum(previous * current, axis=1).tolist())
+
+        self.last_embedding = embeddings[-1]
+        self.sentences.extend(new_sentences)
+        self.embeddings.extend(embeddings)
+        self.sentence_count += len(new_sentences)
+
+    def _decide(self, final: bool):
+        total = self.sim_base + len(self.similarities)
+        percentile = ChunkingConfig.SIMILARITY_THRESHOLD * 100
+
+        while self.decided < total and (final or total > self.decided + self.half_window):
+            lo = max(self.decided - self.half_window, self.sim_base)
+            hi = min(self.decided + self.half_window + 1, total)
+            window = self.similarities[lo - self.sim_base:hi - self.sim_base]
+            similarity = self.similarities[self.decided - self.sim_base]
+
+            if similarity < np.percentile(window, percentile):
+                self._close_segment(self.decided + 1)
+            self.decided += 1
+
+    def _close_segment(self, end: int):
+        """Turn sentences [segment_start, end) into a chunk, with chunk_text's rules"""
+        if end <= self.segment_start:
+            return
+        self.segment_number += 1
+        chunk_sentences = self.sentences[self.segment_start - self.first:end - self.first]
+        chunk_embeddings = self.embeddings[self.segment_start - self.first:end - self.first]
+        self.segment_start = end
+
+        chunk_text = ' '.join(text for text, _ in chunk_sentences)
+        if len(chunk_text) < ChunkingConfig.MIN_CHUNK_LENGTH:
+            return
+        if len(chunk_text) > ChunkingConfig.MAX_CHUNK_LENGTH:
+            chunk_text = chunk_text[:ChunkingConfig.MAX_CHUNK_LENGTH]
+
+        chunk_spans = [(start, start + len(text)) for text, start in chunk_sentences]
+        self.ready.append({
+            "id": f"chunk_{self.segment_number:03d}",
+            "text": chunk_text,
+            "start_char": chunk_spans[0][0],
+            "end_char": _chunk_end(chunk_spans, len(chunk_text)),
+            "embedding": _chunk_embedding(np.stack(chunk_embeddings))
+        })
+
+    def _emit_ready(self, final: bool) -> List[SemanticChunk]:
+        chunks = []
+        buffer_end = self.base + len(self.buffer)
+        while self.ready and (final or self.ready[0]["end_char"] + 50 <= buffer_end):
+            chunks.append(_context_chunk(self.ready.pop(0), self.buffer, self.base))
+        return chunks
+
+    def _whole_text_chunk(self) -> List[SemanticChunk]:
+        if not self.buffer.strip():
+            return []
+        return [self.chunker._create_chunk(self.buffer, 0, len(self.buffer), "chunk_001")]
+
+    def _trim(self):
+        """Drop sentences, similarities and text that no pending chunk can need"""
+        if self.sentence_count < 2:
+            return
+
+        if self.segment_start > self.first:
+            del self.sentences[:self.segment_start - self.first]
+            del self.embeddings[:self.segment_start - self.first]
+            self.first = self.segment_start
+
+        keep_sims = max(self.decided - self.half_window, self.sim_base)
+        if keep_sims - self.sim_base > ChunkingConfig.STREAM_PERCENTILE_WINDOW:
+            del self.similarities[:keep_sims - self.sim_base]
+            self.sim_base = keep_sims
+
+        keep_from = self.sentences[0][1] if self.sentences else self.tail
+        if self.ready:
+            keep_from = min(keep_from, self.ready[0]["start_char"])
+        keep_from = max(keep_from - 50, self.base)
+        # Slicing the buffer copies it; only bother once enough text is dead
+        if keep_from - self.base > 65536:
+            self.buffer = self.buffer[keep_from - self.base:]
+            self.base = keep_from
+
+class _StructureStream:
+    """
+    Incremental state for structure chunking (ChunkingConfig.MODE
+    "structure"). SectionParser closes a section when the next heading
+    starts; a section that fits MAX_CHUNK_LENGTH is one piece, a longer one
+    is split at its least similar sentences. Consecutive pieces are then
+    packed into one chunk while they fit and stay inside the same enclosing
+    section (a clause's lead-in with its (a)/(b) items, sibling subsections),
+    or when one of them is shorter than MIN_CHUNK_LENGTH and both sit under
+    the same top-level heading. Pieces of one split section are never packed
+    back together, no chunk crosses a top-level heading, and a short clause
+    that could not be packed is kept rather than dropped.
+    """
+
+    def __init__(self, chunker: SemanticChunker):
+        self.chunker = chunker
+        self.parser = SectionParser()
+
+        # Text from absolute offset `base` on; earlier text is no longer needed
+        self.buffer = ""
+        self.base = 0
+
+        self.section_number = 0
+        self.sentence_count = 0
+        self.chunk_number = 0
+        # Piece still open for packing, and chunks waiting for following context
+        self.pending: Optional[dict] = None
+        self.ready: List[dict] = []
+
+    def feed(self, text: str, final: bool = False) -> List[SemanticChunk]:
+        self.buffer += text
+        for section in self.parser.feed(text, final=final):
+            self._add_section(section)
+
+        if final:
+            self._flush()
+            if not self.chunk_number and self.sentence_count < 2 and self.buffer.strip():
+                return [self.chunker._create_chunk(self.buffer, 0, len(self.buffer), "chunk_001")]
+
+        buffer_end = self.base + len(self.buffer)
+        chunks = []
+        while self.ready and (final or self.ready[0]["end_char"] + 50 <= buffer_end):
+            chunks.append(_context_chunk(self.ready.pop(0), self.buffer, self.base))
+        self._trim()
+        return chunks
+
+    def _add_section(self, section: Section):
+        section_text = self.buffer[section.start - self.base:section.end - self.base]
+        spans, _ = _sentence_spans(section_text)
+        if not spans:
+            return
+        self.section_number += 1
+        self.sentence_count += len(spans)
+
+        sentences = [section_text[start:end] for start, end in spans]
+        spans = [(section.start + start, section.start + end) for start, end in spans]
+        embeddings = _normalize_rows(self.chunker.model.encode(sentences, show_progress_bar=False))
+        similarities = np.einsum("ij,ij->i", embeddings[:-1], embeddings[1:])
+
+        offsets = [0]
+        for sentence in sentences:
+            offsets.append(offsets[-1] + len(sentence))
+        for lo, hi in _split_least_similar(offsets, similarities, 0, len(sentences)):
+            self._add_piece({
+                "section": self.section_number,
+                "path": section.path,
+                "spans": spans[lo:hi],
+                "embeddings": [embeddings[lo:hi]],
+                "length": offsets[hi] - offsets[lo] + hi - lo - 1
+            })
+
+    def _add_piece(self, piece: dict):
+        pending = self.pending
+        if pending and self._packable(pending, piece):
+            pending["section"] = piece["section"]
+            pending["path"] = _common_path(pending["path"], piece["path"])
+            pending["spans"] += piece["spans"]
+            pending["embeddings"] += piece["embeddings"]
+            pending["length"] += 1 + piece["length"]
+            return
+        self._flush()
+        self.pending = piece
+
+    def _packable(self, pending: dict, piece: dict) -> bool:
+        if pending["section"] == piece["section"]:
+            return False
+        if pending["length"] + 1 + piece["length"] > ChunkingConfig.MAX_CHUNK_LENGTH:
+            return False
+        if min(pending["length"], piece["length"]) < ChunkingConfig.MIN_CHUNK_LENGTH:
+            return pending["path"][:1] == piece["path"][:1]
+        parent = piece["path"][:-1]
+        return bool(parent) and pending["path"][:len(parent)] == parent
+
+    def _flush(self):
+        pending, self.pending = self.pending, None
+        if pending is None:
+            return
+        # A short numbered clause or item is still a clause; short text under a
+        # plain heading (titles, signature blocks) is dropped as in semantic mode
+        is_clause = bool(pending["path"]) and pending["path"][-1][0] != RANK_HEADING
+        if pending["length"] < ChunkingConfig.MIN_CHUNK_LENGTH and not is_clause:
+            return
+
+        self.chunk_number += 1
+        chunk_spans = pending["spans"]
+        chunk_text = ' '.join(self.buffer[start - self.base:end - self.base] for start, end in chunk_spans)
+        if len(chunk_text) > ChunkingConfig.MAX_CHUNK_LENGTH:
+            chunk_text = chunk_text[:ChunkingConfig.MAX_CHUNK_LENGTH]
+
+        self.ready.append({
+            "id": f"chunk_{self.chunk_number:03d}",
+            "text": chunk_text,
+            "start_char": chunk_spans[0][0],
+            "end_char": _chunk_end(chunk_spans, len(chunk_text)),
+            "embedding": _chunk_embedding(np.vstack(pending["embeddings"])),
+            "section_path": [label for _, label in pending["path"]]
+        })
+
+    def _trim(self):
+        """Drop text before the open section, the pending piece and unsent chunks"""
+        keep_from = self.parser.start
+        if self.pending:
+            keep_from = min(keep_from, self.pending["spans"][0][0])
+        if self.ready:
+            keep_from = min(keep_from, self.ready[0]["start_char"])
+        keep_from = max(keep_from - 50, self.base)
+        if keep_from - self.base > 65536:
+            self.buffer = self.buffer[keep_from - self.base:]
+            self.base = keep_from
@@ -0,0 +1,174 @@
+import mmap
+import os
+import re
+import tempfile
+import logging
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Iterator, Tuple
+
+from src.config.settings import DocumentConfig
+
+logger = logging.getLogger(__name__)
+
+class ChunkView(NamedTuple):
+    """A chunk as offsets into the document's TextBuffer; text is read on demand"""
+    id: str
+    start_char: int
+    end_char: int
+    word_count: int
+
+    def text(self, buffer: "TextBuffer") -> str:
+        return buffer.slice(self.start_char, self.end_char)
+
+class TextBuffer:
+    """
+    Append-only document text addressed by character offset. Text stays in
+    memory until it passes TEXT_BUFFER_SPILL_CHARS, then moves to an unlinked
+    temp file in SPILL_DIR that is memory-mapped for reads (the file vanishes
+    with the process, even after a crash). A byte offset is recorded every
+    CHECKPOINT_CHARS characters, so a slice decodes at most one checkpoint
+    interval of text it does not return.
+    """
+
+    CHECKPOINT_CHARS = 4096
+    # finditer() scans this many characters at a time; a match may run this
+    # far past its window's end
+    SCAN_WINDOW_CHARS = 1_000_000
+    SCAN_OVERLAP_CHARS = 20_000
+
+    def __init__(self, spill_chars: Optional[int] = None, spill_dir: Optional[Path] = None):
+        self.spill_chars = spill_chars if spill_chars is not None else DocumentConfig.TEXT_BUFFER_SPILL_CHARS
+        self.spill_dir = Path(spill_dir or DocumentConfig.SPILL_DIR)
+
+        self._parts: List[str] = []
+        self._length = 0
+        self._bytes = 0
+        # _checkpoints[k]: byte offset of character k * CHECKPOINT_CHARS
+        self._checkpoints: List[int] = [0]
+
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._mapped_bytes = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def on_disk(self) -> bool:
+        return self._file is not None
+
+    def append(self, text: str):
+        if not text:
+            return
+        encoded = text.encode("utf-8")
+
+        # Byte offsets of the checkpoints this text crosses
+        next_char = len(self._checkpoints) * self.CHECKPOINT_CHARS
+        while next_char <= self._length + len(text):
+            prefix = text[:next_char - self._length]
+            self._checkpoints.append(self._bytes + len(prefix.encode("utf-8")))
+            next_char += self.CHECKPOINT_CHARS
+
+        self._length += len(text)
+        self._bytes += len(encoded)
+
+        if self._file is not None:
+            self._file.write(encoded)
+            return
+        self._parts.append(text)
+        if self._length > self.spill_chars:
+            self._spill()
+
+    def slice(self, start: int, end: int) -> str:
+        start = max(0, min(start, self._length))
+        end = max(start, min(end, self._length))
+        if start == end:
+            return ""
+        if self._file is None:
+            if len(self._parts) > 1:
+                self._parts = ["".join(self._parts)]
+            return self._parts[0][start:end]
+
+        first = start // self.CHECKPOINT_CHARS
+        last = -(-end // self.CHECKPOINT_CHARS)
+        byte_start = self._checkpoints[first]
+        byte_end = self._checkpoints[last] if last < len(self._checkpoints) else self._bytes
+
+        text = self._mapped()[byte_start:byte_end].decode("utf-8")
+        base = first * self.CHECKPOINT_CHARS
+        return text[start - base:end - base]
+
+    def finditer(self, pattern: re.Pattern, lead: int = 0) -> Iterator[Tuple[re.Match, str]]:
+        """
+        pattern.finditer over the whole text, one window at a time. Yields
+        (match, window_text); match positions are relative to window_text,
+        which starts up to `lead` characters early so callers can look back.
+        Matches equal those on the joined text as long as none is longer
+        than SCAN_OVERLAP_CHARS.
+        """
+        resume = 0
+        for start in range(0, self._length, self.SCAN_WINDOW_CHARS):
+            text_start = max(0, start - lead)
+            text = self.slice(text_start, start + self.SCAN_WINDOW_CHARS + self.SCAN_OVERLAP_CHARS)
+            window_end = start + self.SCAN_WINDOW_CHARS
+            last_window = window_end >= self._length
+
+            # Continue after the previous window's last match, as one finditer would
+            for match in pattern.finditer(text, max(start, resume) - text_start):
+                if not last_window and match.start() + text_start >= window_end:
+                    break
+                resume = match.end() + text_start
+                yield match, text
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._parts = []
+
+    def _spill(self):
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.spill_dir, suffix=".txt")
+        os.unlink(path)
+        self._file = os.fdopen(fd, "w+b")
+        for part in self._parts:
+            self._file.write(part.encode("utf-8"))
+        self._parts = []
+        logger.info(f"💾 Document text moved to disk after {self._length:,} characters")
+
+    def _mapped(self) -> mmap.mmap:
+        # The file grows while pages stream in; map again when reads pass the old end
+        if self._map is None or self._mapped_bytes != self._bytes:
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), self._bytes, access=mmap.ACCESS_READ)
+            self._mapped_bytes = self._bytes
+        return self._map
+
+class LargeDocument:
+    """
+    Stage 1 result in large-document mode: ProcessedDocument's fields, but
+    the text lives once in `buffer` and chunks are ChunkViews into it.
+    Call close() when the analysis is done to release the buffer.
+    """
+
+    def __init__(self, metadata, definitions, buffer: TextBuffer, chunks: List[ChunkView],
+                 page_offsets: List[int], processing_time_seconds: float):
+        self.metadata = metadata
+        self.definitions = definitions
+        self.buffer = buffer
+        self.chunks = chunks
+        self.page_offsets = page_offsets
+        self.total_chunks = len(chunks)
+        self.avg_chunk_length = sum(c.word_count for c in chunks) / len(chunks) if chunks else 0
+        self.processing_time_seconds = processing_time_seconds
+
+    def chunk_text(self, chunk: ChunkView) -> str:
+        return chunk.text(self.buffer)
+
+    def close(self):
+        self.buffer.close()
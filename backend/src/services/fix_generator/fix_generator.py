@@ -1,8 +1,9 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
 
 from src.core.models import RiskAnalysis, ExtractedParameters
 from src.core.llm_client import LLMClient
+from src.core.token_budget import PromptBudgeter
 from src.rag import VectorStore
 from pydantic import BaseModel, Field
 from langfuse import observe
@@ -19,14 +20,17 @@ class FixGenerator:
     def __init__(self):
         self.llm = LLMClient()
         self.vector_store = VectorStore()
+        self.budgeter = PromptBudgeter(model_type="smart")
     
     @observe(name="Stage 4: Fix Generation")
     def generate_fix(
         self,
         risky_text: str,
         category: str,
-        risk_analysis: RiskAnalysis
+        risk_analysis: RiskAnalysis,
+        prefetched_templates: Optional[List[Dict]] = None
     ) -> GeneratedFix:
+        """prefetched_templates: result of fetch_templates() started ahead of time"""
 
         logger.info(f"📝 Generating fix for {category}")
         
@@ -34,7 +38,8 @@ class FixGenerator:
         safe_templates = self._retrieve_safe_templates(
             risky_text, 
             category,
-            risk_analysis.extracted_parameters
+            risk_analysis.extracted_parameters,
+            prefetched_templates
         )
         
         # Step 2: Generate fix using templates as guidance
@@ -50,13 +55,8 @@ class FixGenerator:
         logger.info(f"✅ Fix generated ({len(fix.suggested_replacement)} chars)")
         return fix
     
-    def _retrieve_safe_templates(
-        self,
-        risky_text: str,
-        category: str,
-        parameters: ExtractedParameters
-    ) -> List[Dict]:
- 
+    def fetch_templates(self, risky_text: str, category: str) -> List[Dict]:
+        """Vector search for safe templates; needs no debate output, so it can start early"""
         templates = self.vector_store.query_category(
             text=risky_text,
             category=category,
@@ -64,7 +64,20 @@ class FixGenerator:
             k=10  
         )
         
-        safe_only = [t for t in templates if t['metadata'].get('risk_level') == 'safe']
+        return [t for t in templates if t['metadata'].get('risk_level') == 'safe']
+    
+    def _retrieve_safe_templates(
+        self,
+        risky_text: str,
+        category: str,
+        parameters: ExtractedParameters,
+        prefetched_templates: Optional[List[Dict]] = None
+    ) -> List[Dict]:
+ 
+        if prefetched_templates is not None:
+            safe_only = list(prefetched_templates)
+        else:
+            safe_only = self.fetch_templates(risky_text, category)
         
         if parameters and safe_only:
             scored_templates = []
@@ -97,14 +110,23 @@ class FixGenerator:
         templates: List[Dict]
     ) -> GeneratedFix:
 
+        budget = self.budgeter.allocate(
+            "fix",
+            sections={
+                "clause_text": risky_text,
+                "risk_summary": risk_analysis.arbiter_verdict.reasoning if risk_analysis.arbiter_verdict else "See analysis"
+            },
+            precedents=[t['text'] for t in templates]
+        )
+        
         template_examples = "\n\n".join([
-            f"Example {i+1} (Similarity: {t['similarity']:.0%}):\n{t['text']}"
-            for i, t in enumerate(templates[:3])
-        ]) if templates else "No templates available - generate from scratch."
+            f"Example {n+1} (Similarity: {templates[i]['similarity']:.0%}):\n{text}"
+            for n, (i, text) in enumerate(zip(budget.precedent_indices, budget.precedents))
+        ]) if budget.precedents else "No templates available - generate from scratch."
         
         risk_summary = f"""
 Risk Score: {risk_analysis.final_risk_score}/100 ({risk_analysis.final_risk_level})
-Key Issues: {risk_analysis.arbiter_verdict.reasoning[:200] if risk_analysis.arbiter_verdict else 'See analysis'}
+Key Issues: {budget.sections["risk_summary"]}
 """
         
         prompt = f"""
@@ -113,7 +135,7 @@ You are an expert contract attorney drafting safe, balanced legal language.
 TASK: Rewrite this risky {category} clause to be fair, mutual, and protective.
 
 RISKY CLAUSE:
-"{risky_text}"
+"{budget.sections["clause_text"]}"
 
 IDENTIFIED RISKS:
 {risk_summary}
@@ -0,0 +1,4 @@
+from src.services.revision_matcher.revision_matcher import RevisionMatcher, RevisionMatch, normalize_clause
+from src.services.revision_matcher.snapshot_store import SnapshotStore
+
+__all__ = ['RevisionMatcher', 'RevisionMatch', 'normalize_clause', 'SnapshotStore']
@@ -0,0 +1,89 @@
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, NamedTuple
+import logging
+
+import numpy as np
+
+from src.core.models import AnalysisSnapshot, ChunkVerdict, SemanticChunk
+from src.config.settings import AnalysisConfig
+
+logger = logging.getLogger(__name__)
+
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"'})
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_clause(text: str) -> str:
+    """Wording of a clause without layout noise (line breaks, curly quotes)"""
+    return _WHITESPACE.sub(" ", text.translate(_QUOTES)).strip()
+
+class RevisionMatch(NamedTuple):
+    # "unchanged": same wording as a base chunk, its verdict is reused
+    # "modified": revises a base chunk (linked for reporting), analyzed again
+    # "new": no counterpart in the base version
+    status: str
+    base: Optional[ChunkVerdict]
+    similarity: float
+
+class RevisionMatcher:
+    """
+    Aligns chunks of a revised contract with the chunks of a base analysis.
+    Identical wording is looked up by normalized text; otherwise the closest
+    base chunks by embedding are compared word by word with difflib to tell a
+    revised clause from an unrelated one. Works one chunk at a time so it can
+    follow the document stream.
+    """
+
+    def __init__(self, snapshot: AnalysisSnapshot):
+        self.snapshot = snapshot
+        self.chunks = snapshot.chunks
+        self._used = set()
+
+        self._by_text: Dict[str, List[int]] = {}
+        for i, chunk in enumerate(self.chunks):
+            self._by_text.setdefault(normalize_clause(chunk.text), []).append(i)
+
+        dim = next((len(c.embedding) for c in self.chunks if c.embedding), 0)
+        self._embeddings = np.zeros((len(self.chunks), dim), dtype=np.float32)
+        for i, chunk in enumerate(self.chunks):
+            if chunk.embedding and len(chunk.embedding) == dim:
+                vector = np.asarray(chunk.embedding, dtype=np.float32)
+                self._embeddings[i] = vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+        self.counts = {"unchanged": 0, "modified": 0, "new": 0}
+
+    def match(self, chunk: SemanticChunk) -> RevisionMatch:
+        result = self._match(chunk)
+        self.counts[result.status] += 1
+        return result
+
+    def _match(self, chunk: SemanticChunk) -> RevisionMatch:
+        candidates = self._by_text.get(normalize_clause(chunk.text))
+        if candidates:
+            # Repeated boilerplate maps one-to-one while unused copies remain
+            index = next((i for i in candidates if i not in self._used), candidates[0])
+            self._used.add(index)
+            return RevisionMatch("unchanged", self.chunks[index], 1.0)
+
+        if not chunk.embedding or self._embeddings.shape[1] != len(chunk.embedding):
+            return RevisionMatch("new", None, 0.0)
+
+        vector = np.asarray(chunk.embedding, dtype=np.float32)
+        similarities = self._embeddings @ (vector / max(float(np.linalg.norm(vector)), 1e-12))
+        words = normalize_clause(chunk.text).split()
+
+        for index in np.argsort(-similarities)[:3]:
+            similarity = float(similarities[index])
+            if similarity < AnalysisConfig.REVISION_MATCH_SIMILARITY:
+                break
+            base_words = normalize_clause(self.chunks[index].text).split()
+            ratio = SequenceMatcher(None, base_words, words, autojunk=False).ratio()
+            if ratio >= AnalysisConfig.REVISION_MIN_TEXT_RATIO:
+                self._used.add(int(index))
+                return RevisionMatch("modified", self.chunks[index], similarity)
+
+        return RevisionMatch("new", None, 0.0)
+
+    def removed(self) -> List[ChunkVerdict]:
+        """Base chunks that nothing in the revised version matched"""
+        return [c for i, c in enumerate(self.chunks) if i not in self._used]
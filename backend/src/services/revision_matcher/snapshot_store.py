@@ -0,0 +1,90 @@
+import json
+import logging
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Optional
+
+from src.core.models import AnalysisSnapshot, ChunkVerdict
+from src.config.settings import AnalysisConfig
+from src.utils.gzip_store import GzipJSONStore, pack_embedding, unpack_embedding
+
+logger = logging.getLogger(__name__)
+
+class SnapshotStore:
+    """
+    Per-chunk verdicts of finished analyses, one gzipped JSON file per
+    analysis_id (embeddings packed as base64 float32, as in DocumentCache).
+    Oldest snapshots are removed once the directory passes SNAPSHOT_MAX_MB.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, snapshot_dir: Optional[Path] = None, max_mb: Optional[int] = None):
+        self.snapshot_dir = Path(snapshot_dir or AnalysisConfig.SNAPSHOT_DIR)
+        max_bytes = (max_mb if max_mb is not None else AnalysisConfig.SNAPSHOT_MAX_MB) * 1024 * 1024
+        self.store = GzipJSONStore(self.snapshot_dir, max_bytes, "analysis snapshot")
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    def exists(self, analysis_id: str) -> bool:
+        return self.store.exists(self._name(analysis_id))
+
+    def get(self, analysis_id: str) -> Optional[AnalysisSnapshot]:
+        try:
+            payload = self.store.read(self._name(analysis_id))
+            if payload is None or payload.get("format") != self.FORMAT:
+                return None
+            snapshot = payload["snapshot"]
+            for chunk in snapshot["chunks"]:
+                if chunk.get("embedding"):
+                    chunk["embedding"] = unpack_embedding(chunk["embedding"])
+            return AnalysisSnapshot.model_validate(snapshot)
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable analysis snapshot {analysis_id}: {e}")
+            return None
+
+    def get_chunk(self, analysis_id: str, chunk_id: str) -> Optional[ChunkVerdict]:
+        """One verdict of a snapshot, without decoding the others' embeddings"""
+        try:
+            payload = self.store.read(self._name(analysis_id))
+            if payload is None or payload.get("format") != self.FORMAT:
+                return None
+            for chunk in payload["snapshot"]["chunks"]:
+                if chunk["chunk_id"] == chunk_id:
+                    return ChunkVerdict.model_validate({**chunk, "embedding": None})
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable analysis snapshot {analysis_id}: {e}")
+        return None
+
+    def put(self, snapshot: AnalysisSnapshot):
+        self.put_records(
+            snapshot.analysis_id,
+            snapshot.filename,
+            snapshot.pipeline,
+            (self.pack(chunk) for chunk in snapshot.chunks)
+        )
+
+    def put_records(self, analysis_id: str, filename: str, pipeline: str, records: Iterable[Dict[str, Any]]):
+        """Write a snapshot from packed verdicts (see pack) without holding them all at once"""
+        header = {"analysis_id": analysis_id, "filename": filename, "pipeline": pipeline}
+
+        def write(f: IO[bytes]):
+            prefix = json.dumps({"format": self.FORMAT, "snapshot": header}, separators=(",", ":"))
+            f.write(prefix[:-2].encode("utf-8") + b',"chunks":[')
+            for i, record in enumerate(records):
+                if i:
+                    f.write(b",")
+                f.write(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+            f.write(b"]}}")
+
+        self.store.write_stream(self._name(analysis_id), write)
+
+    @staticmethod
+    def pack(verdict: ChunkVerdict) -> Dict[str, Any]:
+        record = verdict.model_dump(mode="json")
+        if record.get("embedding"):
+            record["embedding"] = pack_embedding(record["embedding"])
+        return record
+
+    @staticmethod
+    def _name(analysis_id: str) -> str:
+        # analysis ids are uuids; anything else never names a file
+        return "".join(c for c in analysis_id if c.isalnum() or c == "-")
@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 import logging
 
 from src.core.models import (
@@ -9,10 +9,10 @@ from src.core.models import (
     OptimistAnalysis,
     ArbiterVerdict
 )
-from src.core.llm_client import LLMClient
+from src.core.llm_client import LLMClient, StreamAborted
+from src.core.token_budget import PromptBudgeter
 from src.services.risk_analyzer.parameter_extractor import ParameterExtractor
 from src.services.risk_analyzer.prompts import *
-from src.utils.text_utils import truncate_for_context
 from langfuse import observe
 
 logger = logging.getLogger(__name__)
@@ -22,13 +22,19 @@ class AdversarialAnalyzer:
     def __init__(self):
         self.llm = LLMClient()
         self.param_extractor = ParameterExtractor()
+        self.budgeter = PromptBudgeter(model_type="smart")
     
     @observe(name="Stage 3: Adversarial Analysis")
     def analyze_risk(
         self, 
         chunk: SemanticChunk, 
-        detection: CategoryDetection
+        detection: CategoryDetection,
+        on_decision: Optional[Callable[[int], bool]] = None
     ) -> RiskAnalysis:
+        """
+        on_decision is called with the Arbiter's risk_score as soon as it streams in,
+        before the reasoning text. Returning False drops the clause and stops the stream.
+        """
         logger.info(f"🏛️ Analyzing {chunk.id} - {detection.category}")
         
         params = self.param_extractor.extract(chunk.text)
@@ -67,12 +73,19 @@ class AdversarialAnalyzer:
             optimist,
             detection.retrieved_safe_examples,
             detection.retrieved_risky_examples,
-            params
+            params,
+            on_decision
         )
         
         risk_level = self._score_to_level(verdict.risk_score)
         
         logger.info(f"   ⚖️ Verdict: {verdict.risk_score}/100 ({risk_level})")
+        timing = self.llm.last_stream_timing
+        if on_decision and timing and "risk_score" in timing["field_seconds"]:
+            logger.info(
+                f"   ⏱️ Decision after {timing['field_seconds']['risk_score']:.2f}s "
+                f"of {timing['total_seconds']:.2f}s arbiter call"
+            )
         
         return RiskAnalysis(
             chunk_id=chunk.id,
@@ -97,17 +110,20 @@ class AdversarialAnalyzer:
     ) -> PessimistAnalysis:
         """Run pessimist agent"""
         
-        precedent_text = "\n".join([
-            f"- {p[:150]}..." for p in risky_precedents[:3]
-        ]) if risky_precedents else "None available"
-        
-        param_summary = self._format_parameters(params)
+        budget = self.budgeter.allocate(
+            "pessimist",
+            sections={
+                "clause_text": text,
+                "parameters": self._format_parameters(params)
+            },
+            precedents=risky_precedents
+        )
         
         prompt = PESSIMIST_GATEKEEPER_PROMPT.format(
             category=category,
-            clause_text=truncate_for_context(text, 400),
-            risky_precedents=precedent_text,
-            parameters=param_summary
+            clause_text=budget.sections["clause_text"],
+            risky_precedents=self._format_precedents(budget.precedents),
+            parameters=budget.sections["parameters"]
         )
         
         try:
@@ -136,17 +152,21 @@ class AdversarialAnalyzer:
         params
     ) -> OptimistAnalysis:
         
-        precedent_text = "\n".join([
-            f"- {p[:150]}..." for p in safe_precedents[:3]
-        ]) if safe_precedents else "None available"
-        
-        param_summary = self._format_parameters(params)
+        budget = self.budgeter.allocate(
+            "optimist",
+            sections={
+                "clause_text": text,
+                "pessimist_argument": pessimist_argument,
+                "parameters": self._format_parameters(params)
+            },
+            precedents=safe_precedents
+        )
         
         prompt = OPTIMIST_DEFENSE_PROMPT.format(
-            clause_text=truncate_for_context(text, 400),
-            pessimist_argument=truncate_for_context(pessimist_argument, 300),
-            safe_precedents=precedent_text,
-            parameters=param_summary
+            clause_text=budget.sections["clause_text"],
+            pessimist_argument=budget.sections["pessimist_argument"],
+            safe_precedents=self._format_precedents(budget.precedents),
+            parameters=budget.sections["parameters"]
         )
         
         try:
@@ -174,25 +194,47 @@ class AdversarialAnalyzer:
         optimist: OptimistAnalysis,
         safe_precedents: list,
         risky_precedents: list,
-        params
+        params,
+        on_decision: Optional[Callable[[int], bool]] = None
     ) -> ArbiterVerdict:
         
         # Summarize precedents
         safe_summary = f"Standard protection: {len(safe_precedents)} examples show mutual rights, notice periods"
         risky_summary = f"Risk patterns: {len(risky_precedents)} examples show unilateral control, no protections"
         
+        budget = self.budgeter.allocate(
+            "arbiter",
+            sections={
+                "clause_text": text,
+                "pessimist_argument": pessimist.risk_argument,
+                "optimist_argument": optimist.defense_argument,
+                "parameters": self._format_parameters(params)
+            }
+        )
+        
         prompt = ARBITER_VERDICT_PROMPT.format(
             category=category,
-            clause_text=truncate_for_context(text, 400),
-            pessimist_argument=truncate_for_context(pessimist.risk_argument, 300),
+            clause_text=budget.sections["clause_text"],
+            pessimist_argument=budget.sections["pessimist_argument"],
             pessimist_concerns=", ".join(pessimist.key_concerns[:3]) if pessimist.key_concerns else "None",
-            optimist_argument=truncate_for_context(optimist.defense_argument, 300),
+            optimist_argument=budget.sections["optimist_argument"],
             optimist_factors=", ".join(optimist.mitigating_factors[:3]) if optimist.mitigating_factors else "None",
             safe_summary=safe_summary,
             risky_summary=risky_summary,
-            parameters=self._format_parameters(params)
+            parameters=budget.sections["parameters"]
         )
         
+        self.llm.last_stream_timing = None
+        on_field = None
+        if on_decision:
+            def on_field(key, value):
+                if key != "risk_score":
+                    return True
+                try:
+                    return on_decision(max(0, min(100, int(value))))
+                except (TypeError, ValueError):
+                    return True
+        
         try:
             result = self.llm.get_structured_completion(
                 messages=[
@@ -200,12 +242,20 @@ class AdversarialAnalyzer:
                     {"role": "user", "content": prompt}
                 ],
                 response_model=ArbiterVerdict,
-                model_type="smart"
+                model_type="smart",
+                on_field=on_field
             )
             
             result.risk_level = self._score_to_level(result.risk_score)
             
             return result
+        except StreamAborted as aborted:
+            score = max(0, min(100, int(aborted.fields["risk_score"])))
+            return ArbiterVerdict(
+                risk_score=score,
+                risk_level=self._score_to_level(score),
+                reasoning="Below reporting threshold; reasoning not streamed"
+            )
         except Exception as e:
             logger.error(f"Arbiter failed: {e}")
             return ArbiterVerdict(
@@ -214,6 +264,12 @@ class AdversarialAnalyzer:
                 reasoning="Manual review required due to analysis error"
             )
     
+    @staticmethod
+    def _format_precedents(precedents: list) -> str:
+        if not precedents:
+            return "None available"
+        return "\n".join(f"- {p}" for p in precedents)
+    
     @staticmethod
     def _format_parameters(params) -> str:
         lines = []
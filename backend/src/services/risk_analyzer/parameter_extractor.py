@@ -1,64 +1,149 @@
-import re
 import logging
+from bisect import bisect_right
+from typing import List
 
 from src.core.models import ExtractedParameters
-from src.config.settings import ParameterConfig
+from src.utils.pattern_registry import (
+    PARAMETER_PATTERNS, TEMPORAL_PATTERN, TEMPORAL_GATES, LOWERCASE_PATTERNS,
+    CAP_INDICATORS, CURE_INDICATORS, MARKER_INDICATORS, CASEFOLD_UNSAFE
+)
 
 logger = logging.getLogger(__name__)
 
+_FLAGS = {"written_notice": "has_written_notice", "party_symmetry": "is_mutual", "for_cause": "requires_cause"}
+
+def _build(values: dict, amounts: List[str], markers: dict) -> ExtractedParameters:
+    return ExtractedParameters(**values, amounts_mentioned=amounts, raw_text_markers=markers)
+
 class ParameterExtractor:
 
     @staticmethod
     def extract(text: str) -> ExtractedParameters:
+        """
+        Same result as extract_by_pattern, from one lowercased copy of the
+        clause: days/months/years come from a single number scan, regexes run
+        case-sensitively (much faster in `re` than IGNORECASE) and only when
+        a literal they need is present.
+        """
+        lower = text.lower()
+        if len(lower) != len(text) or CASEFOLD_UNSAFE.search(text):
+            return ParameterExtractor.extract_by_pattern(text)
+
+        values = {}
+        if any(gate in lower for gate in TEMPORAL_GATES):
+            for match in TEMPORAL_PATTERN.finditer(lower):
+                values.setdefault(f"{match.lastgroup}_mentioned", int(match.group(1)))
+
+        amounts = LOWERCASE_PATTERNS["amount"].findall(lower) if "$" in lower else []
+        for name, field in _FLAGS.items():
+            values[field] = LOWERCASE_PATTERNS[name].search(lower) is not None
+
+        values["has_cap"] = any(indicator in lower for indicator in CAP_INDICATORS)
+        values["has_cure_period"] = any(indicator in lower for indicator in CURE_INDICATORS)
+        markers = {
+            key: any(indicator in lower for indicator in indicators)
+            for key, indicators in MARKER_INDICATORS.items()
+        }
+        return _build(values, amounts, markers)
+
+    @staticmethod
+    def extract_batch(texts: List[str]) -> List[ExtractedParameters]:
+        """
+        extract() for many clauses at once: each pattern and indicator runs
+        once over the clauses joined with NUL (which none of them can match
+        across) and hits are mapped back to their clause by offset.
+        """
+        if not texts:
+            return []
+        joined = "\x00".join(texts)
+        lower = joined.lower()
+        if (len(lower) != len(joined) or CASEFOLD_UNSAFE.search(joined)
+                or joined.count("\x00") != len(texts) - 1):
+            return [ParameterExtractor.extract(text) for text in texts]
+
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+
+        def owner(pos: int) -> int:
+            return bisect_right(starts, pos) - 1
+
+        values = [{field: False for field in (*_FLAGS.values(), "has_cap", "has_cure_period")} for _ in texts]
+        amounts = [[] for _ in texts]
+        markers = [{key: False for key in MARKER_INDICATORS} for _ in texts]
+
+        # First number per unit and clause, as re.search would find it
+        for match in TEMPORAL_PATTERN.finditer(lower):
+            values[owner(match.start())].setdefault(f"{match.lastgroup}_mentioned", int(match.group(1)))
+
+        for match in LOWERCASE_PATTERNS["amount"].finditer(lower):
+            amounts[owner(match.start())].append(match.group())
+
+        def hits(find) -> List[int]:
+            """Clauses with at least one hit; after a hit, continue at the next clause"""
+            found = []
+            pos = find(0)
+            while pos != -1:
+                index = owner(pos)
+                found.append(index)
+                if index + 1 == len(starts):
+                    break
+                pos = find(starts[index + 1])
+            return found
+
+        def regex_find(pattern):
+            def find(pos: int) -> int:
+                match = pattern.search(lower, pos)
+                return match.start() if match else -1
+            return find
+
+        for name, field in _FLAGS.items():
+            for index in hits(regex_find(LOWERCASE_PATTERNS[name])):
+                values[index][field] = True
+        for field, indicators in (("has_cap", CAP_INDICATORS), ("has_cure_period", CURE_INDICATORS)):
+            for indicator in indicators:
+                for index in hits(lambda pos: lower.find(indicator, pos)):
+                    values[index][field] = True
+        for key, indicators in MARKER_INDICATORS.items():
+            for indicator in indicators:
+                for index in hits(lambda pos: lower.find(indicator, pos)):
+                    markers[index][key] = True
+
+        return [_build(*clause) for clause in zip(values, amounts, markers)]
+
+    @staticmethod
+    def extract_by_pattern(text: str) -> ExtractedParameters:
+        """Reference path: one case-insensitive search per pattern on the original text"""
         text_lower = text.lower()
         
         params = ExtractedParameters()
         
-        days_match = re.search(ParameterConfig.PATTERNS["days"], text, re.IGNORECASE)
+        days_match = PARAMETER_PATTERNS["days"].search(text)
         if days_match:
             params.days_mentioned = int(days_match.group(1))
         
-        months_match = re.search(ParameterConfig.PATTERNS["months"], text, re.IGNORECASE)
+        months_match = PARAMETER_PATTERNS["months"].search(text)
         if months_match:
             params.months_mentioned = int(months_match.group(1))
         
-        years_match = re.search(ParameterConfig.PATTERNS["years"], text, re.IGNORECASE)
+        years_match = PARAMETER_PATTERNS["years"].search(text)
         if years_match:
             params.years_mentioned = int(years_match.group(1))
         
-        amounts = re.findall(ParameterConfig.PATTERNS["amount"], text)
-        params.amounts_mentioned = amounts
-        
-        params.has_written_notice = bool(re.search(
-            ParameterConfig.PATTERNS["written_notice"], 
-            text, 
-            re.IGNORECASE
-        ))
-        
-        params.is_mutual = bool(re.search(
-            ParameterConfig.PATTERNS["party_symmetry"], 
-            text, 
-            re.IGNORECASE
-        ))
-        
-        params.requires_cause = bool(re.search(
-            ParameterConfig.PATTERNS["for_cause"], 
-            text, 
-            re.IGNORECASE
-        ))
+        params.amounts_mentioned = PARAMETER_PATTERNS["amount"].findall(text)
         
-        cap_indicators = ["limited to", "shall not exceed", "maximum", "cap"]
-        params.has_cap = any(indicator in text_lower for indicator in cap_indicators)
+        params.has_written_notice = bool(PARAMETER_PATTERNS["written_notice"].search(text))
+        params.is_mutual = bool(PARAMETER_PATTERNS["party_symmetry"].search(text))
+        params.requires_cause = bool(PARAMETER_PATTERNS["for_cause"].search(text))
         
-        cure_indicators = ["cure", "remedy", "correct the breach"]
-        params.has_cure_period = any(indicator in text_lower for indicator in cure_indicators)
+        params.has_cap = any(indicator in text_lower for indicator in CAP_INDICATORS)
+        params.has_cure_period = any(indicator in text_lower for indicator in CURE_INDICATORS)
         
         params.raw_text_markers = {
-            "contains_unilateral": "company may" in text_lower or "vendor may" in text_lower,
-            "contains_either_party": "either party" in text_lower,
-            "contains_without_cause": "without cause" in text_lower,
-            "contains_immediately": "immediately" in text_lower,
-            "contains_unlimited": "unlimited" in text_lower or "all claims" in text_lower,
+            key: any(indicator in text_lower for indicator in indicators)
+            for key, indicators in MARKER_INDICATORS.items()
         }
         
-        return params
\ No newline at end of file
+        return params
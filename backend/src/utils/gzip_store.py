@@ -0,0 +1,97 @@
+import base64
+import contextlib
+import gzip
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def pack_embedding(values: List[float]) -> str:
+    """An embedding as base64 float32, about a quarter of its JSON size"""
+    return base64.b64encode(np.asarray(values, dtype=np.float32).tobytes()).decode("ascii")
+
+def unpack_embedding(packed: str) -> List[float]:
+    return np.frombuffer(base64.b64decode(packed), dtype=np.float32).tolist()
+
+class GzipJSONStore:
+    """
+    A directory of gzipped JSON files (<name>.json.gz), shared by processes.
+    Files are written to a temp file and renamed, so readers never see half
+    of one; least recently used ones (by mtime, see touch) are removed once
+    the directory grows past max_bytes. Pruning is best effort: files other
+    processes remove at the same time are skipped.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, label: str):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.label = label
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}.json.gz"
+
+    def exists(self, name: str) -> bool:
+        return self.path(name).exists()
+
+    def read(self, name: str) -> Optional[Dict[str, Any]]:
+        """The file's JSON, or None if there is none; raises if it is unreadable"""
+        path = self.path(name)
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write(self, name: str, payload: Dict[str, Any]) -> bool:
+        return self.write_stream(
+            name, lambda f: f.write(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        )
+
+    def write_stream(self, name: str, write: Callable[[IO[bytes]], None]) -> bool:
+        """Replace the file with what write() sends to the gzip stream; False (logged) on failure"""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                write(f)
+            os.replace(tmp_path, self.path(name))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write {self.label} {name}: {e}")
+            if tmp_path:
+                Path(tmp_path).unlink(missing_ok=True)
+            return False
+
+        try:
+            self.prune()
+        except OSError as e:
+            logger.warning(f"⚠️ {self.label.capitalize()} prune failed: {e}")
+        return True
+
+    def touch(self, name: str):
+        """Mark the file recently used"""
+        with contextlib.suppress(OSError):
+            os.utime(self.path(name))
+
+    def remove(self, name: str):
+        self.path(name).unlink(missing_ok=True)
+
+    def prune(self):
+        entries = []
+        for path in self.directory.glob("*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Removed meanwhile by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,85 @@
+"""
+Precompiled regular expressions for parameter, metadata and definition
+extraction. Pattern strings for parameters stay in ParameterConfig; they are
+compiled once here instead of on every call.
+"""
+import re
+from typing import Dict, Pattern
+
+from src.config.settings import ParameterConfig
+
+# PARAMETERS (ParameterExtractor)
+# All parameter patterns are matched case-insensitively, as before
+PARAMETER_PATTERNS: Dict[str, Pattern] = {
+    name: re.compile(pattern, re.IGNORECASE)
+    for name, pattern in ParameterConfig.PATTERNS.items()
+}
+
+# Fast path (ParameterExtractor.extract): the clause is lowercased once and
+# scanned case-sensitively, which lets the regex engine skip ahead to literal
+# prefixes. days/months/years share their leading number, so one scan finds
+# all three: at any digit only one unit word can follow.
+def _lowercase_variant(pattern: str) -> Pattern:
+    # Lowercasing the pattern itself would turn \S into \s; keep IGNORECASE then
+    return re.compile(pattern) if pattern == pattern.lower() else re.compile(pattern, re.IGNORECASE)
+
+_NUMBER = r"(\d+)"
+TEMPORAL_UNITS = ("days", "months", "years")
+assert all(ParameterConfig.PATTERNS[unit].startswith(_NUMBER) for unit in TEMPORAL_UNITS)
+TEMPORAL_PATTERN = _lowercase_variant(
+    _NUMBER + "(?:" + "|".join(
+        f"(?P<{unit}>{ParameterConfig.PATTERNS[unit][len(_NUMBER):]})" for unit in TEMPORAL_UNITS
+    ) + ")"
+)
+# A literal every match contains, checked before running the scan
+TEMPORAL_GATES = ("day", "month", "year")
+
+LOWERCASE_PATTERNS: Dict[str, Pattern] = {
+    name: _lowercase_variant(ParameterConfig.PATTERNS[name])
+    for name in ("amount", "written_notice", "party_symmetry", "for_cause")
+}
+
+# Substring indicators, checked against the lowercased clause
+CAP_INDICATORS = ["limited to", "shall not exceed", "maximum", "cap"]
+CURE_INDICATORS = ["cure", "remedy", "correct the breach"]
+MARKER_INDICATORS = {
+    "contains_unilateral": ["company may", "vendor may"],
+    "contains_either_party": ["either party"],
+    "contains_without_cause": ["without cause"],
+    "contains_immediately": ["immediately"],
+    "contains_unlimited": ["unlimited", "all claims"],
+}
+
+# Characters for which str.lower() and re.IGNORECASE disagree about ASCII
+# letters (dotted/dotless i, long s, Kelvin sign); clauses containing them
+# skip the lowercase fast path so results stay exact
+CASEFOLD_UNSAFE = re.compile("[\u0130\u0131\u017f\u212a]")
+
+# METADATA (MetadataExtractor)
+PARTY_PATTERNS = [
+    re.compile(r"(?:between|by and between)\s+([A-Z][^,\n]+?)\s+(?:and|&)\s+([A-Z][^,\n]+?)(?:\s*(?:,|\(|dated))", re.MULTILINE),
+    re.compile(r"entered into by\s+([A-Z][^,\n]+?)\s+and\s+([A-Z][^,\n]+?)(?:\s*(?:,|\())", re.MULTILINE),
+    re.compile(r"(?:^|\n)([A-Z][A-Za-z\s&]+(?:Inc|LLC|Corp|Ltd|Corporation))[^\n]{0,50}(?:\n|$)", re.MULTILINE),
+]
+
+EFFECTIVE_DATE_PATTERNS = [
+    re.compile(r"effective\s+(?:date|as of)[:\s]+([^\n]+)", re.IGNORECASE),
+    re.compile(r"dated\s+(?:as of\s+)?([A-Z][a-z]+\s+\d{1,2},?\s+\d{4})", re.IGNORECASE),
+    re.compile(r"(?:this|entered into on)\s+([A-Z][a-z]+\s+\d{1,2},?\s+\d{4})", re.IGNORECASE),
+]
+DATE_PUNCTUATION = re.compile(r'[^\w\s,]')
+
+AMOUNT_WITH_UNIT = re.compile(
+    r'\$\s*[\d,]+(?:\.\d{2})?(?:\s*(?:million|billion|thousand|USD|dollars))?', re.IGNORECASE
+)
+
+# DEFINITIONS (DefinitionExtractor)
+# "Term" means/shall mean definition
+DEFINITION_MEANS = re.compile(
+    r'"([^"]{3,50})"\s+(?:means?|shall mean|refers? to|is defined as)\s+([^.;]+[.;])', re.IGNORECASE
+)
+# As used herein, "Term" means...
+DEFINITION_AS_USED = re.compile(
+    r'As used (?:herein|in this Agreement),\s+"([^"]{3,50})"\s+(?:means?|refers? to)\s+([^.;]+[.;])', re.IGNORECASE
+)
+SECTION_NUMBER = re.compile(r'(\d+\.\d+)')
@@ -0,0 +1,37 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+class SpillFile:
+    """
+    Records written to an unlinked temp file as JSON lines and read back in
+    order; for intermediate results too large to hold for a whole analysis.
+    The file disappears when closed or when the process exits.
+    """
+
+    def __init__(self, spill_dir: Path):
+        spill_dir.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=spill_dir, suffix=".jsonl")
+        os.unlink(path)
+        self._file = os.fdopen(fd, "w+", encoding="utf-8")
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, separators=(",", ":")))
+        self._file.write("\n")
+        self.count += 1
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._file.flush()
+        self._file.seek(0)
+        for line in self._file:
+            yield json.loads(line)
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self):
+        self._file.close()
@@ -32,17 +32,3 @@ def sanitize_for_llm(text: str) -> str:
         sanitized = re.sub(pattern, '[REDACTED]', sanitized, flags=re.IGNORECASE)
     
     return sanitized
-
-def truncate_for_context(text: str, max_tokens: int = 500) -> str:
-
-    max_chars = max_tokens * 4
-    if len(text) <= max_chars:
-        return text
-    
-    truncated = text[:max_chars]
-    last_period = truncated.rfind('.')
-    
-    if last_period > max_chars * 0.8:  
-        return truncated[:last_period + 1] + "..."
-    else:
-        return truncated + "..."
\ No newline at end of file
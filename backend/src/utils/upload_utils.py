@@ -0,0 +1,371 @@
+import hashlib
+import os
+import uuid
+import zipfile
+import zlib
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from src.config.settings import BatchConfig, DocumentConfig
+
+# Multipart framing (boundaries, part headers) on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Readers accept a PDF header anywhere in the first KiB
+PDF_MAGIC = b"%PDF-"
+PDF_MAGIC_WINDOW = 1024
+ZIP_MAGIC = b"PK\x03\x04"
+
+COPY_BLOCK = 1024 * 1024
+
+class UploadError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+class StoredUpload(NamedTuple):
+    path: Path
+    filename: str
+    size: int
+    sha256: str
+
+class BatchUpload(NamedTuple):
+    files: List[StoredUpload]
+    # "name: reason" for every file left out
+    skipped: List[str]
+
+def _mb(size: int) -> int:
+    return size // (1024 * 1024)
+
+def _kind(filename: str, kinds: Tuple[str, ...]) -> Optional[str]:
+    suffix = PurePosixPath(filename.lower()).suffix.lstrip(".")
+    return suffix if suffix in kinds else None
+
+def _magic_ok(kind: str, head: bytes) -> bool:
+    return PDF_MAGIC in head[:PDF_MAGIC_WINDOW] if kind == "pdf" else head.startswith(ZIP_MAGIC)
+
+class _FilePart:
+    def __init__(self, path: Path, filename: str, kind: str):
+        self.path = path
+        self.filename = filename
+        self.kind = kind
+        self.file = open(path, "wb")
+        self.size = 0
+        self.head = b""
+        self.sha256 = hashlib.sha256()
+        self.checked = False
+
+    def close(self, discard: bool = False):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if discard:
+            self.path.unlink(missing_ok=True)
+
+class _UploadReceiver:
+    """
+    Receives the file parts of a multipart body, writing each to its own
+    .part file in dest_dir. In strict mode the first bad file fails the
+    request; otherwise it is dropped and listed in skipped.
+    """
+
+    def __init__(self, fields: Tuple[str, ...], dest_dir: Path, kinds: Tuple[str, ...],
+                 max_bytes: int, max_files: int, max_total: int, strict: bool):
+        self.fields = fields
+        self.dest_dir = dest_dir
+        self.kinds = kinds
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_total = max_total
+        self.strict = strict
+        self.headers: Dict[bytes, bytes] = {}
+        self.header_field = b""
+        self.header_value = b""
+        self.current: Optional[_FilePart] = None
+        self.received: List[_FilePart] = []
+        self.skipped: List[str] = []
+        self.total = 0
+        self.files_seen = 0
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    @property
+    def full(self) -> bool:
+        return self.files_seen >= self.max_files and self.current is None
+
+    def on_part_begin(self):
+        self.headers = {}
+
+    # Header names and values may arrive in pieces
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        self.headers[self.header_field.lower()] = self.header_value
+        self.header_field = b""
+        self.header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        if options.get(b"name", b"").decode("latin-1") not in self.fields or b"filename" not in options:
+            return
+        filename = options[b"filename"].decode("utf-8", errors="replace")
+        kind = _kind(filename, self.kinds)
+        if kind is None:
+            allowed = " or ".join(k.upper() for k in self.kinds)
+            self.reject(filename, f"Only {allowed} files supported", 400)
+            return
+        self.files_seen += 1
+        if self.files_seen > self.max_files:
+            raise UploadError(400, f"Too many files (limit {self.max_files})")
+        self.current = _FilePart(self.dest_dir / f"{uuid.uuid4()}.part", filename, kind)
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        part = self.current
+        if part is None:
+            return
+        chunk = data[start:end]
+        part.size += len(chunk)
+        self.total += len(chunk)
+        if self.total > self.max_total:
+            raise UploadError(413, f"Upload exceeds the {_mb(self.max_total)} MB limit")
+        # An archive only has to fit the body limit; its members are checked one by one
+        if part.kind == "pdf" and part.size > self.max_bytes:
+            self.drop(f"File exceeds the {_mb(self.max_bytes)} MB limit", 413)
+            return
+        if not part.checked:
+            part.head += chunk[:PDF_MAGIC_WINDOW - len(part.head)]
+            if len(part.head) >= PDF_MAGIC_WINDOW and not self.check_magic():
+                return
+        part.sha256.update(chunk)
+        part.file.write(chunk)
+
+    def on_part_end(self):
+        part = self.current
+        if part is None:
+            return
+        if not part.checked and not self.check_magic():
+            return
+        part.close()
+        self.received.append(part)
+        self.current = None
+
+    def check_magic(self) -> bool:
+        part = self.current
+        part.checked = True
+        if not _magic_ok(part.kind, part.head):
+            self.drop(f"File is not a {part.kind.upper()}", 400)
+            return False
+        return True
+
+    def drop(self, reason: str, status_code: int):
+        part = self.current
+        self.current = None
+        part.close(discard=True)
+        self.reject(part.filename, reason, status_code)
+
+    def reject(self, filename: str, reason: str, status_code: int):
+        if self.strict:
+            raise UploadError(status_code, reason)
+        self.skipped.append(f"{filename}: {reason}")
+
+    def discard_all(self):
+        if self.current is not None:
+            self.current.close(discard=True)
+            self.current = None
+        for part in self.received:
+            part.path.unlink(missing_ok=True)
+
+async def _receive(request: Request, receiver: _UploadReceiver, max_body: int):
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise UploadError(400, "Expected a multipart/form-data upload")
+
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_body + MULTIPART_OVERHEAD:
+        raise UploadError(413, f"Upload exceeds the {_mb(max_body)} MB limit")
+
+    receiver.dest_dir.mkdir(parents=True, exist_ok=True)
+    parser = MultipartParser(options[b"boundary"], receiver.callbacks())
+    try:
+        async for chunk in request.stream():
+            # Disk writes happen inside the parser callbacks
+            await run_in_threadpool(parser.write, chunk)
+            if receiver.full:
+                break
+        parser.finalize()
+        if receiver.current is not None:
+            raise UploadError(400, "Upload ended before the file was complete")
+    except BaseException:
+        receiver.discard_all()
+        raise
+
+async def save_pdf_upload(
+    request: Request,
+    dest_dir: Path,
+    name: str,
+    field: str = "file",
+    max_bytes: Optional[int] = None
+) -> StoredUpload:
+    """
+    Stream the PDF in a multipart/form-data request body to dest_dir/name.pdf
+    without holding it in memory, hashing it on the way. Oversized bodies are
+    refused from Content-Length before reading, and otherwise as soon as the
+    limit is crossed; a non-PDF is refused after its first KiB. The file is
+    written as a .part file and renamed once complete, so a half-written
+    upload is never picked up. Raises UploadError.
+    """
+    max_bytes = max_bytes or DocumentConfig.MAX_FILE_SIZE
+    receiver = _UploadReceiver((field,), dest_dir, ("pdf",), max_bytes, 1, max_bytes, strict=True)
+    await _receive(request, receiver, max_bytes)
+    if not receiver.received:
+        raise UploadError(400, "No file uploaded")
+
+    part = receiver.received[0]
+    path = dest_dir / f"{name}.pdf"
+    os.replace(part.path, path)
+    return StoredUpload(path, part.filename, part.size, part.sha256.hexdigest())
+
+async def save_batch_upload(request: Request, dest_dir: Path, fields: Tuple[str, ...] = ("files", "file")) -> BatchUpload:
+    """
+    Stream the PDFs and ZIP archives of PDFs in a multipart body to
+    dest_dir/<uuid>.pdf, with the same checks as save_pdf_upload per file and
+    BatchConfig limits on file count and total size. Files that fail a check
+    are skipped rather than failing the batch. Raises UploadError.
+    """
+    max_total = BatchConfig.MAX_UPLOAD_MB * 1024 * 1024
+    receiver = _UploadReceiver(
+        fields, dest_dir, ("pdf", "zip"), DocumentConfig.MAX_FILE_SIZE, BatchConfig.MAX_FILES, max_total,
+        strict=False
+    )
+    await _receive(request, receiver, max_total)
+
+    files: List[StoredUpload] = []
+    skipped = list(receiver.skipped)
+    # Extracted PDFs count toward the same total as the PDFs sent as they are
+    budget = max_total - sum(part.size for part in receiver.received if part.kind == "pdf")
+    try:
+        for part in receiver.received:
+            if part.kind == "zip":
+                extracted, zip_skipped = await run_in_threadpool(
+                    _extract_zip, part, dest_dir, BatchConfig.MAX_FILES - len(files), budget
+                )
+                budget -= sum(upload.size for upload in extracted)
+                files.extend(extracted)
+                skipped.extend(zip_skipped)
+                continue
+            if len(files) >= BatchConfig.MAX_FILES:
+                raise UploadError(400, f"Too many files (limit {BatchConfig.MAX_FILES})")
+            path = part.path.with_suffix(".pdf")
+            os.replace(part.path, path)
+            files.append(StoredUpload(path, part.filename, part.size, part.sha256.hexdigest()))
+    except BaseException:
+        for upload in files:
+            upload.path.unlink(missing_ok=True)
+        receiver.discard_all()
+        raise
+    return BatchUpload(files, skipped)
+
+class _BatchTooLarge(Exception):
+    """Raised by _copy_member past the batch's budget; fails the upload rather than the member"""
+
+def _extract_zip(part: _FilePart, dest_dir: Path, max_files: int,
+                 budget: int) -> Tuple[List[StoredUpload], List[str]]:
+    """
+    PDF members of an uploaded archive, copied out block by block, at most
+    `budget` bytes in all; the archive is deleted
+    """
+    files: List[StoredUpload] = []
+    skipped: List[str] = []
+    try:
+        with zipfile.ZipFile(part.path) as archive:
+            for info in archive.infolist():
+                member = PurePosixPath(info.filename)
+                if info.is_dir() or "__MACOSX" in member.parts or member.name.startswith("."):
+                    continue
+                label = f"{part.filename}/{info.filename}"
+                if member.suffix.lower() != ".pdf":
+                    skipped.append(f"{label}: Only PDF files supported")
+                    continue
+                if len(files) >= max_files:
+                    raise UploadError(400, f"Too many files (limit {BatchConfig.MAX_FILES})")
+                stored, reason = _copy_member(archive, info, dest_dir, info.filename, budget)
+                if stored:
+                    budget -= stored.size
+                    files.append(stored)
+                else:
+                    skipped.append(f"{label}: {reason}")
+    except zipfile.BadZipFile:
+        skipped.append(f"{part.filename}: Not a valid ZIP archive")
+    except BaseException:
+        for upload in files:
+            upload.path.unlink(missing_ok=True)
+        raise
+    finally:
+        part.path.unlink(missing_ok=True)
+    return files, skipped
+
+def _copy_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, dest_dir: Path,
+                 filename: str, budget: int) -> Tuple[Optional[StoredUpload], str]:
+    # Sizes in the archive directory are not trusted; the limits apply to
+    # the bytes actually decompressed. Going over the batch's `budget` fails
+    # the whole upload, like a body over BatchConfig.MAX_UPLOAD_MB
+    max_bytes = DocumentConfig.MAX_FILE_SIZE
+    part_path = dest_dir / f"{uuid.uuid4()}.part"
+    sha256 = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        with archive.open(info) as source, open(part_path, "wb") as target:
+            while True:
+                block = source.read(COPY_BLOCK)
+                if not block:
+                    break
+                size += len(block)
+                if size > budget:
+                    raise _BatchTooLarge()
+                if size > max_bytes:
+                    raise UploadError(413, f"File exceeds the {_mb(max_bytes)} MB limit")
+                if len(head) < PDF_MAGIC_WINDOW:
+                    head += block[:PDF_MAGIC_WINDOW - len(head)]
+                    if len(head) >= PDF_MAGIC_WINDOW and not _magic_ok("pdf", head):
+                        raise UploadError(400, "File is not a PDF")
+                sha256.update(block)
+                target.write(block)
+        if not _magic_ok("pdf", head):
+            raise UploadError(400, "File is not a PDF")
+    except (UploadError, zipfile.BadZipFile, zlib.error, RuntimeError, NotImplementedError) as e:
+        # RuntimeError: encrypted member; NotImplementedError: unsupported compression
+        part_path.unlink(missing_ok=True)
+        return None, e.detail if isinstance(e, UploadError) else str(e)
+    except _BatchTooLarge:
+        part_path.unlink(missing_ok=True)
+        raise UploadError(413, f"Upload exceeds the {BatchConfig.MAX_UPLOAD_MB} MB limit once unzipped")
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+    path = part_path.with_suffix(".pdf")
+    os.replace(part_path, path)
+    return StoredUpload(path, filename, size, sha256.hexdigest()), ""
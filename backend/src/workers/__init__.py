@@ -0,0 +1,4 @@
+from src.workers.job_runner import InlineRunner, run_job, worker_name
+from src.workers.pool import WorkerPool, start_embedded_pool, stop_embedded_pool
+
+__all__ = ['InlineRunner', 'run_job', 'worker_name', 'WorkerPool', 'start_embedded_pool', 'stop_embedded_pool']
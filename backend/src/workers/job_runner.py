@@ -0,0 +1,196 @@
+import logging
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.config.settings import JobStoreConfig, WorkerConfig
+from src.core.llm_scheduler import llm_flow
+from src.database.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+def worker_name(suffix: str = "") -> str:
+    """host:pid[:suffix]; the pool uses host and pid to tell whether a worker is still alive"""
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{name}:{suffix}" if suffix else name
+
+def _keep_lease(job_store: JobStore, job_id: str, worker_id: str, stop: threading.Event):
+    while not stop.wait(WorkerConfig.LEASE_SECONDS / 3):
+        try:
+            if not job_store.heartbeat(job_id, worker_id):
+                logger.warning(f"⚠️ Lost the lease on {job_id}; its result will be dropped")
+                return
+        except Exception as e:
+            # A missed beat is fine as long as the next one lands within the lease
+            logger.warning(f"⚠️ Heartbeat for {job_id} failed: {e}")
+
+def _overall_progress(stages: Dict[str, Tuple[int, int]]) -> int:
+    # Extraction (or, for a plain chunk list, the chunks analyzed) paces the
+    # debates: 10-80%. Once every chunk is in, fixes finishing: 80-95%. The
+    # rest is compound risks and saving
+    chunks_done, chunks = stages.get("chunks", (0, 0))
+    if chunks and chunks_done >= chunks:
+        fixes_done, fixes = stages.get("fix", (0, 0))
+        return 80 + (15 * fixes_done // fixes if fixes else 15)
+    pages_done, pages = stages.get("extract", (0, 0))
+    pace = pages_done / pages if pages else 0.0
+    if chunks:
+        pace = min(pace, chunks_done / chunks)
+    return 10 + int(70 * pace)
+
+def run_job(analyzer, job_store: JobStore, job: Dict[str, Any]):
+    """Run one claimed job to completion or failure, reporting progress to the store"""
+    analysis_id = job["id"]
+    worker_id = job["worker_id"]
+    stop = threading.Event()
+    threading.Thread(
+        target=_keep_lease, args=(job_store, analysis_id, worker_id, stop), daemon=True, name=f"lease-{analysis_id}"
+    ).start()
+    try:
+        logger.info(f"🔄 Starting analysis: {analysis_id}")
+
+        job_store.set_progress(analysis_id, 10, worker_id)
+        stages: Dict[str, Tuple[int, int]] = {}
+        state = {"progress": 10, "stored": 10, "sent": 0.0}
+
+        def on_progress(stage: str, done: int, total: int):
+            stages[stage] = (done, total)
+            state["progress"] = max(state["progress"], _overall_progress(stages))
+            now = time.time()
+            if now - state["sent"] < JobStoreConfig.PROGRESS_EVENT_INTERVAL_SECONDS and done != total:
+                return
+            state["sent"] = now
+            job_store.add_event(analysis_id, "progress", {
+                "progress": state["progress"],
+                "stage": stage,
+                "stages": {name: list(counts) for name, counts in stages.items()}
+            }, worker_id)
+            if state["progress"] != state["stored"]:
+                state["stored"] = state["progress"]
+                job_store.set_progress(analysis_id, state["progress"], worker_id)
+
+        def on_clause(clause: Dict[str, Any]):
+            job_store.add_event(analysis_id, "clause", clause, worker_id)
+
+        # The job's LLM calls share provider capacity fairly with other
+        # analyses and tenants in this process
+        with llm_flow(analysis_id, tenant=job.get("client_id")):
+            results = analyzer.analyze_contract(
+                Path(job["file_path"]),
+                on_progress=on_progress,
+                analysis_id=analysis_id,
+                base_analysis_id=job.get("base_analysis_id"),
+                on_clause=on_clause
+            )
+
+        # Completion is conditional on still holding the job, so a run that
+        # lost its lease and finished late cannot overwrite the new owner's
+        if job_store.complete(analysis_id, results, worker_id):
+            logger.info(f"✅ Analysis complete: {analysis_id}")
+
+    except Exception as e:
+        logger.error(f"❌ Analysis failed: {analysis_id} - {e}")
+        # A failed run releases its dedup key, so the next identical upload retries
+        job_store.fail(analysis_id, str(e), worker_id)
+    finally:
+        stop.set()
+
+class InlineRunner:
+    """
+    Inline mode: the API process runs queued jobs itself on up to `size`
+    threads that share one analyzer, and with it the document cache,
+    prefetched templates and loaded models. Call start() once and wake()
+    after queueing a job; threads stop once the queue is empty. start() also
+    wakes the runner every LEASE_SECONDS / 3, so jobs whose lease ran out
+    (their thread or process died) are claimed again without a new upload.
+    stop() drains like WorkerPool.stop(): no new claims, running jobs get
+    up to DRAIN_TIMEOUT_SECONDS, then are re-queued.
+    Which job runs next (single uploads first, per-batch limits) is
+    claim_next's; the first WorkerConfig.INTERACTIVE_WORKERS threads only
+    take single uploads.
+    """
+
+    def __init__(self, get_analyzer: Callable[[], Any], job_store: JobStore, size: Optional[int] = None):
+        self.get_analyzer = get_analyzer
+        self.job_store = job_store
+        self.size = max(1, size or WorkerConfig.INLINE_WORKERS)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._free_slots = list(range(self.size))
+        self._pending = False
+        self._stopping = False
+        self._timer: Optional[threading.Thread] = None
+
+    def start(self):
+        self.wake()
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Thread(target=self._reclaim, daemon=True, name="inline-reclaim")
+        self._timer.start()
+
+    def stop(self) -> bool:
+        """Drain the runner; True if no job was still running at the deadline"""
+        with self._lock:
+            self._stopping = True
+            drained = self._idle.wait_for(
+                lambda: len(self._free_slots) == self.size, WorkerConfig.DRAIN_TIMEOUT_SECONDS
+            )
+            busy = [slot for slot in range(self.size) if slot not in self._free_slots]
+        for slot in busy:
+            self.job_store.requeue(worker_name(f"inline-{slot}"))
+        return drained
+
+    def _reclaim(self):
+        while True:
+            time.sleep(WorkerConfig.LEASE_SECONDS / 3)
+            self.wake()
+
+    def wake(self):
+        with self._lock:
+            self._pending = True
+            if self._stopping or not self._free_slots:
+                return
+            # Slots open to batch jobs first; the interactive ones are the low numbers
+            slot = max(self._free_slots)
+            self._free_slots.remove(slot)
+        threading.Thread(target=self._drain, args=(slot,), daemon=True, name=f"inline-{slot}").start()
+
+    def _drain(self, slot: int):
+        worker_id = worker_name(f"inline-{slot}")
+        interactive_only = slot < WorkerConfig.INTERACTIVE_WORKERS < self.size
+        try:
+            while True:
+                # A wake() after this point is seen by the claim below or the check after it
+                with self._lock:
+                    self._pending = False
+                    if self._stopping:
+                        self._release(slot)
+                        return
+                job = self.job_store.claim_next(worker_id, interactive_only=interactive_only)
+                if job is None:
+                    with self._lock:
+                        if not self._pending:
+                            self._release(slot)
+                            return
+                    continue
+                try:
+                    analyzer = self.get_analyzer()
+                except Exception:
+                    # Back on the queue for the next wake; each claim counts
+                    # toward MAX_ATTEMPTS, so it fails if this keeps happening
+                    self.job_store.requeue(worker_id)
+                    raise
+                run_job(analyzer, self.job_store, job)
+        except Exception as e:
+            logger.error(f"❌ Inline worker {worker_id} stopped: {e}")
+            with self._lock:
+                self._release(slot)
+
+    def _release(self, slot: int):
+        # Caller holds self._lock
+        self._free_slots.append(slot)
+        self._idle.notify_all()
@@ -0,0 +1,169 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.config.settings import WorkerConfig
+from src.database.job_store import get_job_store
+from src.workers.job_runner import run_job, worker_name
+
+logger = logging.getLogger(__name__)
+
+RUN_WORKER_SCRIPT = Path(__file__).resolve().parents[2] / "run_worker.py"
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def worker_main(stop_event, log_level: int = logging.INFO, interactive_only: bool = False):
+    """
+    Pool process: warm one ContractAnalyzer, then run queued jobs until told
+    to stop; with interactive_only, single uploads only
+    """
+    # Ctrl+C reaches the whole process group; the pool decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    logging.basicConfig(level=log_level, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    from src.services.analyzer import ContractAnalyzer
+    analyzer = ContractAnalyzer()
+    job_store = get_job_store()
+    worker_id = worker_name()
+    parent = os.getppid()
+    logger.info(f"👷 Worker {worker_id} ready")
+
+    # Also stop if the pool died without telling us
+    try:
+        while not stop_event.is_set() and os.getppid() == parent:
+            job = job_store.claim_next(worker_id, interactive_only=interactive_only)
+            if job is None:
+                stop_event.wait(WorkerConfig.POLL_INTERVAL_SECONDS)
+                continue
+            run_job(analyzer, job_store, job)
+    finally:
+        analyzer.close()
+
+    logger.info(f"👋 Worker {worker_id} stopped")
+
+class WorkerPool:
+    """
+    Supervisor for WorkerConfig.POOL_SIZE worker processes that take jobs
+    from the job store. A worker that exits unexpectedly has its unfinished
+    job re-queued and is replaced; on start, jobs left behind by dead
+    workers on this host (a crash or kill of an earlier pool) are re-queued.
+    Jobs of a node that died altogether are claimed again by any pool once
+    their lease runs out, so pools on several nodes need no coordination.
+    The first WorkerConfig.INTERACTIVE_WORKERS workers skip batch jobs.
+    stop() drains: workers finish their current job, up to
+    DRAIN_TIMEOUT_SECONDS, and any job still running after that is re-queued.
+    """
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or WorkerConfig.POOL_SIZE
+        self.context = multiprocessing.get_context("spawn")
+        self.stop_event = self.context.Event()
+        self.processes: Dict[int, multiprocessing.process.BaseProcess] = {}
+        self.job_store = get_job_store()
+        self._stopping = threading.Event()
+
+    def run(self, install_signal_handlers: bool = True):
+        if install_signal_handlers:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: self.stop())
+
+        self.recover_orphans()
+        for slot in range(self.size):
+            self._spawn(slot)
+        logger.info(f"✅ Worker pool started with {self.size} workers")
+
+        while not self._stopping.wait(1.0):
+            for slot, process in list(self.processes.items()):
+                if not process.is_alive():
+                    logger.error(f"💥 Worker {process.pid} exited with code {process.exitcode}; restarting it")
+                    self.job_store.requeue(self._worker_id(process))
+                    self._spawn(slot)
+
+        self._drain()
+
+    def stop(self):
+        self._stopping.set()
+
+    def recover_orphans(self) -> int:
+        """Re-queue jobs held by workers on this host whose process is gone"""
+        host = socket.gethostname()
+        requeued = 0
+        for worker_id in self.job_store.running_workers():
+            worker_host, _, rest = worker_id.partition(":")
+            pid = rest.split(":")[0]
+            if worker_host == host and pid.isdigit() and not _pid_alive(int(pid)):
+                requeued += self.job_store.requeue(worker_id)
+        return requeued
+
+    def _spawn(self, slot: int):
+        process = self.context.Process(
+            target=worker_main,
+            args=(
+                self.stop_event,
+                logging.getLogger().getEffectiveLevel(),
+                slot < WorkerConfig.INTERACTIVE_WORKERS < self.size
+            ),
+            name=f"analysis-worker-{slot}"
+        )
+        process.start()
+        self.processes[slot] = process
+
+    def _worker_id(self, process) -> str:
+        return f"{socket.gethostname()}:{process.pid}"
+
+    def _drain(self):
+        logger.info(f"🛑 Draining worker pool (up to {WorkerConfig.DRAIN_TIMEOUT_SECONDS}s)...")
+        self.stop_event.set()
+        deadline = time.time() + WorkerConfig.DRAIN_TIMEOUT_SECONDS
+        for process in self.processes.values():
+            process.join(max(0.0, deadline - time.time()))
+
+        for process in self.processes.values():
+            if process.is_alive():
+                logger.warning(f"⚠️ Worker {process.pid} still busy after drain timeout; killing it")
+                process.kill()
+                process.join()
+                self.job_store.requeue(self._worker_id(process))
+        logger.info("👋 Worker pool stopped")
+
+_embedded: Optional[subprocess.Popen] = None
+
+def start_embedded_pool():
+    """
+    In "pool" mode with POOL_EMBEDDED, run the pool as a child process of the
+    API (run_worker.py), for single-container deployments. Start it from one
+    API process only; several uvicorn workers would each start a pool.
+    """
+    global _embedded
+    if WorkerConfig.MODE != "pool" or not WorkerConfig.POOL_EMBEDDED or _embedded is not None:
+        return
+    _embedded = subprocess.Popen([sys.executable, str(RUN_WORKER_SCRIPT)], cwd=RUN_WORKER_SCRIPT.parent)
+    logger.info(f"👷 Started embedded worker pool (pid {_embedded.pid})")
+
+def stop_embedded_pool():
+    global _embedded
+    if _embedded is None:
+        return
+    # SIGTERM makes the pool drain; give it the drain timeout plus a margin
+    _embedded.terminate()
+    try:
+        _embedded.wait(WorkerConfig.DRAIN_TIMEOUT_SECONDS + 30)
+    except subprocess.TimeoutExpired:
+        _embedded.kill()
+    _embedded = None
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { submitFeedback } from '../../services/api';
+import { getClauseDetails, submitFeedback } from '../../services/api';
 import { RiskyClause } from '../../types';
 
 interface FeedbackButtonsProps {
@@ -19,6 +19,10 @@ const FeedbackButtons: React.FC<FeedbackButtonsProps> = ({ clause, analysisId })
   ) => {
     setLoading(true);
     try {
+      // Clauses from a results page come without the debate texts
+      const full = clause.pessimist_analysis === undefined && analysisId
+        ? await getClauseDetails(analysisId, clause.chunk_id)
+        : clause;
       await submitFeedback(type, {
         chunk_id: clause.chunk_id,
         clause_text: clause.original_text,
@@ -29,9 +33,9 @@ const FeedbackButtons: React.FC<FeedbackButtonsProps> = ({ clause, analysisId })
         user_comment: comment,
         user_id: 'anonymous',
         analysis_id: analysisId,
-        pessimist_analysis: clause.pessimist_analysis,
-        optimist_analysis: clause.optimist_analysis,
-        arbiter_reasoning: clause.arbiter_reasoning
+        pessimist_analysis: full.pessimist_analysis,
+        optimist_analysis: full.optimist_analysis,
+        arbiter_reasoning: full.arbiter_reasoning
       });
       setSubmitted(true);
     } catch (err) {
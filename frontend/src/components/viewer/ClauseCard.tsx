@@ -1,5 +1,6 @@
 import React, { useState } from 'react';
-import { RiskyClause } from '../../types';
+import { ClauseDetails, RiskyClause } from '../../types';
+import { getClauseDetails } from '../../services/api';
 import RiskBadge from '../risk/RiskBadge';
 import FeedbackButtons from '../feedback/FeedbackButtons';
 import { getRiskBorderColor } from '../../utils/colors';
@@ -10,8 +11,34 @@ interface ClauseCardProps {
   analysisId?: string;
 }
 
+const DebatePoints: React.FC<{ points?: string[] }> = ({ points }) =>
+  points && points.length > 0 ? (
+    <ul className="list-disc list-inside text-sm text-gray-600 mt-2 space-y-1">
+      {points.map((point, i) => (
+        <li key={i}>{point}</li>
+      ))}
+    </ul>
+  ) : null;
+
 const ClauseCard: React.FC<ClauseCardProps> = ({ clause, index, analysisId }) => {
   const [showDetails, setShowDetails] = useState(false);
+  const [details, setDetails] = useState<ClauseDetails | null>(null);
+  const [detailsError, setDetailsError] = useState<string | null>(null);
+
+  // Result pages leave the debate out; fetch it the first time it is opened
+  const toggleDetails = async () => {
+    setShowDetails(!showDetails);
+    if (showDetails || details || clause.pessimist_analysis !== undefined || !analysisId) return;
+    try {
+      setDetails(await getClauseDetails(analysisId, clause.chunk_id));
+    } catch (err: any) {
+      setDetailsError(err.response?.data?.detail || 'Failed to load the analysis');
+    }
+  };
+
+  const full: RiskyClause = details || clause;
+  const debate = details?.debate;
+  const loading = showDetails && full.pessimist_analysis === undefined && !detailsError && !!analysisId;
 
   return (
     <div className={`bg-white rounded-lg shadow-md p-6 mb-4 border-l-4 ${getRiskBorderColor(clause.risk_level)}`}>
@@ -22,6 +49,9 @@ const ClauseCard: React.FC<ClauseCardProps> = ({ clause, index, analysisId }) =>
             Clause #{index + 1}: {clause.category}
           </h3>
           <p className="text-sm text-gray-500 mt-1">ID: {clause.chunk_id}</p>
+          {clause.section_path && clause.section_path.length > 0 && (
+            <p className="text-sm text-gray-500">Section: {clause.section_path.join(' › ')}</p>
+          )}
         </div>
         <RiskBadge riskLevel={clause.risk_level} score={clause.risk_score} />
       </div>
@@ -55,39 +85,50 @@ const ClauseCard: React.FC<ClauseCardProps> = ({ clause, index, analysisId }) =>
 
       {/* Toggle AI Analysis */}
       <button
-        onClick={() => setShowDetails(!showDetails)}
+        onClick={toggleDetails}
         className="text-blue-600 hover:text-blue-800 text-sm font-medium mb-4 transition-colors"
       >
         {showDetails ? '▼ Hide' : '▶ Show'} AI Analysis
       </button>
 
       {/* AI Analysis Details */}
-      {showDetails && (
+      {showDetails && loading && (
+        <p className="mt-4 pt-4 border-t text-sm text-gray-500 animate-pulse">Loading AI analysis...</p>
+      )}
+
+      {showDetails && detailsError && (
+        <p className="mt-4 pt-4 border-t text-sm text-red-600">{detailsError}</p>
+      )}
+
+      {showDetails && !loading && !detailsError && (
         <div className="mt-4 space-y-4 pt-4 border-t">
           <div>
             <h5 className="font-semibold text-red-700 mb-2">🔴 Pessimist (Red Team):</h5>
             <p className="text-sm text-gray-700 bg-red-50 p-3 rounded">
-              {clause.pessimist_analysis}
+              {full.pessimist_analysis}
             </p>
+            <DebatePoints points={debate?.pessimist?.key_concerns} />
           </div>
           <div>
             <h5 className="font-semibold text-blue-700 mb-2">🔵 Optimist (Blue Team):</h5>
             <p className="text-sm text-gray-700 bg-blue-50 p-3 rounded">
-              {clause.optimist_analysis}
+              {full.optimist_analysis}
             </p>
+            <DebatePoints points={debate?.optimist?.mitigating_factors} />
           </div>
           <div>
             <h5 className="font-semibold text-purple-700 mb-2">⚖️ Arbiter (Judge):</h5>
             <p className="text-sm text-gray-700 bg-purple-50 p-3 rounded">
-              {clause.arbiter_reasoning}
+              {full.arbiter_reasoning}
             </p>
+            <DebatePoints points={debate?.arbiter?.key_factors} />
           </div>
         </div>
       )}
 
       {/* Feedback Section */}
       <div className="mt-4 pt-4 border-t">
-        <FeedbackButtons clause={clause} analysisId={analysisId} />
+        <FeedbackButtons clause={full} analysisId={analysisId} />
       </div>
     </div>
   );
@@ -1,14 +1,40 @@
-import { useState, useEffect } from 'react';
-import { getAnalysisStatus, getAnalysisResults } from '../services/api';
-import { AnalysisStatus, AnalysisResults } from '../types';
+import { useState, useEffect, useCallback } from 'react';
+import { getAnalysisStatus, getAnalysisResults, getAnalysisEventsUrl } from '../services/api';
+import { AnalysisStatus, AnalysisResults, ResultsPage, RiskyClause, StageCounts } from '../types';
+
+// The summary renders first; risky clauses follow a page at a time, without
+// the debate texts (ClauseCard loads those when opened)
+const SUMMARY_FIELDS = 'analysis_id,document,summary,compound_risks';
+const CLAUSE_LIST_FIELDS = 'chunk_id,category,section_path,risk_score,risk_level,original_text,suggested_fix,fix_comment,key_changes';
+const CLAUSE_PAGE_SIZE = 20;
+
+const fetchClausePage = (analysisId: string, offset: number): Promise<ResultsPage> =>
+  getAnalysisResults(analysisId, {
+    fields: 'risky_clauses',
+    clause_fields: CLAUSE_LIST_FIELDS,
+    offset,
+    limit: CLAUSE_PAGE_SIZE,
+  });
 
 export const useAnalysis = (analysisId: string) => {
   const [status, setStatus] = useState<AnalysisStatus | null>(null);
   const [results, setResults] = useState<AnalysisResults | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const [stages, setStages] = useState<StageCounts>({});
+  const [partialClauses, setPartialClauses] = useState<RiskyClause[]>([]);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
-    let interval: NodeJS.Timeout;
+    let interval: NodeJS.Timeout | undefined;
+    let source: EventSource | null = null;
+
+    const loadResults = async () => {
+      const [summary, firstPage] = await Promise.all([
+        getAnalysisResults(analysisId, { fields: SUMMARY_FIELDS }),
+        fetchClausePage(analysisId, 0),
+      ]);
+      setResults({ ...summary, risky_clauses: firstPage.risky_clauses });
+    };
 
     const pollStatus = async () => {
       try {
@@ -16,8 +42,7 @@ export const useAnalysis = (analysisId: string) => {
         setStatus(statusData);
 
         if (statusData.status === 'completed') {
-          const resultsData = await getAnalysisResults(analysisId);
-          setResults(resultsData);
+          await loadResults();
           clearInterval(interval);
         } else if (statusData.status === 'failed') {
           setError('Analysis failed');
@@ -29,11 +54,71 @@ export const useAnalysis = (analysisId: string) => {
       }
     };
 
-    pollStatus();
-    interval = setInterval(pollStatus, 2000);
+    const startPolling = () => {
+      pollStatus();
+      interval = setInterval(pollStatus, 2000);
+    };
+
+    if (typeof EventSource === 'undefined') {
+      startPolling();
+    } else {
+      // One status read for the filename; everything after that is pushed
+      getAnalysisStatus(analysisId).then(setStatus).catch(() => undefined);
+
+      source = new EventSource(getAnalysisEventsUrl(analysisId));
+
+      source.addEventListener('progress', (e) => {
+        const data = JSON.parse((e as MessageEvent).data);
+        setStatus(prev => prev && { ...prev, progress: data.progress });
+        setStages(data.stages);
+      });
 
-    return () => clearInterval(interval);
+      source.addEventListener('clause', (e) => {
+        const clause: RiskyClause = JSON.parse((e as MessageEvent).data);
+        setPartialClauses(prev => prev.some(c => c.chunk_id === clause.chunk_id) ? prev : [...prev, clause]);
+      });
+
+      // The job is being retried from scratch
+      source.addEventListener('restart', () => setPartialClauses([]));
+
+      source.addEventListener('status', (e) => {
+        source?.close();
+        const data = JSON.parse((e as MessageEvent).data);
+        if (data.status === 'completed') {
+          loadResults().catch((err: any) => setError(err.response?.data?.detail || 'Failed to fetch results'));
+        } else {
+          setError(data.error || 'Analysis failed');
+        }
+      });
+
+      source.onerror = () => {
+        // EventSource reconnects (resuming from the last event) on its own;
+        // once it gives up, fall back to polling
+        if (source?.readyState === EventSource.CLOSED) {
+          startPolling();
+        }
+      };
+    }
+
+    return () => {
+      source?.close();
+      clearInterval(interval);
+    };
   }, [analysisId]);
 
-  return { status, results, error };
-};
\ No newline at end of file
+  const loadMoreClauses = useCallback(async () => {
+    if (!results || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const next = await fetchClausePage(analysisId, results.risky_clauses.length);
+      setResults(prev => prev && { ...prev, risky_clauses: [...prev.risky_clauses, ...next.risky_clauses] });
+    } catch (err) {
+      // The button stays, so the page can be asked for again
+      console.error('Loading more clauses failed:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [analysisId, results, loadingMore]);
+
+  return { status, results, error, stages, partialClauses, loadMoreClauses, loadingMore };
+};
@@ -8,7 +8,7 @@ import Footer from '../components/common/Footer';
 const AnalysisPage: React.FC = () => {
   const { analysisId } = useParams<{ analysisId: string }>();
   const navigate = useNavigate();
-  const { status, results, error } = useAnalysis(analysisId!);
+  const { status, results, error, stages, partialClauses, loadMoreClauses, loadingMore } = useAnalysis(analysisId!);
   const [showDisclaimer, setShowDisclaimer] = useState(true);
 
   if (error) {
@@ -43,12 +43,46 @@ const AnalysisPage: React.FC = () => {
   }
 
   if (!results) {
+    const stageLabels: [keyof typeof stages, string][] = [
+      ['extract', 'Pages'],
+      ['chunks', 'Clauses'],
+      ['debate', 'Debates'],
+      ['fix', 'Fixes'],
+    ];
+
     return (
-      <div className="min-h-screen bg-gray-50 flex items-center justify-center">
-        <div className="text-center">
-          <div className="inline-block animate-spin rounded-full h-16 w-16 border-4 border-indigo-200 border-t-indigo-600 mb-6"></div>
-          <h2 className="text-2xl font-black text-gray-900 mb-2 tracking-tight animate-pulse">Analyzing Contract...</h2>
-          <p className="text-gray-500 font-medium uppercase tracking-widest text-xs">{status?.filename}</p>
+      <div className="min-h-screen bg-gray-50 py-16 px-4">
+        <div className="max-w-3xl mx-auto">
+          <div className="text-center mb-10">
+            <div className="inline-block animate-spin rounded-full h-16 w-16 border-4 border-indigo-200 border-t-indigo-600 mb-6"></div>
+            <h2 className="text-2xl font-black text-gray-900 mb-2 tracking-tight animate-pulse">Analyzing Contract...</h2>
+            <p className="text-gray-500 font-medium uppercase tracking-widest text-xs">{status?.filename}</p>
+
+            <div className="mt-6 h-2 bg-indigo-100 rounded-full overflow-hidden">
+              <div
+                className="h-full bg-indigo-600 transition-all duration-500"
+                style={{ width: `${status?.progress || 0}%` }}
+              ></div>
+            </div>
+            <div className="mt-3 flex justify-center gap-6 text-[10px] font-bold uppercase tracking-widest text-gray-500">
+              {stageLabels.filter(([stage]) => stages[stage]).map(([stage, label]) => {
+                const [done, total] = stages[stage]!;
+                return <span key={stage}>{label}: {done}{total ? ` / ${total}` : ''}</span>;
+              })}
+            </div>
+          </div>
+
+          {partialClauses.length > 0 && (
+            <div>
+              <div className="flex items-center gap-3 mb-6">
+                <div className="h-8 w-1.5 bg-indigo-600 rounded-full"></div>
+                <h2 className="text-2xl font-black text-gray-900 tracking-tight">Findings So Far ({partialClauses.length})</h2>
+              </div>
+              {partialClauses.map((clause, i) => (
+                <ClauseCard key={clause.chunk_id} clause={clause} index={i} analysisId={analysisId} />
+              ))}
+            </div>
+          )}
         </div>
       </div>
     );
@@ -108,7 +142,7 @@ const AnalysisPage: React.FC = () => {
           <div>
             <div className="flex items-center gap-3 mb-6">
               <div className="h-8 w-1.5 bg-indigo-600 rounded-full"></div>
-              <h2 className="text-2xl font-black text-gray-900 tracking-tight">Risky Clauses ({results.risky_clauses.length})</h2>
+              <h2 className="text-2xl font-black text-gray-900 tracking-tight">Risky Clauses ({results.document.risky_clauses_found})</h2>
             </div>
 
             {results.risky_clauses.map((clause, i) => (
@@ -119,6 +153,20 @@ const AnalysisPage: React.FC = () => {
                 analysisId={results.analysis_id}
               />
             ))}
+
+            {results.risky_clauses.length < results.document.risky_clauses_found && (
+              <div className="text-center mt-6">
+                <button
+                  onClick={loadMoreClauses}
+                  disabled={loadingMore}
+                  className="px-6 py-3 bg-white hover:bg-gray-50 text-gray-700 rounded-xl shadow-sm border border-gray-200 font-bold text-xs uppercase tracking-widest transition-all disabled:opacity-50"
+                >
+                  {loadingMore
+                    ? 'Loading...'
+                    : `Show More (${results.risky_clauses.length} of ${results.document.risky_clauses_found})`}
+                </button>
+              </div>
+            )}
           </div>
         </div>
       </div>
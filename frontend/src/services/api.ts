@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { ClauseDetails, ResultsQuery } from '../types';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
@@ -22,7 +23,7 @@ export const checkHealth = async () => {
   }
 };
 
-export const uploadContract = async (file: File) => {
+export const uploadContract = async (file: File, baseAnalysisId?: string) => {
   const formData = new FormData();
   formData.append('file', file);
 
@@ -30,6 +31,7 @@ export const uploadContract = async (file: File) => {
     headers: {
       'Content-Type': 'multipart/form-data',
     },
+    params: baseAnalysisId ? { base_analysis_id: baseAnalysisId } : undefined,
   });
 
   return response.data;
@@ -40,8 +42,18 @@ export const getAnalysisStatus = async (analysisId: string) => {
   return response.data;
 };
 
-export const getAnalysisResults = async (analysisId: string) => {
-  const response = await api.get(`/analyze/${analysisId}/results`);
+// Server-Sent Events: progress, finished clauses and the final status
+export const getAnalysisEventsUrl = (analysisId: string) => `${API_URL}/analyze/${analysisId}/events`;
+
+// Without params the whole result; see ResultsQuery for projection and paging
+export const getAnalysisResults = async (analysisId: string, params?: ResultsQuery) => {
+  const response = await api.get(`/analyze/${analysisId}/results`, { params });
+  return response.data;
+};
+
+// One risky clause with its full debate
+export const getClauseDetails = async (analysisId: string, chunkId: string): Promise<ClauseDetails> => {
+  const response = await api.get(`/analyze/${analysisId}/clauses/${encodeURIComponent(chunkId)}`);
   return response.data;
 };
 
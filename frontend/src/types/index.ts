@@ -4,12 +4,40 @@ export interface RiskyClause {
   original_text: string;
   risk_score: number;
   risk_level: string;
-  pessimist_analysis: string;
-  optimist_analysis: string;
-  arbiter_reasoning: string;
+  // Left out of result pages; loaded with the clause's details
+  pessimist_analysis?: string;
+  optimist_analysis?: string;
+  arbiter_reasoning?: string;
   suggested_fix: string;
   fix_comment: string;
   key_changes: string[];
+  section_path?: string[];
+}
+
+export interface ClauseDebate {
+  pessimist: { relevance_reasoning: string; risk_argument: string; key_concerns: string[] } | null;
+  optimist: { defense_argument: string; industry_context: string; mitigating_factors: string[] } | null;
+  arbiter: { risk_score: number; risk_level: string; reasoning: string; key_factors: string[] } | null;
+  safe_precedents_used: string[];
+  risky_precedents_used: string[];
+}
+
+// debate is null once the analysis snapshot is no longer kept
+export interface ClauseDetails extends RiskyClause {
+  debate: ClauseDebate | null;
+}
+
+export interface ResultsQuery {
+  fields?: string;
+  clause_fields?: string;
+  offset?: number;
+  limit?: number;
+  sort?: 'document' | 'risk';
+}
+
+export interface ResultsPage {
+  risky_clauses: RiskyClause[];
+  page: { offset: number; limit: number | null; total: number };
 }
 
 export interface CompoundRisk {
@@ -43,4 +71,7 @@ export interface AnalysisStatus {
   status: 'processing' | 'completed' | 'failed';
   filename: string;
   progress: number;
-}
\ No newline at end of file
+}
+
+// [done, total] per stage: extract (pages), chunks, debate, fix; a total of 0 is not known yet
+export type StageCounts = Partial<Record<'extract' | 'chunks' | 'debate' | 'fix', [number, number]>>;